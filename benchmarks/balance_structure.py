@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Benchmark of material balance assembly in phenomena-based simulation on
+countercurrent cascades of streams. The legacy path rebuilds the coefficient
+matrix from dictionaries keyed by stream material references on every
+iteration, while the compiled BalanceStructure only collects numerical
+coefficients once the sparsity pattern is known. Both paths are timed
+with and without the (shared) dense solve.
+
+Run with `python benchmarks/balance_structure.py`.
+"""
+import biosteam as bst
+from biosteam._system import Configuration, material_reference
+from biosteam.utils import dictionaries2array
+from numpy.linalg import solve
+import numpy as np
+from time import perf_counter
+
+chemicals = ('Water', 'Ethanol', 'Methanol', 'Glycerol', 'Propanol')
+
+def create_equations(N_stages, seed=0):
+    rng = np.random.default_rng(seed)
+    N_chemicals = len(chemicals)
+    vapor = [bst.Stream(None, Water=1) for i in range(N_stages)]
+    liquid = [bst.Stream(None, Water=1) for i in range(N_stages)]
+    equations = []
+    for i in range(N_stages):
+        coefficients = {vapor[i]: 1, liquid[i]: 1}
+        if i: coefficients[liquid[i - 1]] = -1
+        if i != N_stages - 1: coefficients[vapor[i + 1]] = -1
+        feed = np.full(N_chemicals, 100. if i == N_stages // 2 else 0.)
+        equations.append((coefficients, feed))
+        split = rng.uniform(0.4, 0.6, N_chemicals)
+        equations.append(({vapor[i]: 1 - split, liquid[i]: -split}, np.zeros(N_chemicals)))
+    return equations
+
+def assemble_legacy(equations):
+    A = []
+    b = []
+    for coefficients, value in equations:
+        A.append({i.material_reference: j for i, j in coefficients.items()})
+        b.append(value)
+    A, keys = dictionaries2array(A)
+    return A, np.array(b), keys
+
+def assemble_structure(configuration, equations):
+    structure = configuration.balance_structure('material', equations, material_reference)
+    b = np.array([j for i, j in equations])
+    data = structure.coefficient_data(
+        [j for i, _ in equations for j in i.values()], b.shape[1:]
+    )
+    return structure.dense(data), b, structure.keys
+
+def solve_legacy(equations):
+    A, b, keys = assemble_legacy(equations)
+    return np.array([solve(A[i], b[:, i]) for i in range(b.shape[1])]).T, keys
+
+def solve_structure(configuration, equations):
+    A, b, keys = assemble_structure(configuration, equations)
+    return solve(A, b.T[..., None])[..., 0].T, keys
+
+def best_time(f, repeats, *args):
+    times = []
+    for i in range(repeats):
+        start = perf_counter()
+        f(*args)
+        times.append(perf_counter() - start)
+    return 1e3 * min(times)
+
+def run(stages=(5, 20, 50, 100, 200), repeats=20):
+    bst.settings.set_thermo(chemicals, cache=True)
+    configuration = Configuration.__new__(Configuration)
+    configuration._structures = {}
+    print(f"{'Stages':>6} {'Legacy assembly [ms]':>21} {'Structure assembly [ms]':>24} "
+          f"{'Legacy total [ms]':>18} {'Structure total [ms]':>21} {'Speedup':>8}")
+    for N in stages:
+        equations = create_equations(N)
+        legacy, keys_legacy = solve_legacy(equations)
+        structure, keys_structure = solve_structure(configuration, equations)
+        index = {j: i for i, j in enumerate(keys_structure)}
+        assert np.allclose(legacy, structure[[index[i] for i in keys_legacy]])
+        t_assembly_legacy = best_time(assemble_legacy, repeats, equations)
+        t_assembly_structure = best_time(assemble_structure, repeats, configuration, equations)
+        t_legacy = best_time(solve_legacy, repeats, equations)
+        t_structure = best_time(solve_structure, repeats, configuration, equations)
+        print(f"{N:>6} {t_assembly_legacy:>21.3f} {t_assembly_structure:>24.3f} "
+              f"{t_legacy:>18.3f} {t_structure:>21.3f} {t_legacy / t_structure:>8.1f}")
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Benchmark of stiff dynamic simulation (Radau) of a train of activated sludge
+reactors with an internal recycle, comparing the dense finite-difference
+Jacobian with the block sparsity pattern derived from stream connectivity.
+Requires QSDsan.
+
+Run with `python benchmarks/dynamic_jacobian.py`.
+"""
+from time import perf_counter
+
+def create_multi_reactor_system(N_reactors):
+    from qsdsan import processes as pc, sanunits as su, set_thermo, System, WasteStream
+    cmps = pc.create_asm1_cmps()
+    set_thermo(cmps)
+    asm1 = pc.ASM1()
+    influent = WasteStream('influent')
+    influent.set_flow_by_concentration(
+        2000, 
+        concentrations=dict(S_I=30, S_S=69.5, X_I=51.2, X_S=202.32, X_BH=28.17, 
+                            S_NH=31.56, S_ND=6.95, X_ND=10.59, S_ALK=84),
+        units=('m3/d', 'mg/L'),
+    )
+    # Start from a seeded, aerated sludge (rates are undefined without biomass)
+    init_conc = dict(S_I=30, S_S=5, X_I=1000, X_S=100, X_BH=500, X_BA=100, 
+                     X_P=100, S_O=2, S_NO=20, S_NH=2, S_ND=1, X_ND=5, S_ALK=84)
+    M1 = su.Mixer('Mix', ins=(influent, 'RAS'), init_with='WasteStream')
+    reactors = []
+    inlet = M1-0
+    for i in range(N_reactors):
+        R = su.CSTR(f'R{i}', ins=inlet, V_max=1000, aeration=2, DO_ID='S_O',
+                    suspended_growth_model=asm1)
+        R.set_init_conc(**init_conc)
+        reactors.append(R)
+        inlet = R-0
+    S1 = su.Splitter('Split', ins=inlet, outs=(M1.ins[1], 'Eff'), split=0.5,
+                     init_with='WasteStream')
+    return System('multi_reactor_sys', path=(M1, *reactors, S1), recycle=S1-0)
+
+def benchmark(N_reactors, t_span=(0, 1)):
+    sys = create_multi_reactor_system(N_reactors)
+    results = {}
+    for sparse_jacobian in (False, True):
+        start = perf_counter()
+        sys.simulate(t_span=t_span, method='Radau', state_reset_hook='reset_cache',
+                     sparse_jacobian=sparse_jacobian)
+        time = perf_counter() - start
+        results[sparse_jacobian] = (time, sys.scope.sol.nfev)
+    (dense_time, dense_nfev), (sparse_time, sparse_nfev) = results[False], results[True]
+    print(f"{N_reactors:>3} reactors ({sys._state.size} states): "
+          f"dense {dense_time:.2f} s ({dense_nfev} evaluations), "
+          f"sparse {sparse_time:.2f} s ({sparse_nfev} evaluations), "
+          f"speedup {dense_time / sparse_time:.1f}x")
+
+if __name__ == '__main__':
+    for N_reactors in (3, 5, 10, 20):
+        benchmark(N_reactors)
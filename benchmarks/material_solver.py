@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Benchmark of the dense and sparse material balance solvers used in 
+phenomena-based simulation on countercurrent cascades (banded systems)
+where chemicals share stage-wise split factors in groups of three. The 
+dense solver assembles one dense matrix per chemical while the sparse 
+solver factorizes each distinct matrix once.
+
+Run with `python benchmarks/material_solver.py`.
+"""
+from biosteam._system import solve_sparse_material_balances
+from biosteam.utils import dictionaries2array
+from numpy.linalg import solve
+import numpy as np
+from time import perf_counter
+
+def create_cascade(N_stages, N_chemicals=30, seed=0):
+    rng = np.random.default_rng(seed)
+    split = rng.uniform(0.4, 0.6, [N_stages, N_chemicals // 3]).repeat(3, axis=1)
+    feed = np.zeros([N_stages, N_chemicals])
+    feed[N_stages // 2] = 100
+    A = []
+    b = []
+    for i in range(N_stages):
+        # vapor (i, 'g') and liquid (i, 'l') leaving stage i
+        coefficients = {(i, 'g'): 1, (i, 'l'): 1}
+        if i: coefficients[(i - 1, 'l')] = -1
+        if i != N_stages - 1: coefficients[(i + 1, 'g')] = -1
+        A.append(coefficients)
+        b.append(feed[i])
+        A.append({(i, 'g'): 1 - split[i], (i, 'l'): -split[i]})
+        b.append(np.zeros(N_chemicals))
+    return A, b
+
+def solve_dense(A, b):
+    A, keys = dictionaries2array(A)
+    b = np.array(b)
+    return np.array([solve(A[i], b[:, i]) for i in range(b.shape[1])]).T, keys
+
+def best_time(f, repeats, *args):
+    times = []
+    for i in range(repeats):
+        start = perf_counter()
+        f(*args)
+        times.append(perf_counter() - start)
+    return 1e3 * min(times)
+
+def run(stages=(10, 50, 100, 200, 400), repeats=5):
+    print(f"{'Stages':>6} {'Dense [ms]':>11} {'Sparse [ms]':>12} {'Speedup':>8}")
+    for N in stages:
+        A, b = create_cascade(N)
+        dense, keys_dense = solve_dense(A, b)
+        sparse, keys_sparse = solve_sparse_material_balances(A, b)
+        index = {j: i for i, j in enumerate(keys_sparse)}
+        assert np.allclose(dense, sparse[[index[i] for i in keys_dense]])
+        t_dense = best_time(solve_dense, repeats, A, b)
+        t_sparse = best_time(solve_sparse_material_balances, repeats, A, b)
+        print(f"{N:>6} {t_dense:>11.2f} {t_sparse:>12.2f} {t_dense / t_sparse:>8.1f}")
+
+if __name__ == '__main__':
+    run()
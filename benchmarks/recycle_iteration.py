@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Microbenchmark of the per-iteration overhead of recycle convergence 
+(setting recycle data, collecting recycle states, computing errors, and 
+packing new recycle data) excluding unit simulations. The legacy overhead 
+copies recycle flows into new sparse arrays and stacks recycle data at each 
+iteration while the preallocated RecycleBuffer works in place.
+
+Run with `python benchmarks/recycle_iteration.py`.
+"""
+import biosteam as bst
+import numpy as np
+from time import perf_counter
+
+chemicals = ['Water', 'Ethanol', 'Methanol', 'Glycerol', 'Propanol', 
+             'Butanol', 'AceticAcid', 'Acetone', 'Hexane', 'Octane']
+
+def create_many_recycle_system(N_recycles):
+    bst.main_flowsheet.clear()
+    bst.settings.set_thermo(chemicals, cache=True)
+    path = []
+    recycles = []
+    for i in range(N_recycles):
+        feed = bst.Stream(**{j: 10. for j in chemicals})
+        recycle = bst.Stream()
+        M = bst.Mixer(ins=[feed, recycle])
+        S = bst.Splitter(ins=M-0, outs=('', recycle), split=0.5)
+        path.extend([M, S])
+        recycles.append(recycle)
+    system = bst.System(None, path=path, recycle=recycles)
+    system.simulate()
+    return system
+
+def legacy_iteration_overhead(system, data):
+    data[data < 0.] = 0.
+    system._set_recycle_data(data)
+    T = system._get_recycle_temperatures()
+    mol = system._get_recycle_mol()
+    # Units would be simulated here
+    mol_new = system._get_recycle_mol()
+    T_new = system._get_recycle_temperatures()
+    mol_errors = abs(mol - mol_new)
+    if mol_errors.any():
+        mol_error = mol_errors.max()
+        if mol_error > 1e-12:
+            nonzero_index = mol_errors.nonzero_index()
+            mol_errors = mol_errors[nonzero_index]
+            max_errors = np.maximum.reduce([abs(mol[nonzero_index]), abs(mol_new[nonzero_index])])
+            (mol_errors / max_errors).max()
+    T_errors = abs(T - T_new)
+    T_errors.max()
+    (T_errors / T).max()
+    return system._get_recycle_data()
+
+def buffered_iteration_overhead(system, data):
+    buffer = system._recycle_buffer
+    buffer.set_data(data)
+    buffer.load_state()
+    # Units would be simulated here
+    buffer.load_new_state()
+    buffer.mol_errors()
+    buffer.T_errors()
+    return buffer.get_data()
+
+def time_per_iteration(f, system, iterations):
+    data = system._get_recycle_data()
+    f(system, data) # Warm up
+    start = perf_counter()
+    for i in range(iterations): data = f(system, data)
+    return 1e6 * (perf_counter() - start) / iterations
+
+def run(recycles=(1, 5, 10, 20, 40), iterations=200):
+    print(f"{'Recycles':>8} {'Legacy [us]':>12} {'Buffered [us]':>14} {'Speedup':>8}")
+    for N in recycles:
+        system = create_many_recycle_system(N)
+        system._load_recycle_buffer()
+        legacy = time_per_iteration(legacy_iteration_overhead, system, iterations)
+        buffered = time_per_iteration(buffered_iteration_overhead, system, iterations)
+        print(f"{N:>8} {legacy:>12.1f} {buffered:>14.1f} {legacy / buffered:>8.1f}")
+
+if __name__ == '__main__':
+    run()
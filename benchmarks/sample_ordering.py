@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Benchmark of sample ordering algorithms for Monte Carlo evaluation: the time 
+to sort increasing numbers of samples and the total number of recycle loop 
+iterations needed to evaluate a model with a recycle in each order. The dense 
+nearest neighbor walk is skipped for sample sizes where its distance matrix 
+would not fit in memory.
+
+Run with `python benchmarks/sample_ordering.py`.
+"""
+import biosteam as bst
+import numpy as np
+from time import perf_counter
+from biosteam.evaluation.evaluation_tools import get_sample_order
+
+algorithms = ('nearest neighbor', 'kd-tree', 'hilbert', 'morton')
+
+def time_ordering(sizes=(1_000, 5_000, 100_000, 1_000_000), N_parameters=4):
+    print(f"{'Samples':>9} " + ' '.join([f"{i + ' [s]':>20}" for i in algorithms]))
+    for N in sizes:
+        points = np.random.rand(N, N_parameters)
+        times = []
+        for algorithm in algorithms:
+            if algorithm == 'nearest neighbor' and N > 10_000:
+                times.append(f"{'-':>20}")
+                continue
+            start = perf_counter()
+            get_sample_order(points, algorithm=algorithm)
+            times.append(f"{perf_counter() - start:>20.2f}")
+        print(f"{N:>9} " + ' '.join(times))
+
+def create_recycle_model():
+    bst.main_flowsheet.clear()
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream('feed', Water=800, Ethanol=200)
+    recycle = bst.Stream('recycle')
+    M1 = bst.Mixer('M1', ins=[feed, recycle])
+    H1 = bst.HXutility('H1', ins=M1-0, T=350)
+    F1 = bst.Flash('F1', ins=H1-0, outs=('vapor', 'liquid'), P=101325, V=0.5)
+    S1 = bst.Splitter('S1', ins=F1-1, outs=(recycle, 'product'), split=0.5)
+    sys = bst.System('sys', path=[M1, H1, F1, S1], recycle=recycle)
+    model = bst.Model(sys)
+    
+    @model.parameter(element=H1, bounds=(345, 360), units='K')
+    def set_temperature(T):
+        H1.T = T
+    
+    @model.parameter(element=F1, bounds=(0.2, 0.8))
+    def set_vapor_fraction(V):
+        F1.V = V
+    
+    @model.parameter(element=S1, bounds=(0.2, 0.8))
+    def set_split(split):
+        S1.split[:] = split
+    
+    @model.indicator
+    def recycle_iterations():
+        return sys._iter
+    
+    return model
+
+def count_iterations(N_samples=500):
+    model = create_recycle_model()
+    samples = model.sample(N_samples, 'L')
+    print(f"{'Order':>17} {'Iterations':>11} {'Time [s]':>9}")
+    for algorithm in (None, *algorithms):
+        model.load_samples(samples, sort=algorithm is not None, algorithm=algorithm)
+        start = perf_counter()
+        model.evaluate()
+        time = perf_counter() - start
+        iterations = int(model.table.values[:, -1].sum())
+        print(f"{algorithm or 'unsorted':>17} {iterations:>11} {time:>9.2f}")
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    time_ordering()
+    count_iterations()
@@ -30,15 +30,15 @@ from scipy.optimize import root
 from .exceptions import try_method_with_object_stamp, Converged, UnitInheritanceError
 from thermosteam import Network, mark_disjunction, unmark_disjunction
 from ._facility import Facility
-from ._unit import Unit
+from ._unit import Unit, UnitDesignAndCapital
 from thermosteam.network import repr_ins_and_outs
 from . import utils
 from .utils import (
     repr_items, ignore_docking_warnings,
-    piping, colors, list_available_names, dictionaries2array,
-    Timer
+    piping, colors, list_available_names,
+    Timer, SimulationProfiler, check_deadline
 )
-from .process_tools import get_power_utilities, get_heat_utilities
+from .process_tools import get_power_utilities, get_heat_utilities, select_tears
 from collections import abc
 from warnings import warn
 from inspect import signature
@@ -48,18 +48,23 @@ import numpy as np
 import pandas as pd
 from numpy.linalg import solve
 from scipy.integrate import solve_ivp
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import splu
 from . import report
 from thermosteam.network import temporary_units_dump, TemporaryUnit
 import os
+import numbers
+import pickle
 import openpyxl
 import thermosteam as tmo
 from itertools import product
+from collections import OrderedDict
 if TYPE_CHECKING: 
     from ._tea import TEA
     from .evaluation import Response
 
 __all__ = ('System', 'AgileSystem', 'MockSystem',
-           'AgileSystem', 'OperationModeResults',
+           'AgileSystem', 'OperationModeResults', 'RecycleStateCache', 'SystemSnapshot',
            'mark_disjunction', 'unmark_disjunction')
 
 # %% Miscillaneous
@@ -94,6 +99,147 @@ def get_material_values(indexer_phases):
         containers.append(indexer.data.rows[index])
     return containers, SparseArray.from_rows(containers).to_array()
 
+class BalanceStructure:
+    """
+    Create a BalanceStructure object that compiles the sparsity pattern of 
+    balance equations once so that only numerical coefficients need to be
+    collected on subsequent iterations.
+    
+    Parameters
+    ----------
+    signature : list[tuple]
+        Coefficient keys of each equation as given by stages. The structure 
+        is only valid for equations with the same signature.
+    references : Iterable[Iterable[Hashable]]
+        Variables (columns of the coefficient matrix) of each equation.
+        Repeated variables within an equation take the last coefficient.
+    
+    """
+    __slots__ = ('signature', 'keys', 'rows', 'columns', 'positions', 
+                 'shape', 'buffer')
+    
+    def __init__(self, signature, references):
+        keys = {}
+        rows = []
+        columns = []
+        positions = []
+        position = 0
+        for row, variables in enumerate(references):
+            entries = {}
+            for i in variables:
+                if i in keys:
+                    column = keys[i]
+                else:
+                    keys[i] = column = len(keys)
+                entries[column] = position
+                position += 1
+            rows.extend([row] * len(entries))
+            columns.extend(entries)
+            positions.extend(entries.values())
+        self.signature = signature
+        self.keys = (*keys,)
+        self.rows = np.array(rows, int)
+        self.columns = np.array(columns, int)
+        self.positions = positions
+        self.shape = (len(signature), len(keys))
+        self.buffer = None
+        
+    @classmethod
+    def from_dictionaries(cls, dictionaries):
+        signature = [(*i,) for i in dictionaries]
+        return cls(signature, signature)
+        
+    def coefficient_data(self, coefficients, shape=()):
+        """Return an array of nonzero coefficients given a flat list of all 
+        coefficients in equation order."""
+        values = [coefficients[j] for j in self.positions]
+        data = np.empty([len(values), *shape])
+        if shape:
+            # Fill scalar and array coefficients in two vectorized passes 
+            # (builtin numbers are checked first as np.ndim is slow)
+            arrays = np.array([
+                not (i.__class__ is float or i.__class__ is int) and np.ndim(i) != 0 
+                for i in values
+            ], bool)
+            if arrays.any():
+                data[arrays] = [i for i, j in zip(values, arrays) if j]
+            if not arrays.all():
+                scalars = ~arrays
+                data[scalars] = np.array(
+                    [i for i, j in zip(values, scalars) if j], float
+                ).reshape([-1, *[1]*len(shape)])
+        else:
+            data[:] = values
+        if np.isnan(data).any(): raise RuntimeError('invalid number encountered')
+        return data
+    
+    def dense(self, data):
+        """Return dense coefficient matrices (by chemical, if any) given 
+        nonzero coefficients. The array is a preallocated buffer which is 
+        overwritten on the next call."""
+        shape = (*data.shape[1:], *self.shape)
+        buffer = self.buffer
+        if buffer is None or buffer.shape != shape:
+            self.buffer = buffer = np.zeros(shape)
+        buffer[..., self.rows, self.columns] = np.moveaxis(data, 0, -1)
+        return buffer
+    
+    def solve_dense(self, data, b):
+        """Solve one dense linear system per chemical and return values by
+        variable and chemical."""
+        A = self.dense(data)
+        if A.ndim == 2: return solve(A, b)
+        return solve(A, b.T[..., None])[..., 0].T
+    
+    def solve_sparse(self, data, b):
+        """Solve linear systems assembled in CSC format, factorizing once for 
+        each distinct set of coefficients so that all chemicals sharing 
+        coefficients are solved together. Return values by variable and 
+        chemical."""
+        N_equations, N_variables = shape = self.shape
+        if N_equations != N_variables:
+            raise np.linalg.LinAlgError('coefficient matrix must be square')
+        rows = self.rows
+        columns = self.columns
+        values = np.empty([N_variables, b.shape[1]])
+        patterns, inverse = np.unique(data.T, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        for n, pattern in enumerate(patterns):
+            mask = inverse == n
+            A = csc_matrix((pattern, (rows, columns)), shape=shape)
+            values[:, mask] = splu(A).solve(b[:, mask])
+        return values
+
+def material_reference(stream):
+    return stream.material_reference
+
+def energy_reference(key):
+    obj, variable = key
+    return (getattr(obj, 'material_reference', obj), variable)
+
+def solve_sparse_material_balances(dictionaries, b):
+    """
+    Solve material balances (one linear system per chemical) given the
+    coefficients of each equation as dictionaries and the right hand sides
+    as a 2d array (equation by chemical). Coefficient matrices are assembled
+    in CSC format and factorized once for each distinct set of coefficients, 
+    so that all chemicals sharing coefficients are solved together.
+    
+    Returns
+    -------
+    values : 2d array
+        Solution by variable and chemical.
+    keys : tuple
+        Variables (columns of the coefficient matrix).
+    
+    """
+    structure = BalanceStructure.from_dictionaries(dictionaries)
+    b = np.asarray(b, dtype=float)
+    data = structure.coefficient_data(
+        [j for i in dictionaries for j in i.values()], b.shape[1:]
+    )
+    return structure.solve_sparse(data, b), structure.keys
+
 class Configuration:
     __slots__ = ('path', 'stages', 'streams',
                  'stream_ref', 'connections', 'aggregated',
@@ -101,10 +247,13 @@ class Configuration:
                  'composition_sensitive_stages',
                  '_has_dynamic_coefficients',
                  'material_relaxation_factor',
-                 'energy_relaxation_factor')
+                 'energy_relaxation_factor',
+                 'material_solver',
+                 '_structures')
     
     def __init__(self, path, stages, streams, stream_ref, connections, 
-                 aggregated, material_relaxation_factor, energy_relaxation_factor):
+                 aggregated, material_relaxation_factor, energy_relaxation_factor,
+                 material_solver='dense'):
         self.path = path
         self.stages = stages
         self.streams = streams
@@ -115,6 +264,41 @@ class Configuration:
         self.composition_sensitive_stages =  [i for i in stages if getattr(i, 'composition_sensitive', False) or isinstance(i, Stream)]
         self.material_relaxation_factor = material_relaxation_factor
         self.energy_relaxation_factor = energy_relaxation_factor
+        self.material_solver = material_solver
+        self._structures = {}
+    
+    def balance_structure(self, name, equations, reference):
+        """
+        Return the compiled structure of the given balance equations. The 
+        structure is compiled once and reused as long as the same equations 
+        (by coefficient keys) refer to the same variables.
+        """
+        signature = [(*i,) for i, j in equations]
+        structures = self._structures
+        if name in structures:
+            structure, objects, references = structures[name]
+            if (structure.signature == signature
+                and [reference(i) for i in objects] == references):
+                return structure
+        objects = [*{j: None for i in signature for j in i}]
+        references = [reference(i) for i in objects]
+        variables = dict(zip(objects, references))
+        structure = BalanceStructure(
+            signature, [[variables[j] for j in i] for i in signature]
+        )
+        structures[name] = (structure, objects, references)
+        return structure
+    
+    def material_balance_equations(self, stages, composition_sensitive):
+        equations = []
+        for stage in stages:
+            f = stage._create_material_balance_equations
+            try: eqs = f(composition_sensitive)
+            except TypeError as e: 
+                try: eqs = f()
+                except: raise e from None
+            equations.extend(eqs)
+        return equations
     
     def get_composition_sensitive_flows(self):
         streams = []
@@ -151,22 +335,12 @@ class Configuration:
                 i._update_nonlinearities()
         
         if self.composition_sensitive_path:
-            stages = self.composition_sensitive_stages
-            A = []
-            b = []
-            for stage in stages:
-                f = stage._create_material_balance_equations
-                try: eqs = f(True)
-                except TypeError as e: 
-                    try: eqs = f()
-                    except: raise e from None
-                for coefficients, value in eqs:
-                    coefficients = {
-                        i.material_reference: j for i, j in coefficients.items()
-                    }
-                    A.append(coefficients)
-                    b.append(value)
-            A, objs = dictionaries2array(A)
+            equations = self.material_balance_equations(
+                self.composition_sensitive_stages, True
+            )
+            objs = self.balance_structure(
+                'composition sensitive material', equations, material_reference
+            ).keys
             containers, flows = get_material_values(objs)            
             
             def update_inner_material_balance_parameters(flows):
@@ -206,20 +380,8 @@ class Configuration:
         else:
             stages = self.stages
             relaxation_factor = self.material_relaxation_factor
-        A = []
-        b = []
-        for stage in stages:
-            f = stage._create_material_balance_equations
-            try: eqs = f(composition_sensitive)
-            except TypeError as e: 
-                try: eqs = f()
-                except: raise e from None
-            for coefficients, value in eqs:
-                coefficients = {
-                    i.material_reference: j for i, j in coefficients.items()
-                }
-                A.append(coefficients)
-                b.append(value)
+        equations = self.material_balance_equations(stages, composition_sensitive)
+        b = [j for i, j in equations]
         delayed = self.dynamic_coefficients(b)
         if delayed:
             raise NotImplementedError('delayed coefficients')
@@ -250,10 +412,19 @@ class Configuration:
             # for obj, value in zip(objs, values): 
             #     obj._update_material_flows(value, delayed_index)
         else:
-            A, objs = dictionaries2array(A)
-            if np.isnan(A).any(): raise RuntimeError('invalid number encountered')
+            structure = self.balance_structure(
+                'composition sensitive material' if composition_sensitive else 'material',
+                equations, material_reference
+            )
+            objs = structure.keys
             b = np.array(b)
-            values = np.array([solve(A[i], b[:, i]) for i in range(b.shape[1])]).T
+            data = structure.coefficient_data(
+                [j for i, _ in equations for j in i.values()], b.shape[1:]
+            )
+            if self.material_solver == 'sparse':
+                values = structure.solve_sparse(data, b)
+            else:
+                values = structure.solve_dense(data, b)
             if np.isnan(values).any(): raise RuntimeError('invalid number encountered')
             if relaxation_factor is not None:
                 containers, old_values = get_material_values(objs)
@@ -296,20 +467,18 @@ class Configuration:
         
     def solve_energy_flows(self):
         stages = self.stages
-        A = []
-        b = []
+        equations = []
         for stage in stages:
-            for coefficients, value in stage._create_energy_balance_equations():
-                A.append(coefficients)
-                b.append(value)
-        if not A: return
+            equations.extend(stage._create_energy_balance_equations())
+        if not equations: return
         for stage in stages:
-            for coefficients, value in stage._create_bulk_balance_equations():
-                A.append(coefficients)
-                b.append(value)
-        A = [{(getattr(i, 'material_reference', i), v): j for (i, v), j in x.items()} for x in A]
-        A, objs = dictionaries2array(A)
-        values = solve(A, np.array(b).T).T
+            equations.extend(stage._create_bulk_balance_equations())
+        structure = self.balance_structure('energy', equations, energy_reference)
+        objs = structure.keys
+        A = structure.dense(
+            structure.coefficient_data([j for i, _ in equations for j in i.values()])
+        )
+        values = solve(A, np.array([j for i, j in equations]).T).T
         if np.isnan(values).any(): raise RuntimeError('invalid number encountered')
         for (obj, var), value in zip(objs, values):
             if var == 'F_mol':
@@ -523,6 +692,237 @@ class JointRecycleData:
         return f"{type(self).__name__}(recycles=[{recycles}], responses=[{responses}])"
 
 
+class RecycleStateCache:
+    """
+    Create a RecycleStateCache object that stores converged recycle states 
+    (temperature, pressure, and molar flow rates of all recycle streams) 
+    by sample (e.g., parameter values of a Model) and warm-starts 
+    recycles from the nearest stored sample. The least recently used states 
+    are discarded once the cache is full.
+    
+    Parameters
+    ----------
+    max_size : 
+        Maximum number of states stored. Defaults to 1000.
+    max_memory :
+        Maximum memory of the (preallocated) buffers of samples and states 
+        [MB]. Defaults to no limit.
+    interpolate :
+        Whether to interpolate states from the nearest neighbors by inverse 
+        distance weighting. Defaults to False.
+    neighbors :
+        Number of neighbors for interpolation. Defaults to 2.
+    file :
+        Name of npz file to load states from (if it exists) and save states to.
+    
+    Examples
+    --------
+    Warm-start a Monte Carlo evaluation with a cache saved to disk:
+    
+    >>> # model.system.recycle_state_cache = bst.RecycleStateCache(file='states.npz')
+    >>> # model.evaluate(file='results.pckl', autosave=20)
+    
+    Notes
+    -----
+    Distances between samples are normalized by the range of each
+    dimension of the stored samples.
+    
+    """
+    __slots__ = ('max_size', 'max_memory', 'interpolate', 'neighbors', 
+                 'file', 'layout', '_states', '_keys', '_samples', 
+                 '_data', '_unsaved')
+    
+    def __init__(self, 
+            max_size: Optional[int]=None, 
+            max_memory: Optional[float]=None, 
+            interpolate: Optional[bool]=False, 
+            neighbors: Optional[int]=2, 
+            file: Optional[str]=None,
+        ):
+        self.max_size = 1000 if max_size is None else max_size
+        self.max_memory = max_memory
+        self.interpolate = interpolate
+        self.neighbors = neighbors
+        self.file = file
+        self.clear()
+        if file is not None and os.path.exists(file): self.load(file)
+        
+    def clear(self):
+        """Remove all stored states."""
+        #: [tuple[tuple[str, int], ...]|None] Recycle IDs and data sizes.
+        self.layout = None
+        #: [OrderedDict[bytes, int]] Rows of stored states by sample, from least to most recently used.
+        self._states = OrderedDict()
+        #: [list[bytes]] Samples by row.
+        self._keys = []
+        #: [2d array|None] Buffer of stored samples by row.
+        self._samples = None
+        #: [2d array|None] Buffer of stored states by row.
+        self._data = None
+        #: [bool] Whether states were stored since the last save.
+        self._unsaved = False
+        
+    def __len__(self):
+        return len(self._states)
+    
+    @staticmethod
+    def get_layout(system):
+        """Return recycle IDs and data sizes of a system."""
+        return tuple([(i.ID, i.imol.data.size + 2) for i in system.get_all_recycles()])
+    
+    @property
+    def memory(self):
+        """Memory of the (preallocated) buffers of samples and states [MB]."""
+        if self._samples is None: return 0.
+        return (self._samples.nbytes + self._data.nbytes) / 1e6
+    
+    def _capacity(self, nbytes):
+        # Maximum number of rows of the buffers given the bytes of each row
+        capacity = self.max_size
+        max_memory = self.max_memory
+        if max_memory: capacity = min(capacity, max(int(max_memory * 1e6 // nbytes), 1))
+        return capacity
+    
+    def _check_layout(self, layout):
+        if self.layout is None: 
+            self.layout = layout
+        elif self.layout != layout:
+            raise ValueError('recycle layout of system does not match cache')
+        
+    def record(self, sample, system):
+        """Store converged recycle state of system for the given sample."""
+        recycles = system.get_all_recycles()
+        if not recycles: return
+        self._check_layout(self.get_layout(system))
+        sample = np.array(sample, dtype=float)
+        state = np.hstack([get_recycle_data(i) for i in recycles])
+        self._store(sample, state)
+        
+    def _store(self, sample, state):
+        states = self._states
+        keys = self._keys
+        key = sample.tobytes()
+        row = states.get(key)
+        if row is None:
+            samples = self._samples
+            capacity = self._capacity(sample.nbytes + state.nbytes)
+            if samples is None or samples.shape[1] != sample.size or self._data.shape[1] != state.size:
+                if keys: raise ValueError('sample or state size does not match cache')
+                size = min(16, capacity)
+                self._samples = np.empty([size, sample.size])
+                self._data = np.empty([size, state.size])
+            elif len(keys) >= samples.shape[0]:
+                size = samples.shape[0]
+                if size < capacity: # Grow buffers geometrically
+                    new = min(2 * size, capacity) - size
+                    self._samples = np.vstack([samples, np.empty([new, sample.size])])
+                    self._data = np.vstack([self._data, np.empty([new, state.size])])
+                else: # Reuse the row of the least recently used state
+                    self._discard(*states.popitem(last=False))
+            row = len(keys)
+            keys.append(key)
+        else:
+            states.move_to_end(key)
+        states[key] = row
+        self._samples[row] = sample
+        self._data[row] = state
+        self._unsaved = True
+        while len(states) > self.max_size:
+            self._discard(*states.popitem(last=False))
+    
+    def _discard(self, key, row):
+        # Move the last row into the discarded row to keep buffers contiguous
+        keys = self._keys
+        samples = self._samples
+        data = self._data
+        last = len(keys) - 1
+        if row != last:
+            last_key = keys[last]
+            keys[row] = last_key
+            samples[row] = samples[last]
+            data[row] = data[last]
+            self._states[last_key] = row
+        keys.pop()
+    
+    def predict(self, sample):
+        """Return recycle state from the nearest stored sample(s) or None if empty."""
+        if not self._states: return None
+        keys = self._keys
+        N = len(keys)
+        samples = self._samples[:N]
+        states = self._data[:N]
+        scale = samples.max(axis=0) - samples.min(axis=0)
+        scale[scale == 0] = 1.
+        distances = np.sqrt((((samples - sample) / scale) ** 2).sum(axis=1))
+        if self.interpolate and len(keys) > 1:
+            N = min(self.neighbors, len(keys))
+            index = np.argpartition(distances, N - 1)[:N]
+            distances = distances[index]
+            if (distances == 0).any():
+                index = index[distances == 0][:1]
+                state = states[index[0]].copy()
+            else:
+                weights = 1. / distances
+                weights /= weights.sum()
+                state = weights @ states[index]
+        else:
+            index = [distances.argmin()]
+            state = states[index[0]].copy()
+        for i in index: self._states.move_to_end(keys[i])
+        return state
+    
+    def warm_start(self, sample, system):
+        """Set recycles of system with the state of the nearest stored 
+        sample(s) and return whether recycles were set."""
+        if not self._states: return False
+        recycles = system.get_all_recycles()
+        if not recycles: return False
+        self._check_layout(self.get_layout(system))
+        state = self.predict(np.asarray(sample, dtype=float))
+        index = 0
+        for i in recycles:
+            end = index + i.imol.data.size + 2
+            set_recycle_data(i, state[index:end])
+            index = end
+        return True
+    
+    def save(self, file=None):
+        """Save stored samples and states to an npz file."""
+        if file is None: file = self.file
+        if file is None: raise ValueError('no file given')
+        rows = [*self._states.values()]
+        if rows:
+            samples = self._samples[rows]
+            states = self._data[rows]
+        else:
+            samples = states = ()
+        layout = () if self.layout is None else self.layout
+        np.savez(
+            file, samples=np.array(samples), states=np.array(states), 
+            IDs=np.array([i for i, j in layout], dtype=str), 
+            sizes=np.array([j for i, j in layout], dtype=int),
+        )
+        if file == self.file: self._unsaved = False
+    
+    def load(self, file=None):
+        """Load samples and states from an npz file (in addition to any 
+        stored states)."""
+        if file is None: file = self.file
+        if file is None: raise ValueError('no file given')
+        with np.load(file) as data:
+            layout = tuple(zip(data['IDs'].tolist(), data['sizes'].tolist()))
+            samples = data['samples']
+            states = data['states']
+        if not len(samples): return
+        self._check_layout(layout)
+        unsaved = self._unsaved or file != self.file
+        for sample, state in zip(samples, states): self._store(sample, state)
+        self._unsaved = unsaved
+        
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self)} states>"
+
+
 def get_recycle_data(stream):
     """
     Return stream temperature, pressure, and molar flow rates as a
@@ -552,7 +952,469 @@ def set_recycle_data(stream, arr):
     TP._T =  TP._T * 0.5 if T == 0 else T
     TP._P = TP._P * 0.5 if P == 0. else P
     
-   
+
+class RecycleBuffer:
+    """
+    Create a RecycleBuffer object that preallocates packed recycle data 
+    (temperature, pressure, and molar flow rates of each recycle stream) 
+    with per-stream views, as well as work arrays to compute convergence 
+    errors in place.
+    
+    Parameters
+    ----------
+    recycles : 
+        All recycle streams (including those of subsystems).
+    tear_streams :
+        Recycle streams of the system (temperature errors are only 
+        computed for these streams).
+    
+    """
+    __slots__ = ('recycles', 'data', 'mol', 'mol_new', 'mol_work', 'mol_scale',
+                 'T', 'T_new', 'T_work', 'views', 'T_views', 'size')
+    
+    def __init__(self, recycles, tear_streams):
+        self.recycles = recycles
+        sizes = [i.imol.data.size for i in recycles]
+        N_mol = sum(sizes)
+        self.size = size = N_mol + 2 * len(recycles)
+        self.data = data = np.zeros(size)
+        self.mol = mol = np.zeros(N_mol)
+        self.mol_new = mol_new = np.zeros(N_mol)
+        self.mol_work = np.zeros(N_mol)
+        self.mol_scale = np.zeros(N_mol)
+        N_T = len(tear_streams)
+        self.T = np.zeros(N_T)
+        self.T_new = np.zeros(N_T)
+        self.T_work = np.zeros(N_T)
+        #: list[tuple[Stream, int, int, array, array, array]] Stream, flow rate
+        #: size, index in data, and views of flow rates in data, mol, and mol_new.
+        self.views = views = []
+        index = 0
+        start = 0
+        for stream, N in zip(recycles, sizes):
+            end = start + N
+            views.append(
+                (stream, N, index, data[index + 2:index + 2 + N],
+                 mol[start:end], mol_new[start:end])
+            )
+            index += N + 2
+            start = end
+        #: list[tuple[int, Stream]] Index in temperature arrays and tear stream.
+        self.T_views = [*enumerate([i for i in recycles if i in tear_streams])]
+        
+    def set_data(self, data):
+        """Set recycle streams with packed data (negative values are set to zero)."""
+        np.maximum(data, 0., out=data)
+        np.copyto(self.data, data)
+        for stream, N, index, flows, mol, mol_new in self.views:
+            sparse = stream.imol.data
+            if sparse.size != N: 
+                raise IndexError(f'expected {N} elements; got {sparse.size} instead')
+            sparse.from_flat_array(flows)
+            TP = stream._thermal_condition
+            T = float(data[index]) # ndfloat objects are slow and parasitic (don't go away)
+            P = float(data[index + 1])
+            TP._T =  TP._T * 0.5 if T == 0 else T
+            TP._P = TP._P * 0.5 if P == 0. else P
+        
+    def load_state(self):
+        """Load molar flow rates and temperatures of recycle streams."""
+        for stream, N, index, flows, mol, mol_new in self.views:
+            stream.imol.data.to_flat_array(mol)
+        T = self.T
+        for n, stream in self.T_views: T[n] = stream.T
+        
+    def load_new_state(self):
+        """Load data, molar flow rates, and temperatures of recycle streams 
+        after running the system."""
+        data = self.data
+        for stream, N, index, flows, mol, mol_new in self.views:
+            sparse = stream.imol.data
+            if sparse.size != N: 
+                raise IndexError(f'expected {N} elements; got {sparse.size} instead')
+            sparse.to_flat_array(flows)
+            np.copyto(mol_new, flows)
+            TP = stream._thermal_condition
+            data[index] = TP.T
+            data[index + 1] = TP.P
+        T_new = self.T_new
+        for n, stream in self.T_views: T_new[n] = stream.T
+        
+    def mol_errors(self):
+        """Return absolute and relative molar flow rate errors."""
+        work = self.mol_work
+        if not work.size: return 0., 0.
+        np.subtract(self.mol, self.mol_new, out=work)
+        np.abs(work, out=work)
+        mol_error = work.max()
+        if mol_error > 1e-12:
+            scale = self.mol_scale
+            np.abs(self.mol, out=scale)
+            np.maximum(scale, np.abs(self.mol_new, out=self.mol_new), out=scale)
+            np.maximum(scale, 1e-300, out=scale) # Errors are zero where flows are zero
+            np.divide(work, scale, out=work)
+            rmol_error = work.max()
+        else:
+            rmol_error = mol_error
+        return float(mol_error), float(rmol_error)
+    
+    def T_errors(self):
+        """Return absolute and relative temperature errors."""
+        work = self.T_work
+        if not work.size: return 0., 0.
+        np.subtract(self.T, self.T_new, out=work)
+        np.abs(work, out=work)
+        T_error = work.max()
+        np.divide(work, self.T, out=work)
+        return float(T_error), float(work.max())
+    
+    def get_data(self):
+        """Return a copy of the packed data."""
+        return self.data.copy()
+
+
+class RecycleHistory:
+    """
+    Create a RecycleHistory object that records recycle data (temperature, 
+    pressure, and molar flow rates) in a preallocated ring buffer, keeping 
+    only the most recent records.
+    
+    Parameters
+    ----------
+    maxlen :
+        Maximum number of records.
+    
+    """
+    __slots__ = ('maxlen', 'records', 'rows', 'length', 'index')
+    
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self.records = None
+        self.rows = None
+        self.clear()
+    
+    def clear(self):
+        """Remove all records."""
+        self.length = 0
+        self.index = 0
+        
+    def append(self, stream):
+        """Record temperature, pressure, and molar flow rates of stream."""
+        records = self.records
+        size = stream.imol.data.size + 2
+        if records is None or records.shape[1] != size:
+            self.records = records = np.zeros([self.maxlen, size])
+            self.rows = [(i[2:], i[:2]) for i in records]
+            self.clear()
+        flows, TP = self.rows[self.index]
+        stream.imol.data.to_flat_array(flows)
+        TP[0] = stream.T
+        TP[1] = stream.P
+        self.index = (self.index + 1) % self.maxlen
+        if self.length < self.maxlen: self.length += 1
+        
+    def __len__(self):
+        return self.length
+    
+    def to_array(self):
+        """Return records in chronological order as a 2d array (temperature, 
+        pressure, and molar flow rates by row)."""
+        if self.records is None: return np.zeros([0, 0])
+        if self.length < self.maxlen:
+            return self.records[:self.length].copy()
+        else:
+            return np.roll(self.records, -self.index, axis=0)
+        
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.length} of {self.maxlen} records>"
+    
+
+class SystemSnapshot:
+    """
+    Create a SystemSnapshot object that stores the state of streams 
+    (temperature, pressure, phases, and molar flow rates) and the design 
+    and cost results of unit operations (including power and heat utilities)
+    in a single contiguous array, so that restoring the state is mostly a 
+    bulk array copy. Snapshots can be saved to and loaded from 
+    uncompressed .npz files (optionally memory-mapped).
+    
+    Parameters
+    ----------
+    data :
+        Packed numerical data.
+    stream_layout :
+        ID, phases, and molar flow rate size of each stream.
+    unit_layout :
+        ID, number of auxiliary units, result items, whether costs are 
+        loaded, and heat utility layouts of each unit (auxiliary units 
+        follow their parent unit).
+    streams :
+        Streams bound to the stream layout.
+    units :
+        Unit operations bound to the unit layout.
+    
+    Examples
+    --------
+    >>> # snapshot = system.snapshot()
+    >>> # system.simulate() # Change the state of the system
+    >>> # system.restore(snapshot) # Roll back
+    >>> # snapshot.save('baseline.npz')
+    >>> # system.restore(bst.SystemSnapshot.load('baseline.npz', mmap_mode='r'))
+    
+    """
+    __slots__ = ('data', 'stream_layout', 'unit_layout', 'streams', 'units')
+    
+    #: Names of unit operation result dictionaries stored.
+    result_names = ('design_results', 'baseline_purchase_costs', 
+                    'purchase_costs', 'installed_costs', 'F_BM', 'F_D', 
+                    'F_P', 'F_M', 'parallel')
+    
+    #: Kinds of result items.
+    FLOAT, INTEGER, OBJECT = range(3)
+    
+    def __init__(self, data, stream_layout, unit_layout, streams=None, units=None):
+        self.data = data
+        self.stream_layout = stream_layout
+        self.unit_layout = unit_layout
+        self.streams = streams
+        self.units = units
+    
+    @classmethod
+    def from_elements(cls, streams, units):
+        """Return a SystemSnapshot object of the current state of the 
+        streams and unit operations."""
+        streams = list(streams)
+        units = [*_units_and_auxiliaries(units)]
+        stream_layout = tuple([
+            (i.ID, tuple(i.phases), i.imol.data.size) for i in streams
+        ])
+        size = sum([N + 2 for ID, phases, N in stream_layout])
+        unit_layout = []
+        isa = isinstance
+        Real = numbers.Real
+        FLOAT, INTEGER, OBJECT = cls.FLOAT, cls.INTEGER, cls.OBJECT
+        for unit in units:
+            results = []
+            for name in cls.result_names:
+                items = []
+                for key, value in getattr(unit, name).items():
+                    if isa(value, Real) and not isa(value, bool):
+                        if isa(value, numbers.Integral):
+                            items.append((key, INTEGER, None))
+                        else:
+                            items.append((key, FLOAT, None))
+                        size += 1
+                    else:
+                        items.append((key, OBJECT, value))
+                results.append(tuple(items))
+            heat_utilities = []
+            size += 2 # Power consumption and production
+            for hu in unit.heat_utilities:
+                size += 5 # Flow, duty, unit duty, cost, and heat transfer efficiency
+                agent = hu.agent
+                if agent:
+                    utility_streams = tuple([
+                        (tuple(i.phases), i.imol.data.size) 
+                        for i in _utility_streams(hu)
+                    ])
+                    size += sum([N + 2 for phases, N in utility_streams])
+                    heat_utilities.append((agent.ID, hu.hxn_ok, utility_streams))
+                else:
+                    heat_utilities.append((None, hu.hxn_ok, ()))
+            unit_layout.append(
+                (unit.ID, len(unit.auxiliary_units), tuple(results),
+                 getattr(unit, '_costs_loaded', False), tuple(heat_utilities))
+            )
+        data = np.zeros(size)
+        index = 0
+        for stream in streams:
+            index = _dump_stream(stream, data, index)
+        for unit, (ID, N_auxiliaries, results, costs_loaded, heat_utilities) in zip(units, unit_layout):
+            for name, items in zip(cls.result_names, results):
+                dct = getattr(unit, name)
+                for key, kind, value in items:
+                    if kind == OBJECT: continue
+                    data[index] = dct[key]
+                    index += 1
+            power_utility = unit.power_utility
+            data[index] = power_utility.consumption
+            data[index + 1] = power_utility.production
+            index += 2
+            for hu in unit.heat_utilities:
+                efficiency = hu.heat_transfer_efficiency
+                data[index:index + 5] = (
+                    hu.flow, hu.duty, hu.unit_duty, hu.cost,
+                    np.nan if efficiency is None else efficiency
+                )
+                index += 5
+                if hu.agent:
+                    for i in _utility_streams(hu): index = _dump_stream(i, data, index)
+        return cls(data, stream_layout, tuple(unit_layout), streams, units)
+    
+    def bind(self, system):
+        """Bind streams and unit operations of the system (by ID) to the
+        snapshot layout."""
+        streams = {i.ID: i for i in system.streams}
+        units = {i.ID: i for i in system.units}
+        try:
+            self.streams = [streams[ID] for ID, phases, N in self.stream_layout]
+        except KeyError as error:
+            raise ValueError(f"stream {error.args[0]!r} not in system") from None
+        bound = []
+        layout = iter(self.unit_layout)
+        def bind_unit(unit, ID, N_auxiliaries):
+            if unit is None or unit.ID != ID or len(unit.auxiliary_units) != N_auxiliaries:
+                raise ValueError(f"unit {ID!r} not in system or has different auxiliary units")
+            bound.append(unit)
+            for auxiliary_unit in unit.auxiliary_units:
+                ID, N, *_ = next(layout)
+                bind_unit(auxiliary_unit, ID, N)
+        for ID, N_auxiliaries, *_ in layout:
+            bind_unit(units.get(ID), ID, N_auxiliaries)
+        self.units = bound
+        
+    def restore(self):
+        """Restore the state of all bound streams and unit operations."""
+        if self.streams is None or self.units is None:
+            raise RuntimeError('snapshot is not bound to any system')
+        data = self.data
+        index = 0
+        for stream, (ID, phases, N) in zip(self.streams, self.stream_layout):
+            index = _load_stream(stream, phases, N, data, index)
+        OBJECT = self.OBJECT
+        INTEGER = self.INTEGER
+        for unit, (ID, N_auxiliaries, results, costs_loaded, heat_utility_layouts) in zip(self.units, self.unit_layout):
+            for name, items in zip(self.result_names, results):
+                dct = getattr(unit, name)
+                dct.clear()
+                for key, kind, value in items:
+                    if kind == OBJECT: 
+                        dct[key] = value
+                    else:
+                        value = float(data[index]) # ndfloat objects are slow
+                        dct[key] = int(value) if kind == INTEGER else value
+                        index += 1
+            power_utility = unit.power_utility
+            power_utility.consumption = float(data[index])
+            power_utility.production = float(data[index + 1])
+            index += 2
+            heat_utilities = unit.heat_utilities
+            N_heat_utilities = len(heat_utility_layouts)
+            for i in range(len(heat_utilities), N_heat_utilities):
+                heat_utilities.append(HeatUtility(None, unit))
+            del heat_utilities[N_heat_utilities:]
+            for hu, (agent_ID, hxn_ok, utility_streams) in zip(heat_utilities, heat_utility_layouts):
+                flow, duty, unit_duty, cost, efficiency = data[index:index + 5].tolist()
+                index += 5
+                if agent_ID is None:
+                    hu.empty()
+                else:
+                    hu.load_agent(HeatUtility.get_agent(agent_ID))
+                    for stream, (phases, N) in zip(_utility_streams(hu), utility_streams):
+                        index = _load_stream(stream, phases, N, data, index)
+                hu.flow = flow
+                hu.duty = duty
+                hu.unit_duty = unit_duty
+                hu.cost = cost
+                hu.heat_transfer_efficiency = None if efficiency != efficiency else efficiency
+                hu.hxn_ok = hxn_ok
+            unit._costs_loaded = costs_loaded
+    
+    def copy(self):
+        """Return a copy of the snapshot (bound to the same elements)."""
+        return SystemSnapshot(
+            self.data.copy(), self.stream_layout, self.unit_layout, 
+            self.streams, self.units,
+        )
+    
+    def save(self, file):
+        """Save snapshot to an uncompressed .npz file."""
+        layout = pickle.dumps((self.stream_layout, self.unit_layout))
+        np.savez(file, data=self.data, layout=np.frombuffer(layout, dtype=np.uint8))
+    
+    @classmethod
+    def load(cls, file, mmap_mode=None):
+        """
+        Load an unbound snapshot from an .npz file.
+        
+        Parameters
+        ----------
+        file :
+            Name of file.
+        mmap_mode : 
+            If given (e.g., 'r'), the packed data is memory-mapped instead 
+            of read into memory (see :func:`numpy.load`).
+        
+        """
+        with np.load(file) as npz:
+            stream_layout, unit_layout = pickle.loads(npz['layout'].tobytes())
+            if mmap_mode is None: data = npz['data']
+        if mmap_mode is not None: data = _memmap_npz_array(file, 'data', mmap_mode)
+        return cls(data, stream_layout, unit_layout)
+    
+    def __repr__(self):
+        return (f"<{type(self).__name__}: {len(self.stream_layout)} streams, "
+                f"{len(self.unit_layout)} units, {self.data.size} values>")
+    
+    
+def _units_and_auxiliaries(units):
+    for unit in units:
+        yield unit
+        yield from _units_and_auxiliaries(unit.auxiliary_units)
+
+def _utility_streams(heat_utility):
+    streams = [heat_utility.inlet_utility_stream, heat_utility.outlet_utility_stream]
+    if heat_utility.agent.isfuel: streams.append(heat_utility.oxygen_rich_inlet)
+    return streams
+
+def _dump_stream(stream, data, index):
+    TP = stream._thermal_condition
+    data[index] = TP._T
+    data[index + 1] = TP._P
+    start = index + 2
+    index = start + stream.imol.data.size
+    stream.imol.data.to_flat_array(data[start:index])
+    return index
+
+def _load_stream(stream, phases, N, data, index):
+    if tuple(stream.phases) != phases:
+        if len(phases) == 1 and len(stream.phases) == 1:
+            stream.phase = phases[0]
+        else:
+            stream.phases = phases
+    sparse = stream.imol.data
+    if sparse.size != N: 
+        raise IndexError(f'expected {N} elements; got {sparse.size} instead')
+    start = index + 2
+    sparse.from_flat_array(data[start:start + N])
+    TP = stream._thermal_condition
+    TP._T = float(data[index])
+    TP._P = float(data[index + 1])
+    return start + N
+
+def _memmap_npz_array(file, name, mmap_mode):
+    # Arrays in uncompressed .npz files are stored contiguously, so they
+    # can be memory-mapped directly from the zip archive
+    import zipfile
+    with zipfile.ZipFile(file) as archive:
+        info = archive.getinfo(name + '.npy')
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError('cannot memory-map compressed arrays')
+        offset = info.header_offset
+    with open(file, 'rb') as f:
+        f.seek(offset + 26)
+        name_length, extra_length = np.frombuffer(f.read(4), dtype='<u2')
+        f.seek(offset + 30 + int(name_length) + int(extra_length))
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    return np.memmap(file, dtype=dtype, mode=mmap_mode, shape=shape,
+                     order='F' if fortran_order else 'C', offset=offset)
+    
+
 # %% System creation tools
 
 def get_units(sys, units=None):
@@ -583,6 +1445,12 @@ def find_blowdown_recycle(facilities):
     for i in facilities:
         if isa(i, bst.BlowdownMixer): return i.outs[0]
 
+def _is_implicit_solver(method):
+    # Only these solve_ivp methods make use of a Jacobian sparsity pattern
+    if isinstance(method, str): return method in ('BDF', 'Radau')
+    from scipy.integrate import BDF, Radau
+    return isinstance(method, type) and issubclass(method, (BDF, Radau))
+
 def find_recycles(path):
     all_units = set(path)
     past_outlets = set()
@@ -655,18 +1523,6 @@ def _method_debug(self, f):
     g._original = f
     return g
 
-def _method_profile(self, f):
-    self._total_excecution_time_ = 0.
-    t = utils.TicToc()
-    def g():
-        t.tic()
-        f()
-        self._total_excecution_time_ += t.elapsed_time
-    g.__name__ = f.__name__
-    g.__doc__ = f.__doc__
-    g._original = f
-    return g
-
 # %% Converging recycle systems
 
 class MockSystem:
@@ -884,6 +1740,7 @@ class System:
         # Phenomena oriented simulation
         'material_relaxation_factor',
         'energy_relaxation_factor',
+        '_material_solver',
         '_aggregated_stage_configuration',
         '_stage_configuration',
         'grouped_variables',
@@ -898,11 +1755,19 @@ class System:
         # Dynamic simulation
         '_isdynamic',
         '_state',
+        '_dstate',
         '_state_idx',
         '_state_header',
+        '_jac_sparsity',
         '_DAE',
         '_scope',
         'dynsim_kwargs',
+        # Warm-start
+        'recycle_state_cache',
+        # Profiling
+        '_profiler',
+        # Preallocated recycle data for convergence
+        '_recycle_buffer',
     )
 
     take_place_of = Unit.take_place_of
@@ -935,6 +1800,9 @@ class System:
         'Phenomena modular': 'fixed-point',
     }
     
+    #: Default linear solver for material balances in phenomena-based simulation.
+    default_material_solver: str = 'dense'
+
     #: Whether to raise a RuntimeError when system doesn't converge
     strict_convergence: bool = True
 
@@ -1177,6 +2045,8 @@ class System:
         #: Relaxation factor for energy balance in phenomena-based simulation.
         self.energy_relaxation_factor = None
         
+        self.material_solver = self.default_material_solver
+        
         self._register(ID)
         self._set_path(path)
         self.recycle = recycle
@@ -1188,11 +2058,23 @@ class System:
         self._save_configuration()
         self._load_stream_links()
         self._state = None
+        self._dstate = None
         self._state_idx = None
         self._state_header = None
+        self._jac_sparsity = None
         self._DAE = None
         self.dynsim_kwargs = {}
         self.tracked_recycles = {}
+        
+        #: Converged recycle states for warm-starting simulations by sample
+        #: (used by Model objects).
+        self.recycle_state_cache: RecycleStateCache|None = None
+        
+        #: Profiler recording simulation times (if attached).
+        self._profiler: SimulationProfiler|None = None
+        
+        #: Preallocated recycle data (created when converging recycles).
+        self._recycle_buffer: RecycleBuffer|None = None
         subsystems = self.subsystems
         algorithm = self._algorithm
         method = self._method
@@ -1277,15 +2159,34 @@ class System:
                           baseline, bounds, coupled, hook, description)
         return p
 
-    def track_recycle(self, recycle: Stream, collector: list[Stream]=None):
+    def track_recycle(self, recycle: Stream, collector: list[Stream]=None,
+                      maxlen: Optional[int]=None):
+        """
+        Track recycle stream at each iteration of its loop and return the 
+        collector.
+        
+        Parameters
+        ----------
+        recycle :
+            Recycle stream to track.
+        collector :
+            List to append copies of the recycle stream. Defaults to a 
+            new list, or to a :class:`RecycleHistory` object if `maxlen` is
+            given.
+        maxlen :
+            Maximum number of records to keep in a preallocated ring buffer 
+            (only the recycle data is recorded; streams are not copied).
+            
+        """
         if not isinstance(recycle, Stream):
-            for i in recycle: self.track_recycle(recycle, collector)
-        if collector is None: collector = []
+            return [self.track_recycle(i, collector, maxlen) for i in recycle]
+        if collector is None: 
+            collector = [] if maxlen is None else RecycleHistory(maxlen)
         self.tracked_recycles[recycle] = collector
         unit = recycle.sink
         system = self.find_system(unit)
-        if system is self: return
-        system.track_recycle(recycle, collector)
+        if system is not self: system.track_recycle(recycle, collector)
+        return collector
 
     def update_configuration(self,
             units: Optional[Sequence[str]]=None,
@@ -1293,6 +2194,96 @@ class System:
         self._update_configuration(units)
         self._save_configuration()
 
+    def select_tears(self, 
+            weight: Optional[Callable]=None, 
+            max_cycles: Optional[int]=1000,
+            max_nodes: Optional[int]=100000,
+            restructure: Optional[bool]=False,
+        ):
+        """
+        Select a minimum weight set of tear streams that breaks all recycle 
+        loops (a feedback arc set of the unit operation network found
+        by enumerating cycles) and return a TearSelection object reporting 
+        the tear streams, their weights, and the number of passes (maximum 
+        number of tears in any cycle). 
+        
+        Parameters
+        ----------
+        weight :
+            Weight of tearing a stream. Defaults to the dimension of the recycle
+            data (see :func:`~biosteam.process_tools.tear_weight`).
+        max_cycles :
+            Maximum number of cycles enumerated for each recycle loop. 
+            If exceeded, tear streams are selected greedily.
+        max_nodes :
+            Maximum number of nodes in the branch and bound search for the
+            minimum weight tear set.
+        restructure :
+            Whether to restructure the system path so that each group of 
+            strongly connected units converges in a single (not nested) 
+            recycle loop with the selected tear streams.
+            
+        Warning
+        -------
+        Restructuring is lost if the configuration is updated (e.g., 
+        when connections change during simulation). Subsystems with 
+        specifications cannot be restructured. Units that repeat in the 
+        path are simulated only once per iteration after restructuring.
+        
+        """
+        systems = []
+        def load_systems(system):
+            for i in system.subsystems: 
+                systems.append(i)
+                load_systems(i)
+        load_systems(self)
+        facilities = [*self._facilities]
+        for i in systems: facilities.extend(i._facilities)
+        facility_set = set(facilities)
+        units = []
+        past_units = set()
+        for i in self.unit_path:
+            if i in facility_set or i in past_units: continue
+            units.append(i)
+            past_units.add(i)
+        selection = select_tears(units, weight, max_cycles, max_nodes)
+        if restructure:
+            for i in systems:
+                if i._specifications:
+                    raise RuntimeError(
+                        'cannot restructure system with subsystem specifications'
+                    )
+            loop_tears = iter(selection.loop_tears)
+            ID_subsys = None if '.' in self.ID else ''
+            path = []
+            for i in selection.path:
+                if isinstance(i, list):
+                    tears = next(loop_tears)
+                    path.append(
+                        type(self)(ID_subsys, i, tears[0] if len(tears) == 1 else tears)
+                    )
+                else:
+                    path.append(i)
+            self._delete_path_cache()
+            self._reset_errors()
+            self._set_path(path)
+            self.recycle = None
+            if not self._has_parent: 
+                self._set_facilities(Facility.ordered_facilities([*dict.fromkeys(facilities)]))
+            self.set_tolerance(
+                algorithm=self._algorithm,
+                method=self._method,
+                mol=self.molar_tolerance,
+                rmol=self.relative_molar_tolerance,
+                T=self.temperature_tolerance,
+                rT=self.relative_temperature_tolerance,
+                maxiter=self.maxiter,
+                subsystems=True,
+            )
+            self._save_configuration()
+            self._load_configuration()
+        return selection
+
     def _update_configuration(self,
             units: Optional[Sequence[str]]=None,
         ):
@@ -2124,7 +3115,8 @@ class System:
 
     @property
     def method(self) -> str:
-        """Iterative convergence accelerator method ('wegstein', 'aitken', or 'fixedpoint')."""
+        """Iterative convergence accelerator method ('wegstein', 'aitken', 
+        'fixedpoint', 'andersonmixing', or 'broyden')."""
         return self._method
     @method.setter
     def method(self, method):
@@ -2166,6 +3158,33 @@ class System:
                 f"{list_available_names(self.default_methods)} are available"
             )
 
+    @property
+    def material_solver(self) -> str:
+        """Linear solver for material balances in phenomena-based simulation 
+        ('dense' or 'sparse').
+        
+        Notes
+        -----
+        The dense solver assembles and solves a full coefficient matrix for 
+        each chemical. The sparse solver assembles coefficients in CSC format 
+        and factorizes once for each distinct set of coefficients, solving all 
+        chemicals that share coefficients together. The sparse solver is
+        preferred for systems with many stages.
+        
+        """
+        return self._material_solver
+    @material_solver.setter
+    def material_solver(self, material_solver):
+        material_solver = material_solver.lower()
+        if material_solver not in ('dense', 'sparse'):
+            raise AttributeError(
+                f"material solver {material_solver!r} not available; "
+                 "only 'dense' and 'sparse' are available"
+            )
+        self._material_solver = material_solver
+        for name in ('_stage_configuration', '_aggregated_stage_configuration'):
+            if hasattr(self, name): getattr(self, name).material_solver = material_solver
+
     @property
     def isdynamic(self) -> bool:
         """Whether the system contains any dynamic Unit."""
@@ -2353,32 +3372,20 @@ class System:
             True if recycle has not converged.
 
         """
-        data[data < 0.] = 0.
-        self._set_recycle_data(data)
-        T = self._get_recycle_temperatures()
-        mol = self._get_recycle_mol()
+        check_deadline()
+        buffer = self._recycle_buffer
+        if buffer is None: buffer = self._load_recycle_buffer()
+        if buffer.size != data.size: 
+            raise IndexError(f'expected {buffer.size} elements; got {data.size} instead')
+        buffer.set_data(data)
+        buffer.load_state()
         self.run()
         recycle = self._recycle
         for i, j in self.tracked_recycles.items():
-            if i is recycle: j.append(i.copy(None))
-        mol_new = self._get_recycle_mol()
-        T_new = self._get_recycle_temperatures()
-        mol_errors = abs(mol - mol_new)
-        if mol_errors.any():
-            self._mol_error = mol_error = mol_errors.max()
-            if mol_error > 1e-12:
-                nonzero_index = mol_errors.nonzero_index()
-                mol_errors = mol_errors[nonzero_index]
-                max_errors = np.maximum.reduce([abs(mol[nonzero_index]), abs(mol_new[nonzero_index])])
-                self._rmol_error = rmol_error = (mol_errors / max_errors).max()
-            else:
-                self._rmol_error = rmol_error = mol_error
-        else:
-            self._mol_error = mol_error = 0.
-            self._rmol_error = rmol_error = 0.
-        T_errors = abs(T - T_new)
-        self._T_error = T_error = T_errors.max()
-        self._rT_error = rT_error = (T_errors / T).max()
+            if i is recycle: j.append(i if j.__class__ is RecycleHistory else i.copy(None))
+        buffer.load_new_state()
+        self._mol_error, self._rmol_error = mol_error, rmol_error = buffer.mol_errors()
+        self._T_error, self._rT_error = T_error, rT_error = buffer.T_errors()
         self._iter += 1
         not_converged = not (
             (mol_error < self.molar_tolerance
@@ -2394,7 +3401,7 @@ class System:
                     raise RuntimeError(f'{repr(self)} could not converge' + self._error_info())
                 else: 
                     not_converged = False
-        return self._get_recycle_data(), not_converged
+        return buffer.get_data(), not_converged
         
     def _iter_run(self, data):
         """
@@ -2425,6 +3432,17 @@ class System:
         else:
             raise RuntimeError('no recycle available')
 
+    def _load_recycle_buffer(self, size=None):
+        buffer = self._recycle_buffer
+        recycles = self.get_all_recycles()
+        if (buffer is None or buffer.recycles != recycles 
+            or (size is not None and buffer.size != size)):
+            if not recycles: raise RuntimeError('no recycle available')
+            recycle = self._recycle
+            tear_streams = [recycle] if isinstance(recycle, Stream) else recycle
+            self._recycle_buffer = buffer = RecycleBuffer(recycles, tear_streams)
+        return buffer
+
     def _get_recycle_data(self):
         recycles = self.get_all_recycles()
         N = len(recycles)
@@ -2551,6 +3569,7 @@ class System:
         flag = self.tracking_flag
         integrated = self._integrated_facilities
         for i in self._path:
+            check_deadline()
             if isa(i, Unit):
                 if integrated: f(i, i.simulate)
                 else: f(i, i.run)
@@ -2627,14 +3646,14 @@ class System:
                 self._aggregated_stage_configuration = conf = Configuration(
                     self.path, stages, streams, stream_ref, connections, 
                     aggregated, self.material_relaxation_factor,
-                    self.energy_relaxation_factor,
+                    self.energy_relaxation_factor, self._material_solver,
                 )
             else:
                 stream_ref = {i.material_reference: i for i in streams}
                 self._stage_configuration = conf = Configuration(
                     self.path, stages, streams, stream_ref, connections,
                     aggregated, self.material_relaxation_factor,
-                    self.energy_relaxation_factor
+                    self.energy_relaxation_factor, self._material_solver,
                 )
             return conf
         
@@ -2989,10 +4008,13 @@ class System:
         self._reset_iter()
         solver, conditional, kwargs = self.available_methods[self._method]
         data = self._get_recycle_data()
+        self._load_recycle_buffer(data.size)
         f = self._iter_run_conditional if conditional else self._iter_run
+        if self._profiler: f = self._profiler.wrap((self.ID, 'iteration'), f)
         try: solver(f, data, **kwargs)
         except (IndexError, ValueError) as error:
             data = self._get_recycle_data()
+            self._load_recycle_buffer(data.size)
             try: solver(f, data, **kwargs)
             except Converged: pass
             except: raise error
@@ -3031,6 +4053,7 @@ class System:
             method = self._solve
         else:
             method = self.run_sequential_modular
+        if self._profiler: method = self._profiler.wrap((self.ID, 'converge'), method)
         if self._N_runs:
             for i in range(self._N_runs): method()
         else:
@@ -3039,13 +4062,14 @@ class System:
             try: recycle_data.update()
             except AttributeError: raise ValueError('no recycle data to update')
 
-    def _summary(self):
+    def _summary(self, path=None):
         if not self._integrated_facilities: 
             simulated_units = set()
             isa = isinstance
             Unit = bst.Unit
             f = try_method_with_object_stamp
-            for i in self._path:
+            if path is None: path = self._path
+            for i in path:
                 if isa(i, Unit):
                     if i in simulated_units: continue
                     simulated_units.add(i)
@@ -3120,11 +4144,30 @@ class System:
         feedstock.rescale(ratio)
         for i in self.get_all_recycles(): i.rescale(ratio)
 
+    def snapshot(self, feeds: Optional[bool]=True) -> SystemSnapshot:
+        """Return a SystemSnapshot object of the state of all streams 
+        (excluding feeds if `feeds` is False) and the design and cost results 
+        of all unit operations."""
+        streams = self.streams
+        if not feeds:
+            feeds = set(self.feeds)
+            streams = [i for i in streams if i not in feeds]
+        return SystemSnapshot.from_elements(streams, self.units)
+    
+    def restore(self, snapshot: SystemSnapshot):
+        """Restore the state of all streams and the design and cost results 
+        of all unit operations from a snapshot."""
+        if snapshot.streams is None or snapshot.units is None: snapshot.bind(self)
+        snapshot.restore()
+        self._reset_errors()
+
     def reset_cache(self):
         """Reset cache of all unit operations."""
         if self.isdynamic:
             self._DAE = None
             self._state = None
+            self._dstate = None
+            self._jac_sparsity = None
             for s in self.streams:
                 s._state = None
                 s._dstate = None
@@ -3143,6 +4186,10 @@ class System:
         *subjects :
             Any subjects of the system to track, which must have an `.scope`
             attribute of type :class:`Scope`.
+        **kwargs :
+            Additional parameters for :class:`SystemScope` (e.g., `every` 
+            and `min_dt` to decimate time points, or `directory` to 
+            memory-map tracked data).
         """
         if self.isdynamic:
             self._scope = {'subjects':subjects, 'kwargs':kwargs}
@@ -3168,17 +4215,8 @@ class System:
     
     # _hasode = lambda unit: hasattr(unit, '_compile_ODE')
     
-    def _dstate_attr2arr(self, y):
-        dy = y.copy()
-        idx = self._state_idx
-        for unit in self.units:
-            if unit.hasode:
-                start, stop = idx[unit._ID]
-                dy[start: stop] = unit._dstate
-        return dy
-
     def _update_state(self, arr):
-        self._state[:] = arr
+        np.copyto(self._state, arr)
         for unit in self.units:
             if unit.hasode: unit._update_state()
 
@@ -3191,63 +4229,116 @@ class System:
                 if not ws.state.all(): ws._init_state()
             for inf in units[0].ins:
                 if not inf.state.all(): inf._init_state()
-            y = np.array([])
             idx = {}
+            size = 0
             for unit in units: 
                 unit._init_state()
                 unit._update_state()
                 unit._update_dstate()
                 if unit.hasode:
-                    start = len(y)
-                    y = np.append(y, unit._state)
-                    stop = len(y)
-                    idx[unit._ID] = (start, stop)
-            if len(y) == 0: y = np.array([0])
-            self._state = y
-            self._state_idx = idx
+                    start = size
+                    size += len(unit._state)
+                    idx[unit._ID] = (start, size)
+            if size == 0:
+                y = np.array([0.])
+                dy = np.zeros(1)
+            else:
+                y = np.zeros(size)
+                dy = np.zeros(size)
+            # Units read and write directly into views of the system state
+            # and derivative buffers
             for unit in units:
                 if unit.hasode:
                     start, stop = idx[unit._ID]
-                    unit._state = self._state[start: stop]
+                    state = y[start: stop]
+                    state[:] = unit._state
+                    unit._state = state
+                    dstate = dy[start: stop]
+                    if unit._dstate is not None: dstate[:] = unit._dstate
+                    unit._dstate = dstate
+                    # Recompile so that ODEs capture the new derivative view
+                    if getattr(unit, '_ODE', None) is not None: unit._ODE = None
+            self._state = y
+            self._dstate = dy
+            self._state_idx = idx
+            self._jac_sparsity = None
+            self._DAE = None
         else:
             y = self._state
             idx = self._state_idx
             for unit in units: unit._update_dstate()
         return y, idx, nr
+    
+    @property
+    def jacobian_sparsity(self) -> csc_matrix|None:
+        """
+        Block sparsity pattern of the Jacobian of the system-wide 
+        differential equations derived from stream connectivity (or None if 
+        the state has not been loaded). The derivatives of a unit operation 
+        depend on its own state and the states of upstream unit operations 
+        connected through units without differential equations.
+        """
+        if self._jac_sparsity is None and self._state_idx is not None:
+            self._jac_sparsity = self._get_jacobian_sparsity()
+        return self._jac_sparsity
+    
+    def _get_jacobian_sparsity(self):
+        idx = self._state_idx
+        if not idx: return None
+        units = set(self.units)
+        rows = []
+        cols = []
+        for unit in self.units:
+            if not unit.hasode: continue
+            dependencies = {unit}
+            past_units = set()
+            inlets = list(unit.ins)
+            while inlets:
+                source = inlets.pop().source
+                if source is None or source in past_units or source not in units: continue
+                past_units.add(source)
+                if source.hasode:
+                    dependencies.add(source)
+                else:
+                    inlets.extend(source.ins)
+            row = np.arange(*idx[unit._ID])
+            col = np.concatenate([np.arange(*idx[i._ID]) for i in dependencies])
+            rows.append(np.repeat(row, col.size))
+            cols.append(np.tile(col, row.size))
+        N = self._state.size
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        return csc_matrix((np.ones(len(rows), dtype=bool), (rows, cols)), shape=(N, N))
 
     def _compile_DAE(self):
+        if self._dstate is None: self._load_state()
         nr = self._n_rotate
         units = self.units[nr:] + self.units[:nr]
         _update_state = self._update_state
-        _dstate_attr2arr = self._dstate_attr2arr
+        dy = self._dstate
+        idx = self._state_idx
+        # Units that replace (rather than write into) their derivative view 
+        # are copied after each evaluation
+        dstate_views = [(u, dy[slice(*idx[u._ID])]) for u in units if u.hasode]
         funcs = [u.ODE if u.hasode else u.AE for u in units]
         track = self.scope
         dk = self.dynsim_kwargs
-        if dk.get('print_t'): # print integration time for debugging
-            def dydt(t, y):
-                _update_state(y)
-                print(t)
-                for unit, func in zip(units, funcs):
-                    if unit.hasode:
-                        QC_ins, QC, dQC_ins = unit._ins_QC, unit._state, unit._ins_dQC
-                        func(t, QC_ins, QC, dQC_ins)   # updates dstate
-                    else:
-                        QC_ins, dQC_ins = unit._ins_QC, unit._ins_dQC
-                        func(t, QC_ins, dQC_ins)   # updates both state and dstate
-                track(t)
-                return _dstate_attr2arr(y)
-        else:
-            def dydt(t, y):
-                _update_state(y)
-                for unit, func in zip(units, funcs):
-                    if unit.hasode:
-                        QC_ins, QC, dQC_ins = unit._ins_QC, unit._state, unit._ins_dQC
-                        func(t, QC_ins, QC, dQC_ins)   # updates dstate
-                    else:
-                        QC_ins, dQC_ins = unit._ins_QC, unit._ins_dQC
-                        func(t, QC_ins, dQC_ins)   # updates both state and dstate
-                track(t)
-                return _dstate_attr2arr(y)
+        print_t = dk.get('print_t') # print integration time for debugging
+        def dydt(t, y):
+            _update_state(y)
+            if print_t: print(t)
+            for unit, func in zip(units, funcs):
+                if unit.hasode:
+                    QC_ins, QC, dQC_ins = unit._ins_QC, unit._state, unit._ins_dQC
+                    func(t, QC_ins, QC, dQC_ins)   # updates dstate
+                else:
+                    QC_ins, dQC_ins = unit._ins_QC, unit._ins_dQC
+                    func(t, QC_ins, dQC_ins)   # updates both state and dstate
+            for unit, view in dstate_views:
+                dstate = unit._dstate
+                if dstate is not view: view[:] = dstate
+            track(t)
+            return dy.copy() # Solvers may hold on to previous derivatives
         self._DAE = dydt            
 
     @property
@@ -3265,6 +4356,8 @@ class System:
     def clear_state(self):
         """Clear all states and dstates (system, units, and streams)."""
         self._state = None
+        self._dstate = None
+        self._jac_sparsity = None
         for u in self.units:
             u._state = None
             u._dstate = None
@@ -3437,6 +4530,74 @@ class System:
                 self._simulation_outputs = outputs
         return outputs
 
+    def simulate_downstream(self, units: Iterable[Unit], 
+                            design_and_cost: Optional[bool]=None):
+        """
+        Simulate only the given unit operations and everything downstream, 
+        including recycle loops that contain them. Unit operations upstream 
+        keep their outlets and design results. Facilities are always 
+        simulated.
+        
+        Parameters
+        ----------
+        units :
+            Unit operations that have changed since the last simulation.
+        design_and_cost :
+            Whether to size and cost unit operations. Defaults to True.
+        
+        Notes
+        -----
+        The system must have been simulated before. Recycle loops that 
+        contain changed unit operations are first run from the changed unit 
+        operations onward and then reconverged as a whole (starting from
+        the previous solution). The whole system is simulated if it is 
+        dynamic, has specifications, has integrated facilities, is not 
+        simulated with the sequential modular algorithm, or if any unit 
+        operation is not within the system.
+        
+        """
+        units = set(units)
+        if design_and_cost is None: design_and_cost = True
+        if (self.isdynamic or self._specifications
+            or self._integrated_facilities 
+            or self._algorithm != 'Sequential modular'
+            or not units.issubset(self.unit_set)):
+            return self.simulate(design_and_cost=design_and_cost)
+        isa = isinstance
+        path = self._path if self._recycle else self._path[self._downstream_index(units):]
+        with self.flowsheet:
+            self._load_configuration()
+            for i in path:
+                if isa(i, Unit): 
+                    i._setup()
+                else:
+                    for j in i.units: j._setup()
+            self._converge_downstream(units)
+            if design_and_cost: self._summary(path)
+    
+    def _downstream_index(self, units):
+        # Index of the first path element with changed unit operations
+        isa = isinstance
+        for index, i in enumerate(self._path):
+            if isa(i, Unit):
+                if i in units: return index
+            elif not units.isdisjoint(i.units): 
+                return index
+        return len(self._path)
+    
+    def _converge_downstream(self, units):
+        # Run elements downstream of the changed unit operations; 
+        # subsystems with changed unit operations do the same and recycle 
+        # loops are then reconverged as a whole
+        isa = isinstance
+        f = try_method_with_object_stamp
+        index = self._downstream_index(units)
+        for n, i in enumerate(self._path[index:]):
+            if isa(i, Unit): f(i, i.run)
+            elif n: f(i, i.converge)
+            else: f(i, i._converge_downstream, (units,))
+        if self._recycle: self.converge()
+
     def dynamic_run(self, **dynsim_kwargs):
         """
         Run system dynamically without accounting for
@@ -3467,6 +4628,10 @@ class System:
                 print_t : bool
                     Whether to print integration time in the console,
                     usually used for debugging.
+                sparse_jacobian : bool
+                    Whether to pass the block sparsity pattern of the Jacobian
+                    (derived from stream connectivity) to implicit solvers 
+                    ("BDF" and "Radau"). Defaults to True.
                 solve_ivp_kwargs
                     All remaining keyword arguments will be passed to ``solve_ivp``.
         
@@ -3484,6 +4649,7 @@ class System:
         sample_id = dk_cp.pop('sample_id', '')
         print_msg = dk_cp.pop('print_msg', False)
         print_t = dk_cp.pop('print_t', False)
+        sparse_jacobian = dk_cp.pop('sparse_jacobian', True)
         dk_cp.pop('y0', None) # will be updated later
         # Reset state, if needed
         if state_reset_hook:
@@ -3499,6 +4665,9 @@ class System:
         self.converge()
         y0, idx, nr = self._load_state()
         dk['y0'] = y0
+        if (sparse_jacobian and 'jac' not in dk_cp and 'jac_sparsity' not in dk_cp
+            and _is_implicit_solver(dk_cp.get('method', 'RK45'))):
+            dk_cp['jac_sparsity'] = self.jacobian_sparsity
         # Integrate
         self.dynsim_kwargs['print_t'] = print_t # self.dynsim_kwargs might be reset by `state_reset_hook`
         self.scope.sol = sol = solve_ivp(fun=self.DAE, y0=y0, **dk_cp)
@@ -4528,7 +5697,9 @@ class System:
         if mode == 'debug':
             _wrap_method = _method_debug
         elif mode == 'profile':
-            _wrap_method = _method_profile
+            # Alias of `profiling` for backwards compatibility
+            self.profiling()
+            return
         else:
             raise ValueError(f"mode must be either 'debug' or 'profile'; not '{mode}'")
         for u in self.units:
@@ -4542,6 +5713,15 @@ class System:
 
     def _turn_off(self):
         """Turn off special simulation modes like `profile` or `debug`."""
+        profiler = self._profiler
+        if profiler is not None:
+            profiler.detach()
+            # Total execution times [s] by unit as in the legacy profile mode
+            times = {}
+            for (ID, method), time in profiler.table()['Self time [ms]'].items():
+                times[ID] = times.get(ID, 0.) + time / 1000.
+            for u in self.units: u._total_excecution_time_ = times.get(u.ID, 0.)
+            return
         for u in self.units:
             if u.specification:
                 u.specification = u.specification._original
@@ -4558,22 +5738,118 @@ class System:
         try: self.simulate()
         finally: self._turn_off()
 
-    def profile(self):
+    def profiling(self, profiler: Optional[SimulationProfiler]=None):
+        """
+        Attach and return a profiler that records call counts and times of 
+        unit operation methods, specifications, system convergence, and 
+        recycle iterations. The profiler is detached when used as a 
+        context manager.
+        
+        Examples
+        --------
+        >>> # with system.profiling() as profiler: system.simulate()
+        >>> # profiler.table()
+        
+        """
+        if profiler is None: profiler = SimulationProfiler()
+        profiler.attach(self)
+        return profiler
+
+    def profile(self, file: Optional[str]=None):
         """
         Simulate system in profile mode and return a DataFrame object of unit
         operation simulation times.
+        
+        Parameters
+        ----------
+        file :
+            Name of text file to save collapsed call stacks for flame graph 
+            tools.
 
         """
-        self._turn_on('profile')
-        try: self.simulate()
-        finally: self._turn_off()
-        units = self.units
-        units.sort(key=(lambda u: u._total_excecution_time_), reverse=True)
-        data = [(u.line, 1000. * u._total_excecution_time_) for u in units]
-        for u in units: del u._total_excecution_time_
+        with self.profiling() as profiler: self.simulate()
+        if file is not None: profiler.save(file)
+        times = {}
+        for (ID, method), time in profiler.table()['Self time [ms]'].items():
+            if method in ('converge', 'iteration'): continue
+            if ID in times: times[ID] += time
+            else: times[ID] = time
+        units = [i for i in self.units if i.ID in times]
+        units.sort(key=(lambda u: times[u.ID]), reverse=True)
+        data = [(u.line, times[u.ID]) for u in units]
         return pd.DataFrame(data, index=[u.ID for u in units],
                             columns=('Unit Operation', 'Time (ms)'))
 
+    def compare_methods(self, methods=None, repeat=1, reset=True):
+        """
+        Simulate system with each convergence method and return a DataFrame 
+        object of the number of unit operation simulations (a measure of 
+        the number of iterations) and the wall time.
+
+        Parameters
+        ----------
+        methods : Iterable[str], optional
+            Convergence methods to compare. Defaults to all conditional 
+            methods available.
+        repeat : int, optional
+            Number of simulations for each method. Defaults to 1.
+        reset : bool, optional
+            Whether to empty recycles and reset cache before each simulation 
+            so that all methods start from the same initial guess. 
+            Defaults to True.
+        
+        """
+        if methods is None:
+            methods = [i for i, j in self.available_methods.items() if j[1]]
+        systems = []
+        def load_systems(system):
+            systems.append(system)
+            for i in system.subsystems: load_systems(i)
+        load_systems(self)
+        original_methods = [i._method for i in systems]
+        units = self.units
+        counts = {}
+        def count(u, f):
+            def g():
+                counts[u] += 1
+                f()
+            g.__name__ = f.__name__
+            g.__doc__ = f.__doc__
+            return g
+        original_runs = {u: u.__dict__['run'] for u in units if 'run' in u.__dict__}
+        for u in units: u.run = count(u, u.run)
+        timer = Timer()
+        data = []
+        try:
+            for method in methods:
+                for system in systems: system.method = method
+                simulations = 0
+                elapsed_time = 0.
+                converged = True
+                for n in range(repeat):
+                    if reset:
+                        self.empty_recycles()
+                        self.reset_cache()
+                    for u in units: counts[u] = 0
+                    timer.start()
+                    try: 
+                        self.simulate()
+                    except Exception:
+                        converged = False
+                    elapsed_time += timer.elapsed_time
+                    simulations += sum(counts.values())
+                data.append((simulations / repeat, elapsed_time / repeat, converged))
+        finally:
+            for u in units: 
+                if u in original_runs: 
+                    u.run = original_runs[u]
+                else:
+                    del u.run
+            for system, method in zip(systems, original_methods):
+                system._method = method
+        return pd.DataFrame(data, index=[i for i in methods],
+                            columns=('Unit simulations', 'Time (s)', 'Converged'))
+
     # Representation
     def print(self, spaces=''): # pragma: no cover
         """
@@ -4678,6 +5954,8 @@ del ignore_docking_warnings
 System.register_method('aitken', flx.conditional_aitken, conditional=True)
 System.register_method('wegstein', flx.conditional_wegstein, conditional=True)
 System.register_method('fixedpoint', flx.conditional_fixed_point, conditional=True)
+System.register_method('andersonmixing', utils.conditional_anderson, conditional=True)
+System.register_method('broyden', utils.conditional_broyden, conditional=True)
 options = dict(fatol=1e-24, xatol=1e-24, xtol=1e-24, ftol=1e-24, maxiter=int(1e6))
 for name in ('anderson', 'diagbroyden', 'excitingmixing', 'linearmixing', 'broyden1', 'broyden2'):
     System.register_method(name, root, method=name, options=options)
@@ -4716,6 +5994,110 @@ class OperationModeResults:
         return sum([flow_rates[i] * i.price for i in self.products])
 
 
+def _copy_operation_parameters(parameters):
+    # Array-like values are copied so that in-place changes are detected
+    copy = {}
+    for i, j in parameters.items():
+        if isinstance(j, np.ndarray): 
+            j = np.array(j, copy=True)
+        elif isinstance(j, (list, dict, set)): 
+            j = j.copy()
+        copy[i] = j
+    return copy
+
+def _same_operation_parameters(old, new):
+    if old.keys() != new.keys(): return False
+    for i, j in old.items():
+        k = new[i]
+        if j is k: continue
+        try:
+            if not np.array_equal(j, k): return False
+        except:
+            return False
+    return True
+
+def _pack_heat_utility(hu):
+    agent = hu.agent
+    utility_streams = []
+    if agent:
+        for i in _utility_streams(hu):
+            data = np.zeros(i.imol.data.size + 2)
+            _dump_stream(i, data, 0)
+            utility_streams.append((tuple(i.phases), data))
+    return (agent.ID if agent else None, hu.hxn_ok, hu.heat_transfer_efficiency,
+            hu.flow, hu.duty, hu.unit_duty, hu.cost, utility_streams)
+
+def _unpack_heat_utility(packed):
+    ID, hxn_ok, efficiency, flow, duty, unit_duty, cost, utility_streams = packed
+    hu = HeatUtility(efficiency, None, hxn_ok)
+    if ID is not None:
+        hu.load_agent(HeatUtility.get_agent(ID))
+        for stream, (phases, data) in zip(_utility_streams(hu), utility_streams):
+            _load_stream(stream, phases, data.size - 2, data, 0)
+    hu.flow = flow
+    hu.duty = duty
+    hu.unit_duty = unit_duty
+    hu.cost = cost
+    return hu
+
+def _pack_operation_mode_results(results):
+    # Replace units, streams, and utilities with picklable data
+    return (
+        [(i.unit.ID, i.F_BM, i.F_D, i.F_P, i.F_M, i.design_results, 
+          i.baseline_purchase_costs, i.purchase_costs, i.installed_costs)
+         for i in results.unit_capital_costs.values()],
+        {name: {stream.ID: value for stream, value in dct.items()}
+         for name, dct in results.stream_properties.items()},
+        results.utility_cost,
+        [i.ID for i in results.feeds],
+        [i.ID for i in results.products],
+        [_pack_heat_utility(i) for i in results.heat_utilities],
+        (results.power_utility.consumption, results.power_utility.production),
+    )
+
+def _unpack_operation_mode_results(packed, units, streams):
+    (unit_capital_costs, stream_properties, utility_cost, 
+     feeds, products, heat_utilities, power_utility) = packed
+    unit_capital_costs = [UnitDesignAndCapital(units[ID], *data) for ID, *data in unit_capital_costs]
+    return OperationModeResults(
+        {i.unit: i for i in unit_capital_costs},
+        {name: {streams[ID]: value for ID, value in dct.items()}
+         for name, dct in stream_properties.items()},
+        utility_cost,
+        [streams[i] for i in feeds], 
+        [streams[i] for i in products], 
+        [_unpack_heat_utility(i) for i in heat_utilities],
+        PowerUtility(*power_utility),
+    )
+
+class AgileSystemReplica:
+    """
+    Create an AgileSystemReplica object that sets up an agile system for 
+    simulating operation modes in a worker process. The agile system is 
+    created by the factory, or the original agile system is used if no 
+    factory is given (inherited by forked processes or pickled otherwise).
+    
+    """
+    __slots__ = ('agile_system', 'factory')
+    
+    def __init__(self, agile_system, factory):
+        self.agile_system = agile_system
+        self.factory = factory
+        
+    def __call__(self): # pragma: no cover
+        return self.agile_system if self.factory is None else self.factory()
+    
+def simulate_operation_mode_replica(agile_system, args): # pragma: no cover
+    index, parameters = args
+    mode = agile_system.operation_modes[index]
+    mode.__dict__.update(parameters)
+    results, annual_metric_values, metric_values = agile_system._simulate_operation_mode(mode)
+    return (
+        _pack_operation_mode_results(results), 
+        annual_metric_values, metric_values
+    )
+
+
 class OperationMode:
     __slots__ = ('__dict__',)
     def __init__(self, **data):
@@ -4784,10 +6166,20 @@ class AgileSystem:
         Lang factor for getting fixed capital investment from
         total purchase cost. If no lang factor, installed equipment costs are
         estimated using bare module factors.
+    workers : int, optional
+        Number of worker processes to simulate operation modes in. Workers 
+        are kept alive between simulations until :meth:`close` is called.
+        Defaults to simulating operation modes in the current process.
+    cache_results : bool, optional
+        Whether to reuse the results of operation modes with unchanged 
+        operation parameters since the last simulation. Only use if nothing
+        but operation parameters change between simulations (or call 
+        `reset_cache` otherwise). Defaults to False.
 
     """
 
     __slots__ = (
+        'workers', 'cache_results', '_results_cache', '_pool',
         'operation_modes', 'operation_parameters', 'active_operation_mode',
         'mode_operation_parameters', 'annual_operation_metrics',
         'operation_metrics', 'unit_capital_costs', 
@@ -4821,7 +6213,11 @@ class AgileSystem:
     def __init__(self, operation_modes=None, operation_parameters=None, 
                  mode_operation_parameters=None, annual_operation_metrics=None,
                  operation_metrics=None, lang_factor=None, 
-                 stream_property_names=None):
+                 stream_property_names=None, workers=None, cache_results=None):
+        self.workers = workers
+        self.cache_results = False if cache_results is None else cache_results
+        self._results_cache = {}
+        self._pool = None
         self.operation_modes = [] if operation_modes is None else operation_modes 
         self.operation_parameters = {} if operation_parameters  is None else operation_parameters
         self.mode_operation_parameters = {} if mode_operation_parameters is None else mode_operation_parameters
@@ -5008,10 +6404,28 @@ class AgileSystem:
         for mode in self.operation_modes:
             mode.system.empty_recycles()
 
+    snapshot = System.snapshot
+    
+    def restore(self, snapshot):
+        """Restore the state of all streams and the design and cost results 
+        of all unit operations from a snapshot (e.g., to roll back between
+        operation modes)."""
+        if snapshot.streams is None or snapshot.units is None: snapshot.bind(self)
+        snapshot.restore()
+
     def reset_cache(self):
+        self._results_cache.clear()
+        self.close() # Workers may hold outdated states
         for mode in self.operation_modes:
             mode.system.reset_cache()
 
+    def close(self):
+        """Stop the worker processes kept alive between simulations (if any)."""
+        pool = self._pool
+        if pool is not None:
+            self._pool = None
+            pool.close()
+
     @property
     def operating_hours(self):
         return sum([i.operating_hours for i in self.operation_modes])
@@ -5020,7 +6434,90 @@ class AgileSystem:
         factor = operating_hours / self.operating_hours
         for i in self.operation_modes: i.operating_hours *= factor
 
-    def simulate(self):
+    def _simulate_operation_mode(self, mode):
+        self.active_operation_mode = mode
+        results = mode.simulate()
+        return (
+            results,
+            [i.getter(mode) for i in self.annual_operation_metrics],
+            [i.getter(mode) for i in self.operation_metrics],
+        )
+    
+    def _simulate_operation_modes(self, workers, factory):
+        # Return results and metric values of all operation modes
+        operation_modes = self.operation_modes
+        mode_data = len(operation_modes) * [None]
+        cache = self._results_cache if self.cache_results else None
+        pending = []
+        for i, mode in enumerate(operation_modes):
+            if cache is not None and mode in cache:
+                parameters, data = cache[mode]
+                if _same_operation_parameters(parameters, mode.__dict__):
+                    mode_data[i] = data
+                    continue
+            pending.append(i)
+        if workers is not None and workers > 1 and len(pending) > 1:
+            from .evaluation.evaluation_tools.in_parallel import WorkerPool
+            pool = self._pool
+            if pool is None or pool.workers != workers or pool.setup.factory is not factory:
+                self.close()
+                self._pool = pool = WorkerPool(
+                    AgileSystemReplica(self, factory), simulate_operation_mode_replica, workers
+                )
+            units = {i.ID: i for i in self.units}
+            for mode in operation_modes: 
+                units.update({i.ID: i for i in mode.system.cost_units})
+            streams = {i.ID: i for i in self.streams}
+            def callback(i, value):
+                results, annual_metric_values, metric_values = value
+                mode_data[i] = (
+                    _unpack_operation_mode_results(results, units, streams),
+                    annual_metric_values, metric_values
+                )
+            chunks = [
+                [(i, (i, {j: k for j, k in operation_modes[i].__dict__.items() if j != 'system'}))]
+                for i in pending
+            ]
+            try:
+                pool.evaluate(chunks, callback)
+            except:
+                self._pool = None # Workers were killed
+                raise
+        else:
+            for i in pending: 
+                mode_data[i] = self._simulate_operation_mode(operation_modes[i])
+        if cache is not None:
+            for i in pending: 
+                mode = operation_modes[i]
+                cache[mode] = (_copy_operation_parameters(mode.__dict__), mode_data[i])
+        return mode_data
+    
+    def simulate(self, workers=None, factory=None):
+        """
+        Simulate all operation modes and compile results.
+        
+        Parameters
+        ----------
+        workers : int, optional
+            Number of worker processes to simulate operation modes in. 
+            Defaults to the `workers` attribute.
+        factory : Callable() -> AgileSystem, optional
+            Picklable function that creates a replica of the agile system 
+            in each worker process. Defaults to the agile system itself, 
+            which is inherited by forked processes (or pickled with other 
+            start methods).
+        
+        Notes
+        -----
+        When operation modes are simulated in worker processes, only operation
+        parameters are sent to the workers and the state of streams and unit 
+        operations (other than the agile design and capital costs) is not 
+        updated in the current process. Workers are kept alive (with their
+        replicas of the agile system) between simulations until `close` or
+        `reset_cache` is called, or the number of workers or the factory
+        changes.
+        
+        """
         operation_modes = self.operation_modes
         operation_metrics = self.operation_metrics
         annual_operation_metrics = self.annual_operation_metrics
@@ -5030,22 +6527,30 @@ class AgileSystem:
         annual_metric_range = range(N_annual_metrics)
         metric_range = range(N_metrics)
         mode_range = range(N_modes)
-        operation_mode_results = N_modes * [None]
+        if workers is None: workers = self.workers
+        mode_data = self._simulate_operation_modes(workers, factory)
+        operation_mode_results = [i[0] for i in mode_data]
         annual_values = [N_modes * [None] for i in annual_metric_range]
         values = [{i: None for i in operation_modes} for i in metric_range]
         total_operating_hours = self.operating_hours
+        heat_utilities = []
+        power_utilities = []
         for i in mode_range:
-            self.active_operation_mode = mode = operation_modes[i]
-            operation_mode_results[i] = results = mode.simulate()
+            mode = operation_modes[i]
+            results, annual_metric_values, metric_values = mode_data[i]
             for j in annual_metric_range:
-                metric = annual_operation_metrics[j]
-                annual_values[j][i] = metric.getter(mode) * mode.operating_hours
+                annual_values[j][i] = annual_metric_values[j] * mode.operating_hours
             for j in metric_range:
-                metric = operation_metrics[j]
-                values[j][mode] = metric.getter(mode)
+                values[j][mode] = metric_values[j]
             scale = mode.operating_hours / total_operating_hours
-            for hu in results.heat_utilities: hu.scale(scale)
-            results.power_utility.scale(scale)
+            # Scale copies (results may be reused)
+            for hu in results.heat_utilities: 
+                hu = hu.copy()
+                hu.scale(scale)
+                heat_utilities.append(hu)
+            power_utility = results.power_utility.copy()
+            power_utility.scale(scale)
+            power_utilities.append(power_utility)
         self.active_operation_mode = None
         for i in annual_metric_range:
             metric = annual_operation_metrics[i]
@@ -5057,8 +6562,8 @@ class AgileSystem:
         unit_modes = {i: [] for i in units}
         for results in operation_mode_results:
             for i, j in results.unit_capital_costs.items(): unit_modes[i].append(j)
-        self.heat_utilities = bst.HeatUtility.sum_by_agent(sum([r.heat_utilities for r in operation_mode_results], []))
-        self.power_utility = bst.PowerUtility.sum([r.power_utility for r in operation_mode_results])
+        self.heat_utilities = bst.HeatUtility.sum_by_agent(heat_utilities)
+        self.power_utility = bst.PowerUtility.sum(power_utilities)
         self.unit_capital_costs = {i: i.get_agile_design_and_capital(j) for i, j in unit_modes.items()}
         self.utility_cost = sum([i.utility_cost for i in operation_mode_results])
         self.feeds = list(set(sum([i.feeds for i in operation_mode_results], [])))
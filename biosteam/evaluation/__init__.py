@@ -12,10 +12,14 @@ from ._feature import *
 from ._parameter import *
 from ._prediction import *
 from ._model import *
+from ._result_store import *
+from ._surrogate import *
+from ._stopping_rule import *
 from ._indicator import *
 from . import (_parameter, _prediction, _model,
               _indicator, evaluation_tools, _feature,
-              _utils)
+              _utils, _result_store, _surrogate,
+              _stopping_rule)
 
 __all__ = ('evaluation_tools',
            *_feature.__all__,
@@ -23,4 +27,7 @@ __all__ = ('evaluation_tools',
            *_prediction.__all__,
            *_indicator.__all__,
            *_model.__all__,
+           *_result_store.__all__,
+           *_surrogate.__all__,
+           *_stopping_rule.__all__,
            *_utils.__all__)
\ No newline at end of file
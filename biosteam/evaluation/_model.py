@@ -12,7 +12,6 @@
 # github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
 # for license details.
 
-from scipy.spatial.distance import cdist
 from scipy.optimize import shgo, differential_evolution
 import numpy as np
 import pandas as pd
@@ -20,14 +19,20 @@ from ._indicator import Indicator
 from ._feature import MockFeature
 from ._utils import var_indices, var_columns, indices_to_multiindex
 from ._prediction import ConvergenceModel
+from ._result_store import ResultStore
+from ._surrogate import Surrogate
 from .._unit import Unit
-from biosteam.exceptions import FailedEvaluation
+from biosteam.exceptions import FailedEvaluation, EvaluationTimeout
 from warnings import warn
+from itertools import repeat
 from collections.abc import Sized
-from biosteam.utils import Timer
+from biosteam.utils import Timer, Deadline
 from typing import Optional, Callable
 from ._parameter import Parameter
 from .evaluation_tools import load_default_parameters
+from .evaluation_tools.in_parallel import evaluate_in_processes, WorkerPool
+from .evaluation_tools.sample_order import get_sample_order
+from .evaluation_tools.sensitivity import sobol_indices, morris_effects
 import pickle
 try:
     from chaospy import distributions as shape
@@ -43,6 +48,108 @@ def replace_nones(values, replacement):
         if j is None: values[i] = replacement
     return values
 
+def ignore_exception(exception, sample):
+    return None
+
+def warn_exception(exception, sample):
+    warn(FailedEvaluation(f"[{type(exception).__name__}] {exception}"), stacklevel=6)
+
+def raise_exception(exception, sample): 
+    raise exception from None
+
+class ModelReplica:
+    """
+    Create a ModelReplica object that sets up a model for evaluating 
+    samples in a worker process. The model is created by the factory, or 
+    the original model is used if no factory is given (inherited by forked 
+    processes or pickled otherwise).
+    
+    """
+    __slots__ = ('model', 'factory', 'exception_hook', 'timeout', 'convergence_model', 'kwargs')
+    
+    def __init__(self, model, factory, exception_hook, timeout, convergence_model, kwargs):
+        self.model = model
+        self.factory = factory
+        self.exception_hook = exception_hook
+        self.timeout = timeout
+        self.convergence_model = convergence_model
+        self.kwargs = kwargs
+    
+    def __call__(self): # pragma: no cover
+        model = self.model if self.factory is None else self.factory()
+        model._exception_hook = self.exception_hook
+        model.timeout = self.timeout
+        convergence_model = self.convergence_model
+        if isinstance(convergence_model, str):
+            convergence_model = ConvergenceModel(
+                system=model.system,
+                predictors=model.parameters,
+                model_type=convergence_model,
+            )
+        return model, convergence_model, self.kwargs
+
+class CoordinateReplica:
+    """
+    Create a CoordinateReplica object that evaluates all samples of a model 
+    at coordinate points in a worker process. Points are expected in 
+    evaluation order, so the direction of samples alternates between points 
+    if `alternate` is True.
+    
+    """
+    __slots__ = ('model', 'f_coordinate', 'multi_coordinate', 'stores', 
+                 'notify', 'alternate', 'reverse')
+    
+    def __init__(self, model, f_coordinate, multi_coordinate, stores, notify, alternate):
+        self.model = model
+        self.f_coordinate = f_coordinate
+        self.multi_coordinate = multi_coordinate
+        self.stores = stores
+        self.notify = notify
+        self.alternate = alternate
+        self.reverse = False
+        
+    def __call__(self): # pragma: no cover
+        return self
+    
+    def evaluate(self, n, x): # pragma: no cover
+        values = self.model._evaluate_at_coordinate(
+            self.f_coordinate, x, self.multi_coordinate, 
+            self.stores[n], self.notify, self.reverse,
+        )
+        if self.alternate: self.reverse = not self.reverse
+        return values
+
+def evaluate_replica_coordinate(state, args): # pragma: no cover
+    return state.evaluate(*args)
+
+def get_coordinate_order(coordinate):
+    """Return the order of coordinate points that evaluates neighboring 
+    points consecutively (coordinates that are not numbers are not sorted)."""
+    N_points = len(coordinate)
+    try:
+        points = np.array(coordinate, dtype=float).reshape([N_points, -1])
+    except (TypeError, ValueError):
+        return list(range(N_points))
+    if points.shape[1] == 1: return np.argsort(points[:, 0], kind='stable').tolist()
+    lb = points.min(axis=0)
+    diff = points.max(axis=0) - lb
+    diff[diff == 0] = 1.
+    return get_sample_order((points - lb) / diff)
+
+def evaluate_replica_sample(state, args): # pragma: no cover
+    model, convergence_model, kwargs = state
+    sample_id, sample = args
+    if 'export_state_to' in kwargs: kwargs['sample_id'] = sample_id
+    values = model._evaluate_sample(sample, convergence_model, **kwargs)
+    # Converged recycle states are sent back to the cache of the main process
+    system = model._system
+    cache = None if system is None else system.recycle_state_cache
+    state = None
+    if cache is not None:
+        row = cache._states.get(np.asarray(sample, dtype=float).tobytes())
+        if row is not None: state = (cache._samples[row].copy(), cache._data[row].copy())
+    return values, model._sample_timed_out, state
+
 def codify(statement):
     statement = replace_apostrophes(statement)
     statement = replace_newline(statement)
@@ -85,6 +192,43 @@ class Model:
     exception_hook : callable(exception, sample)
         Function called after a failed evaluation. The exception hook should 
         return either None or indicator values given the exception and sample.
+    incremental : bool, optional
+        Whether to only simulate the unit operations of parameters that 
+        changed and everything downstream (see 
+        :meth:`~biosteam.System.simulate_downstream`). The whole system is 
+        simulated if a changed parameter has no unit operation. The system 
+        should only be altered through parameters. Defaults to False.
+    fast_uncoupled : bool, optional
+        Whether to skip simulation of the system when only uncoupled 
+        parameters (which cannot alter mass and energy balances, e.g., prices 
+        and cost factors) changed since the last converged sample; only unit 
+        operations of changed parameters are reevaluated (design and cost). 
+        All unit operations with costs are reevaluated when a changed 
+        parameter has no unit operation (e.g., utility prices). Parameters 
+        must be correctly marked as coupled. Defaults to False.
+    timeout : float, optional
+        Wall-clock time limit [s] of each sample evaluation. Samples that 
+        time out are aborted, their indicator values are left as NaN (unless 
+        the exception hook returns values), and their indices are recorded 
+        in `timed_out`. The system is then restored to its state after the 
+        last successful evaluation. Defaults to no time limit.
+
+    Notes
+    -----
+    When sorted, samples with the same coupled parameter values are 
+    evaluated consecutively, so with `fast_uncoupled` each block of such 
+    samples is evaluated against a single converged state. When evaluating 
+    in the current process, the parameters that change within each block 
+    are found for all samples at once and the remaining samples of the block
+    skip the convergence checks of each evaluation.
+    
+    Timeouts are checked cooperatively between unit operations, recycle 
+    iterations, and equilibrium stage iterations (see 
+    :class:`~biosteam.utils.Deadline`). When evaluating in worker processes,
+    workers that do not stop within `timeout_grace` seconds after the 
+    time limit are killed and replaced. With a time limit, the state of 
+    the system is saved after each successful evaluation, which adds a 
+    small overhead.
 
     """
     __slots__ = (
@@ -99,6 +243,15 @@ class Model:
         '_index',           # list[int] Order of sample evaluation for performance.
         '_samples',         # [array] Argument sample space.
         '_exception_hook',  # [callable(exception, sample)] Should return either None or indicator value given an exception and the sample.
+        'incremental',      # [bool] Whether to only simulate units downstream of changed parameters.
+        'fast_uncoupled',   # [bool] Whether to skip simulation when only uncoupled parameters changed.
+        '_state_converged', # [bool] Whether the system is converged at the last parameter values.
+        '_baseline_snapshot', # [SystemSnapshot] State of the system (excluding feeds) after the first successful evaluation.
+        'timeout',          # [float|None] Wall-clock time limit of each sample evaluation.
+        'timed_out',        # list[int] Indices of samples that timed out in the last evaluation.
+        '_sample_timed_out',# [bool] Whether the last sample evaluation timed out.
+        '_last_snapshot',   # [SystemSnapshot] State of the system (excluding feeds) after the last successful evaluation (only with a time limit).
+        'surrogate',        # [Surrogate|None] Fitted surrogate of indicators.
     )
     default_optimizer_options = {
         'shgo': dict(f_tol=1e-3, minimizer_kwargs=dict(f_tol=1e-3)),
@@ -106,6 +259,7 @@ class Model:
     }
     default_optimizer = 'shgo'
     default_convergence_model = None # Optional[str] Default convergence model
+    timeout_grace = 5. # [float] Time after the time limit before worker processes are killed.
     load_default_parameters = load_default_parameters
     
     @property
@@ -464,12 +618,14 @@ class Model:
         
         Note that only distribution bounds (i.e. lower and upper bounds) are 
         taken into account for sensitivity analysis, the type of distribution
-        (e.g., triangle vs. uniform) do not affect the sampling. 
+        (e.g., triangle vs. uniform) do not affect the sampling. The 
+        :meth:`sobol` and :meth:`morris` methods map these designs through 
+        the inverse cumulative distribution function of each parameter.
         
         """
         rule = rule.upper()
         if rule in ('C', 'NC', 'K', 'R', 'RG', 'NG', 'L', 'S', 'H', 'M'):
-            samples = self.get_joint_distribution().sample(N, rule).transpose()
+            samples = self.get_joint_distribution().sample(N, rule, **kwargs).transpose()
         else:
             if rule == 'MORRIS':
                 from SALib.sample import morris as sampler
@@ -485,7 +641,15 @@ class Model:
             samples = sampler.sample(problem, N=N, **kwargs)
         return samples
     
+    def _distribution_samples(self, design):
+        # Map a design uniform over parameter bounds through the inverse
+        # cumulative distribution functions of parameters
+        lb, ub = np.array([i.bounds for i in self._parameters], dtype=float).transpose()
+        quantiles = np.clip((design - lb) / (ub - lb), 0., 1.)
+        return self.get_joint_distribution().inv(quantiles.transpose()).transpose()
+    
     def _objective_function(self, sample, loss, parameters, convergence_model=None, **kwargs):
+        self._state_converged = False
         for f, s in zip(parameters, sample): 
             f.setter(s if f.scale is None else f.scale * s)
         if convergence_model:
@@ -494,44 +658,137 @@ class Model:
         return loss()
     
     def _update_state(self, sample, convergence_model=None, **kwargs):
+        shortcut = (
+            self._state_converged and not kwargs
+            and not (convergence_model or self._specification)
+        )
+        incremental = shortcut and self.incremental
+        uncoupled = shortcut and self.fast_uncoupled and not (self._system is None or self._system.isdynamic)
+        units = set()
+        all_units = False
         for i, (f, value) in enumerate(zip(self._parameters, sample)): 
             if f.active: 
+                if shortcut and value != f.last_value:
+                    unit = f.unit
+                    if f.coupled: uncoupled = False
+                    if unit is not None: 
+                        units.add(unit)
+                    elif f.coupled:
+                        incremental = False
+                    else: 
+                        # Without a unit operation (e.g., utility prices), 
+                        # the costs of all unit operations are reevaluated
+                        all_units = True
                 f.setter(value)
                 f.last_value = value
             else:
                 sample[i] = f.last_value
+        if uncoupled:
+            # Mass and energy balances cannot change; only reevaluate costs
+            self._reevaluate_costs(units, all_units)
+            return
+        self._state_converged = False
         if convergence_model:
             with convergence_model.practice(sample):
-                return self._specification() if self._specification else self._system.simulate(**kwargs)
+                outputs = self._specification() if self._specification else self._system.simulate(**kwargs)
+        elif incremental:
+            outputs = self._system.simulate_downstream(units)
+            if all_units: self._reevaluate_costs(units, all_units)
         else:
-            return self._specification() if self._specification else self._system.simulate(**kwargs)
+            system = self._system
+            cache = None if system is None else system.recycle_state_cache
+            if cache is None:
+                outputs = self._specification() if self._specification else system.simulate(**kwargs)
+            else:
+                cache.warm_start(sample, system)
+                outputs = self._specification() if self._specification else system.simulate(**kwargs)
+                cache.record(sample, system)
+        self._state_converged = True
+        return outputs
+    
+    def _reevaluate_costs(self, units, all_units=False):
+        if all_units: units = self._system.cost_units
+        for unit in units: unit._reevaluate()
+    
+    def _evaluate_uncoupled_sample(self, sample, changed):
+        # Evaluate sample that only differs from the last converged sample 
+        # in uncoupled parameters (given by the `changed` mask) 
+        parameters = self._parameters
+        units = set()
+        all_units = False
+        for i in np.flatnonzero(changed):
+            f = parameters[i]
+            value = sample[i]
+            f.setter(value)
+            f.last_value = value
+            unit = f.unit
+            if unit is None: all_units = True
+            else: units.add(unit)
+        self._reevaluate_costs(units, all_units)
+        return [i() for i in self.indicators]
+    
+    def _uncoupled_blocks(self, index):
+        # Changed parameters of each sample with respect to the previous one 
+        # (in evaluation order), or None if coupled parameters also changed
+        samples = self._samples[index]
+        parameters = self._parameters
+        active = np.array([i.active for i in parameters], bool)
+        coupled = np.array([i.coupled for i in parameters], bool)
+        changed = samples[1:] != samples[:-1]
+        changed &= active
+        blocks = [None]
+        blocks.extend([None if i[coupled].any() else i for i in changed])
+        return blocks
     
     def _evaluate_sample(self, sample, convergence_model=None, **kwargs):
+        self._sample_timed_out = False
+        timeout = self.timeout
+        if timeout is None: 
+            return self._evaluate_sample_within_time(sample, convergence_model, **kwargs)
+        try:
+            with Deadline(timeout):
+                values = self._evaluate_sample_within_time(sample, convergence_model, **kwargs)
+        except EvaluationTimeout as exception:
+            self._sample_timed_out = True
+            return self._hook_exception(exception, sample, self._restore_last_state)
+        if self._state_converged: self._take_last_snapshot()
+        return values
+    
+    def _evaluate_sample_within_time(self, sample, convergence_model=None, **kwargs):
         state_updated = False
         try:
             self._update_state(sample, convergence_model, **kwargs)
             state_updated = True
+            if self._baseline_snapshot is None: self._take_baseline_snapshot()
             return [i() for i in self.indicators]
+        except EvaluationTimeout:
+            raise
         except Exception as exception:
             if self.retry_evaluation and not state_updated:
                 self._reset_system()
                 try:
                     self._update_state(sample, convergence_model, **kwargs)
                     return [i() for i in self.indicators]
+                except EvaluationTimeout:
+                    raise
                 except Exception as new_exception: 
                     exception = new_exception
-            if self._exception_hook: 
-                values = self._exception_hook(exception, sample)
-                self._reset_system()
-                if isinstance(values, Sized) and len(values) == len(self.indicators):
-                    return values
-                elif values is not None:
-                    raise RuntimeError('exception hook must return either None or '
-                                       'an array of indicator values for the given sample')
-            return self._failed_evaluation()
+            return self._hook_exception(exception, sample, self._reset_system)
+    
+    def _hook_exception(self, exception, sample, reset):
+        values = self._exception_hook(exception, sample) if self._exception_hook else None
+        reset()
+        if values is None:
+            return [np.nan] * len(self.indicators)
+        elif isinstance(values, Sized) and len(values) == len(self.indicators):
+            return values
+        else:
+            raise RuntimeError('exception hook must return either None or '
+                               'an array of indicator values for the given sample')
     
     def __init__(self, system, indicators=None, specification=None, 
-                 parameters=None, retry_evaluation=None, exception_hook=None):
+                 parameters=None, retry_evaluation=None, exception_hook=None,
+                 incremental=None, fast_uncoupled=None, timeout=None):
         self.specification = specification
         if parameters:
             self.set_parameters(parameters)
@@ -543,6 +800,15 @@ class Model:
         self.indicators = indicators or ()
         self.exception_hook = 'warn' if exception_hook is None else exception_hook 
         self.retry_evaluation = bool(system) if retry_evaluation is None else retry_evaluation
+        self.incremental = False if incremental is None else incremental
+        self.fast_uncoupled = False if fast_uncoupled is None else fast_uncoupled
+        self._state_converged = False
+        self._baseline_snapshot = None
+        self.timeout = timeout
+        self.timed_out = []
+        self._sample_timed_out = False
+        self._last_snapshot = None
+        self.surrogate = None
         self.table = None
         self._erase()
         
@@ -554,6 +820,15 @@ class Model:
         copy._system = self._system
         copy._specification = self._specification
         copy._indicators = self._indicators
+        copy.incremental = self.incremental
+        copy.fast_uncoupled = self.fast_uncoupled
+        copy._state_converged = False
+        copy._baseline_snapshot = None
+        copy.timeout = self.timeout
+        copy.timed_out = []
+        copy._sample_timed_out = False
+        copy._last_snapshot = None
+        copy.surrogate = self.surrogate
         if self.table is None:
             copy._samples = copy.table = None
         else:
@@ -582,11 +857,10 @@ class Model:
             return
         if isinstance(exception_hook, str):
             if exception_hook == 'ignore':
-                self._exception_hook = lambda exception, sample: None
+                self._exception_hook = ignore_exception
             elif exception_hook == 'warn':
-                self._exception_hook = lambda exception, sample: warn(FailedEvaluation(f"[{type(exception).__name__}] {exception}"), stacklevel=6)
+                self._exception_hook = warn_exception
             elif exception_hook == 'raise':
-                def raise_exception(exception, sample): raise exception from None
                 self._exception_hook = raise_exception
             else:
                 raise ValueError(f"invalid exception hook name '{exception_hook}'; "
@@ -691,44 +965,18 @@ class Model:
         if N_samples < 2: 
             self._index = list(range(N_samples))
             return
-        if distance is None: distance = 'cityblock'
-        length = samples.shape[0]
         columns = [i for i, parameter in enumerate(parameters) if parameter.coupled]
-        samples = samples.copy()
         samples = samples[:, columns]
         samples_min = samples.min(axis=0)
         samples_max = samples.max(axis=0)
         samples_diff = samples_max - samples_min
+        samples_diff[samples_diff == 0] = 1. # Constant parameters
         normalized_samples = (samples - samples_min) / samples_diff
-        nearest_arr = cdist(normalized_samples, normalized_samples, metric=distance)
-        if algorithm is None: algorithm = 'nearest neighbor'
-        if algorithm == 'nearest neighbor':
-            nearest_arr = np.argsort(nearest_arr, axis=1)
-            remaining = set(range(length))
-            self._index = index = [0]
-            nearest = nearest_arr[0, 1]
-            index.append(nearest)
-            remaining.remove(0)
-            remaining.remove(nearest)
-            N_remaining = length - 2
-            N_remaining_last = N_remaining + 1
-            while N_remaining:
-                assert N_remaining_last != N_remaining, "issue in sorting algorithm"
-                N_remaining_last = N_remaining
-                for i in range(1, length):
-                    next_nearest = nearest_arr[nearest, i]
-                    if next_nearest in remaining:
-                        nearest = next_nearest
-                        remaining.remove(nearest)
-                        index.append(nearest)
-                        N_remaining -= 1
-                        break
-        else:
-            raise ValueError(f"algorithm {algorithm!r} is not available (yet); "
-                              "only 'nearest neighbor' is available")
+        self._index = get_sample_order(normalized_samples, distance, algorithm)
         
     def load_samples(self, samples=None, sort=None, file=None, 
-                     autoload=None, autosave=None, distance=None):
+                     autoload=None, autosave=None, distance=None,
+                     algorithm=None):
         """
         Load samples for evaluation.
         
@@ -750,14 +998,25 @@ class Model:
             Whether to load samples and simulation order from file (if possible).
         distance : str, optional
             Distance indicator used for sorting. Defaults to 'cityblock'.
-            See scipy.spatial.distance.cdist for options.
+            See scipy.spatial.distance.cdist for options ('kd-tree' only
+            supports 'cityblock', 'euclidean', and 'chebyshev').
         algorithm : str, optional
-            Algorithm used for sorting. Defaults to 'nearest neighbor'.
-            Note that neirest neighbor is a greedy algorithm that is known to result, 
-            on average, in paths 25% longer than the shortest path.
+            Algorithm used for sorting:
+            
+            * 'nearest neighbor': Greedy walk using a dense distance matrix 
+              (O(N^2) memory).
+            * 'kd-tree': Greedy walk using a KD-tree (O(N) memory).
+            * 'hilbert' or 'morton': Order along a space-filling curve 
+              (fastest, but consecutive samples are farther apart). 
+            
+            Defaults to 'nearest neighbor' for up to 5000 samples and 
+            'kd-tree' otherwise. Note that nearest neighbor is a greedy 
+            algorithm that is known to result, on average, in paths 25% 
+            longer than the shortest path.
         
         """
         parameters = self._parameters
+        self._discard_snapshots()
         if autoload:
             try:
                 with open(file, "rb") as f: (self._samples, self._index) = pickle.load(f)
@@ -783,7 +1042,7 @@ class Model:
         samples = self._sample_hook(samples, parameters)
         if sort is None: sort = True
         if sort and any([i.coupled for i in parameters]): 
-            self._load_sample_order(samples, parameters, distance)
+            self._load_sample_order(samples, parameters, distance, algorithm)
         else:
             self._index = list(range(samples.shape[0]))
         empty_indicator_data = np.zeros((len(samples), len(indicators)))
@@ -909,7 +1168,8 @@ class Model:
         return result, convergence_model
     
     def evaluate(self, notify=0, file=None, autosave=0, autoload=False,
-                 convergence_model=None, **kwargs):
+                 convergence_model=None, workers=None, factory=None, 
+                 chunksize=None, store=None, stop_when=None, **kwargs):
         """
         Evaluate indicators over the loaded samples and save values to `table`.
         
@@ -920,14 +1180,40 @@ class Model:
         file : str, optional
             Name of file to save/load pickled evaluation results.
         autosave : int, optional
-            If 1 or greater, save pickled evaluation results after the given number of sample evaluations.
+            If 1 or greater, save pickled evaluation results after the given 
+            number of sample evaluations. When using a result store, flush
+            results to disk after the given number of sample evaluations 
+            instead; only flushed samples are kept when resuming after a
+            crash.
         autoload : bool, optional
-            Whether to load pickled evaluation results from file.
+            Whether to load pickled evaluation results from file (or resume
+            from the result store).
         convergence_model : ConvergencePredictionModel, optional
             A prediction model for accelerated system convergence. Defaults
             to no convergence model and the last solution
             as the initial guess for the next scenario. If a string is passed, 
             a ConvergenceModel will be created using that model type.
+        workers : int, optional
+            Number of worker processes. Defaults to evaluating samples
+            in the current process.
+        factory : Callable() -> Model, optional
+            Picklable function that creates a replica of the model (with
+            its own system) in each worker process. Defaults to the model 
+            itself, which is inherited by forked processes (or pickled 
+            with other start methods).
+        chunksize : int, optional
+            Number of contiguous samples (in evaluation order) given to a 
+            worker at a time. Larger chunks help each worker keep a warm 
+            recycle state. Defaults to distributing about 4 chunks per worker.
+        store : str|ResultStore, optional
+            Directory of (or a) :class:`~biosteam.evaluation.ResultStore` 
+            to save indicator values to as each sample is evaluated. Cannot 
+            be used together with `file`.
+        stop_when : StoppingRule, optional
+            Rule to stop evaluating samples once estimates of indicator 
+            statistics reach a target precision. Samples are then evaluated 
+            in random batches and the remaining samples are left as NaN.
+            The achieved precision is stored in `stop_when.results`.
         kwargs : dict
             Any keyword arguments passed to :func:`biosteam.System.simulate`.
         
@@ -936,12 +1222,41 @@ class Model:
         Any changes made to either the model or the samples will not be accounted
         for when autoloading and may lead to misleading results.
         
+        Notes
+        -----
+        If the system has a :class:`~biosteam.RecycleStateCache` with a file,
+        the cache is saved when autosaving and after evaluation (only if new 
+        states were recorded). States recorded in worker processes are sent 
+        back with each result and stored in the cache of the main process.
+        
+        When evaluating in worker processes, convergence models are created
+        for each worker and must be passed as a model type (string).
+        Samples are distributed in contiguous chunks of the sorted
+        evaluation order while autosave, notify, and the exception
+        hook work as in serial evaluation.
+        
+        Indices of samples that exceeded the time limit of the model (see
+        `timeout`) are stored in `timed_out`.
+        
         """
         samples = self._samples
         if samples is None: raise RuntimeError('must load samples before evaluating')
+        if workers is not None and workers < 1:
+            raise ValueError('workers must be a positive integer')
+        parallel = workers is not None and workers > 1
+        if parallel:
+            if convergence_model is not None and not isinstance(convergence_model, str):
+                raise ValueError(
+                    'convergence model must be passed as a model type (string) '
+                    'when evaluating in worker processes'
+                )
+        elif factory is not None:
+            raise ValueError('factory can only be used when evaluating in worker processes')
+        if store is not None and file is not None:
+            raise ValueError('cannot use both a result store and a file')
         evaluate_sample = self._evaluate_sample
         table = self.table
-        if isinstance(convergence_model, str):
+        if isinstance(convergence_model, str) and not parallel:
             convergence_model = ConvergenceModel(
                 system=self.system,
                 predictors=self.parameters,
@@ -960,14 +1275,29 @@ class Model:
         else:
             evaluate = evaluate_sample
         N_samples, _ = samples.shape
-        if autoload: 
+        close_store = isinstance(store, str)
+        if close_store:
+            store = ResultStore(store, samples, var_indices(self._indicators), autoload)
+        if store is not None:
+            if autoload:
+                number = len(store)
+                values = [None] * N_samples
+                store_values = store.get_values()
+                for i in store.evaluated: values[i] = store_values[i].tolist()
+                index = [i for i in self._index if i not in store]
+                if notify: count[0] = number
+            else:
+                number = 0
+                index = self._index
+                values = [None] * N_samples
+        elif autoload: 
             try:
                 with open(file, "rb") as f:
                     number, values, table_index, table_columns = pickle.load(f)
                 if (table_index != table.index).any() or (table_columns != table.columns).any():
                     raise ValueError('table layout does not match autoload file')
                 del table_index, table_columns
-                index = self._index[number:]
+                index = [i for i in self._index if values[i] is None]
             except:
                 number = 0
                 index = self._index
@@ -980,30 +1310,248 @@ class Model:
             values = [None] * N_samples
         export = 'export_state_to' in kwargs
         layout = table.index, table.columns
-        try:
-            for number, i in enumerate(index, number + 1): 
-                if export: kwargs['sample_id'] = i
-                values[i] = evaluate(samples[i], convergence_model, **kwargs)
+        
+        cache = None if self._system is None else self._system.recycle_state_cache
+        if cache is not None and not cache.file: cache = None
+        def save(number, i):
+            if store is not None:
+                store.append(i, values[i])
                 if autosave and not number % autosave: 
-                    obj = (number, values, *layout)
-                    try:
-                        with open(file, 'wb') as f: pickle.dump(obj, f)
-                    except FileNotFoundError:
-                        import os
-                        head, tail = os.path.split(file)
-                        os.mkdir(head)
-                        with open(file, 'wb') as f: pickle.dump(obj, f)
+                    store.flush()
+                    if cache is not None and cache._unsaved: cache.save()
+            elif autosave and not number % autosave: 
+                obj = (number, values, *layout)
+                try:
+                    with open(file, 'wb') as f: pickle.dump(obj, f)
+                except FileNotFoundError:
+                    import os
+                    head, tail = os.path.split(file)
+                    os.mkdir(head)
+                    with open(file, 'wb') as f: pickle.dump(obj, f)
+                if cache is not None and cache._unsaved: cache.save()
+        
+        number = [number]
+        timed_out = self.timed_out = []
+        pool = None
+        try:
+            if parallel:
+                if factory is not None: self._check_replica(factory())
+                system = self._system
+                states = None if system is None else system.recycle_state_cache
+                if states is not None: layout = states.get_layout(system)
+                def callback(i, value):
+                    values[i], sample_timed_out, state = value
+                    if sample_timed_out: timed_out.append(i)
+                    if state is not None and states is not None:
+                        states._check_layout(layout)
+                        states._store(*state)
+                    number[0] += 1
+                    if notify:
+                        count[0] += 1
+                        if not count[0] % notify:
+                            print(f"{count} Elapsed time: {timer.elapsed_time:.0f} sec")
+                    save(number[0], i)
+                def timeout_callback(i):
+                    # Worker was killed
+                    exception = EvaluationTimeout('worker process exceeded time limit')
+                    callback(i, (self._hook_exception(exception, samples[i], lambda: None), True, None))
+                setup = ModelReplica(
+                    self, factory, self._exception_hook, self.timeout, convergence_model, kwargs,
+                )
+                timeout = None if self.timeout is None else self.timeout + self.timeout_grace
+                # Workers (and their converged states) are reused across batches
+                pool = WorkerPool(setup, evaluate_replica_sample, workers, timeout=timeout)
+                def run(index):
+                    size = chunksize or max(int(np.ceil(len(index) / (4 * workers))), 1)
+                    items = [(i, (i, samples[i])) for i in index]
+                    chunks = [items[i:i+size] for i in range(0, len(items), size)]
+                    pool.evaluate(chunks, callback, timeout_callback)
+            else:
+                system = self._system
+                blocks = (
+                    self.fast_uncoupled and not (kwargs or convergence_model or self._specification) 
+                    and not (system is None or system.isdynamic)
+                )
+                def run(index):
+                    # Samples that only differ in uncoupled parameters are 
+                    # evaluated in blocks against the last converged state
+                    changes = self._uncoupled_blocks(index) if blocks else repeat(None)
+                    for i, changed in zip(index, changes): 
+                        number[0] += 1
+                        if export: kwargs['sample_id'] = i
+                        sample = samples[i]
+                        if changed is None or not self._state_converged:
+                            values[i] = evaluate(sample, convergence_model, **kwargs)
+                            if self._sample_timed_out: timed_out.append(i)
+                        else:
+                            try:
+                                values[i] = self._evaluate_uncoupled_sample(sample, changed)
+                            except Exception:
+                                self._state_converged = False
+                                values[i] = evaluate(sample, convergence_model, **kwargs)
+                                if self._sample_timed_out: timed_out.append(i)
+                            else:
+                                if notify: 
+                                    count[0] += 1
+                                    if not count[0] % notify:
+                                        print(f"{count} Elapsed time: {timer.elapsed_time:.0f} sec")
+                        save(number[0], i)
+            if stop_when is None:
+                run(index)
+            else:
+                for batch in stop_when._load(self, index):
+                    run(batch)
+                    if stop_when._update(samples, values, batch): break
         finally:
+            if pool is not None: pool.close()
+            timed_out.sort()
             table[var_indices(self._indicators)] = replace_nones(values, [np.nan] * len(self.indicators))
+            if cache is not None and cache._unsaved: cache.save()
+            if close_store: 
+                store.close()
+            elif store is not None:
+                store.flush()
+    
+    def evaluate_ensemble(self, t_eval, directory, t_span=None, notify=0,
+                          workers=None, factory=None, chunksize=None,
+                          keep_samples=False, **dynsim_kwargs):
+        """
+        Dynamically simulate the system at each loaded sample (e.g., 
+        different parameters or initial states), save indicators to `table`, 
+        and return the time series of tracked subjects of all samples.
+        
+        Parameters
+        ----------
+        t_eval : Iterable[float]
+            Time points to save.
+        directory : str
+            Directory to save time series data. Each sample is saved by the
+            process that simulated it and all samples are then gathered into
+            "ensemble.npy" without loading them into memory at once.
+        t_span : tuple[float, float], optional
+            Interval of integration. Defaults to the range of `t_eval`.
+        notify=0 : int, optional
+            If 1 or greater, notify elapsed time after the given number of sample evaluations. 
+        workers : int, optional
+            Number of worker processes. Each worker simulates samples with 
+            its own replica of the system. Defaults to evaluating samples 
+            in the current process.
+        factory : Callable() -> Model, optional
+            Picklable function that creates a replica of the model (with
+            its own system) in each worker process.
+        chunksize : int, optional
+            Number of contiguous samples given to a worker at a time.
+        keep_samples : bool, optional
+            Whether to keep the time series files of each sample. Defaults 
+            to False.
+        **dynsim_kwargs :
+            Any keyword arguments passed to :func:`biosteam.System.dynamic_run`.
+            The state is reset before each sample unless a `state_reset_hook`
+            is given.
+        
+        Returns
+        -------
+        numpy.memmap
+            Read-only time series data by sample (rows of `table`), time 
+            point, and variable. Variables are ordered as in
+            `system.scope.export()` (starting with time). Samples that 
+            failed are filled with NaN.
+        
+        """
+        import os
+        system = self._system
+        if system is None or not system.isdynamic:
+            raise RuntimeError('ensemble evaluation requires a dynamic system')
+        if not system.scope.subjects:
+            raise RuntimeError(
+                'no subjects tracked; use `System.set_dynamic_tracker` to '
+                'select subjects to record'
+            )
+        t_eval = np.asarray(t_eval, dtype=float)
+        if t_span is None: t_span = (t_eval[0], t_eval[-1])
+        dynsim_kwargs.setdefault('state_reset_hook', 'reset_cache')
+        os.makedirs(directory, exist_ok=True)
+        files = [os.path.join(directory, f'sample_{i}.npy') for i in range(len(self.table))]
+        for file in files: 
+            if os.path.exists(file): os.remove(file) # Results of failed samples must not be stale
+        sample_file = os.path.join(directory, 'sample.npy')
+        self.evaluate(
+            notify=notify, workers=workers, factory=factory, chunksize=chunksize,
+            t_span=t_span, t_eval=t_eval, export_state_to=sample_file, 
+            **dynsim_kwargs
+        )
+        shape = None
+        for file in files:
+            if os.path.exists(file):
+                shape = np.load(file, mmap_mode='r').shape
+                break
+        if shape is None: raise RuntimeError('all samples failed')
+        ensemble_file = os.path.join(directory, 'ensemble.npy')
+        ensemble = np.lib.format.open_memmap(
+            ensemble_file, mode='w+', shape=(len(files), *shape)
+        )
+        for i, file in enumerate(files):
+            if os.path.exists(file):
+                ensemble[i] = np.load(file, mmap_mode='r')
+                if not keep_samples: os.remove(file)
+            else:
+                ensemble[i] = np.nan
+        ensemble.flush()
+        del ensemble
+        return np.load(ensemble_file, mmap_mode='r')
+    
+    def _check_replica(self, model):
+        if not isinstance(model, Model):
+            raise ValueError(f'factory must return a Model object, not a {type(model).__name__!r} object')
+        if var_indices(model._parameters) != var_indices(self._parameters):
+            raise ValueError('parameters of model replica do not match')
+        if var_indices(model._indicators) != var_indices(self._indicators):
+            raise ValueError('indicators of model replica do not match')
+    
+    def _take_baseline_snapshot(self):
+        system = self._system
+        if system is None or getattr(system, 'isdynamic', False): return
+        # Feeds are set by parameters (or externally) and must not be rolled back
+        self._baseline_snapshot = system.snapshot(feeds=False)
+    
+    def _discard_snapshots(self):
+        # Snapshots are only valid while the state of the system is only 
+        # changed through the parameters
+        self._baseline_snapshot = None
+        self._last_snapshot = None
     
     def _reset_system(self):
-        if self._system is None: return 
-        self._system.empty_outlet_streams()
-        self._system.reset_cache()
+        self._state_converged = False
+        system = self._system
+        if system is None: return 
+        system.reset_cache()
+        snapshot = self._baseline_snapshot
+        if snapshot is None:
+            system.empty_outlet_streams()
+        else:
+            # Bulk copy of the last known good state
+            try: 
+                system.restore(snapshot)
+            except:
+                self._baseline_snapshot = None
+                system.empty_outlet_streams()
     
-    def _failed_evaluation(self):
-        self._reset_system()
-        return [np.nan] * len(self.indicators)
+    def _take_last_snapshot(self):
+        system = self._system
+        if system is None or getattr(system, 'isdynamic', False): return
+        self._last_snapshot = system.snapshot(feeds=False)
+    
+    def _restore_last_state(self):
+        snapshot = self._last_snapshot
+        if snapshot is None: return self._reset_system()
+        self._state_converged = False
+        system = self._system
+        system.reset_cache()
+        try:
+            system.restore(snapshot)
+        except:
+            self._last_snapshot = None
+            self._reset_system()
     
     def indicators_at_baseline(self):
         """Return indicator values at baseline sample."""
@@ -1016,7 +1564,7 @@ class Model:
             xlfile=None, notify=0, notify_coordinate=True,
             multi_coordinate=False, 
             simulation_independent_coordinate=False,
-            f_evaluate=None
+            f_evaluate=None, workers=None, directory=None, sort=True,
         ):
         """
         Evaluate across coordinate and save sample indicators.
@@ -1039,6 +1587,27 @@ class Model:
             Notify elapsed time after given number of scenario evaluations.
         f_evaluate : callable, optional
             Function to evaluate model. Defaults to evaluate method.
+        workers : int, optional
+            Number of worker processes to distribute coordinate points 
+            across (in contiguous groups of neighboring points). Defaults 
+            to evaluating points in the current process.
+        directory : str, optional
+            Directory to save indicator values to as samples are evaluated,
+            with a :class:`~biosteam.evaluation.ResultStore` for each 
+            coordinate point. Points (and samples) already saved are loaded 
+            instead of evaluated again.
+        sort : bool, optional
+            Whether to evaluate neighboring coordinate points consecutively
+            and alternate the direction of samples between points, so that 
+            each evaluation starts from a nearby converged state. 
+            Defaults to True.
+        
+        Notes
+        -----
+        When evaluating in worker processes, each worker evaluates all
+        samples at its coordinate points with a copy of the model (inherited
+        by forked processes or pickled otherwise together with 
+        `f_coordinate`, which must also be picklable).
         
         """
         if (isinstance(f_coordinate, Parameter)
@@ -1053,10 +1622,14 @@ class Model:
                     xlfile=xlfile, notify=notify, notify_coordinate=notify_coordinate,
                     multi_coordinate=multi_coordinate,
                     simulation_independent_coordinate=simulation_independent_coordinate,
-                    f_evaluate=f_evaluate
+                    f_evaluate=f_evaluate, workers=workers, directory=directory,
+                    sort=sort,
                 )
             finally:
                 f_coordinate.active = active
+        if workers is not None and workers < 1:
+            raise ValueError('workers must be a positive integer')
+        parallel = workers is not None and workers > 1
         N_points = len(coordinate)
         if simulation_independent_coordinate:
             if f_evaluate is not None: 
@@ -1064,6 +1637,11 @@ class Model:
                     'cannot pass `f_evaluate` if coordinate is '
                     'independent from simulation'
                 )
+            if parallel or directory is not None:
+                raise ValueError(
+                    'cannot evaluate in worker processes or save to a directory '
+                    'if coordinate is independent from simulation'
+                )
             f_evaluate = self.evaluate
             samples = self._samples
             if samples is None: raise RuntimeError('must load samples before evaluating')
@@ -1092,6 +1670,8 @@ class Model:
                 evaluate(samples[i])
                 for j, x in enumerate(coordinate):
                     f_coordinate(x)
+                    self._state_converged = False
+                    self._discard_snapshots()
                     for key, indicator in zip(indicator_data, self.indicators):
                         data = indicator_data[key]
                         try:
@@ -1099,30 +1679,70 @@ class Model:
                         except:
                             data[i, j] = None
         else:
-            if f_evaluate is None: f_evaluate = self.evaluate
+            if f_evaluate is not None and (parallel or directory is not None):
+                raise ValueError(
+                    'cannot pass `f_evaluate` when evaluating in worker '
+                    'processes or saving to a directory'
+                )
+            order = get_coordinate_order(coordinate) if sort else list(range(N_points))
             
             # Initialize timer
             if notify_coordinate:
-                from biosteam.utils import Timer
                 timer = Timer()
                 timer.start()
-                def evaluate(**kwargs):
-                    f_evaluate(**kwargs)
+                def notify_point(n):
                     print(f"[Coordinate {n}] Elapsed time: {timer.elapsed_time:.0f} sec")
             else:
-                evaluate = f_evaluate
-            indicator_data = None
-            for n, x in enumerate(coordinate):
-                f_coordinate(*x) if multi_coordinate else f_coordinate(x)
-                evaluate(notify=notify)
-                if indicator_data is None:
-                    # Initialize data containers dynamically in case samples are loaded during evaluation
-                    N_samples, _ = self.table.shape
-                    indicator_indices = var_indices(self.indicators)
-                    shape = (N_samples, N_points)
-                    indicator_data = {i: np.zeros(shape) for i in indicator_indices}
-                for indicator in indicator_data:
-                    indicator_data[indicator][:, n] = self.table[indicator]
+                notify_point = None
+            if f_evaluate is None:
+                if self._samples is None: raise RuntimeError('must load samples before evaluating')
+                N_samples, _ = self.table.shape
+                indicator_indices = var_indices(self.indicators)
+                shape = (N_samples, N_points)
+                indicator_data = {i: np.zeros(shape) for i in indicator_indices}
+                if directory is None:
+                    stores = [None] * N_points
+                else:
+                    import os
+                    stores = [os.path.join(directory, f'coordinate_{n}') for n in range(N_points)]
+                def save_point(n, values):
+                    for data, column in zip(indicator_data.values(), values.transpose()):
+                        data[:, n] = column
+                    if notify_point: notify_point(n)
+                if parallel:
+                    replica = CoordinateReplica(
+                        self, f_coordinate, multi_coordinate, stores, notify, sort,
+                    )
+                    size = max(int(np.ceil(N_points / workers)), 1)
+                    items = [(n, (n, coordinate[n])) for n in order]
+                    chunks = [items[i:i+size] for i in range(0, N_points, size)]
+                    evaluate_in_processes(
+                        replica, evaluate_replica_coordinate, chunks, workers, save_point
+                    )
+                else:
+                    for m, n in enumerate(order):
+                        values = self._evaluate_at_coordinate(
+                            f_coordinate, coordinate[n], multi_coordinate, 
+                            stores[n], notify, sort and m % 2,
+                        )
+                        save_point(n, values)
+            else:
+                indicator_data = None
+                for n in order:
+                    x = coordinate[n]
+                    f_coordinate(*x) if multi_coordinate else f_coordinate(x)
+                    self._state_converged = False
+                    self._discard_snapshots()
+                    f_evaluate(notify=notify)
+                    if notify_point: notify_point(n)
+                    if indicator_data is None:
+                        # Initialize data containers dynamically in case samples are loaded during evaluation
+                        N_samples, _ = self.table.shape
+                        indicator_indices = var_indices(self.indicators)
+                        shape = (N_samples, N_points)
+                        indicator_data = {i: np.zeros(shape) for i in indicator_indices}
+                    for indicator in indicator_data:
+                        indicator_data[indicator][:, n] = self.table[indicator]
         
         if xlfile:
             if multi_coordinate:
@@ -1141,6 +1761,136 @@ class Model:
                     data.to_excel(writer, sheet_name=indicator.short_description)
         return indicator_data
     
+    def _evaluate_at_coordinate(self, f_coordinate, x, multi_coordinate, 
+                                store=None, notify=0, reverse=False):
+        """Evaluate all samples at a coordinate point and return indicator 
+        values (samples by indicators)."""
+        f_coordinate(*x) if multi_coordinate else f_coordinate(x)
+        self._state_converged = False
+        self._discard_snapshots()
+        index = self._index
+        # Start with the last sample evaluated at the previous point
+        if reverse: self._index = index[::-1]
+        try:
+            self.evaluate(notify=notify, store=store, autoload=store is not None)
+        finally:
+            self._index = index
+        return self.table[var_indices(self._indicators)].values
+    
+    def sobol(self, N, indicators=None, num_resamples=100, conf_level=0.95, 
+              seed=None, sort=True, algorithm=None, **kwargs):
+        """
+        Evaluate the model at a Saltelli design of N * (D + 2) samples (D 
+        being the number of parameters) and return a dictionary of 
+        DataFrame objects of first order ('S1') and total order ('ST') 
+        Sobol indices between indicators and parameters, and their 
+        confidence intervals ('S1_conf' and 'ST_conf').
+        
+        Parameters
+        ----------
+        N : int
+            Number of base samples (preferably a power of 2).
+        indicators : Iterable[Indicator], optional 
+            Indicators to analyze. Defaults to all indicators.
+        num_resamples : int, optional
+            Number of bootstrap resamples for confidence intervals. 
+            Defaults to 100.
+        conf_level : float, optional
+            Confidence level of intervals. Defaults to 0.95.
+        seed : int, optional
+            Seed for sampling and bootstrapping.
+        sort : bool, optional
+            Whether to sort samples to optimize convergence speed 
+            (see :meth:`load_samples`). Defaults to True.
+        algorithm : str, optional
+            Sorting algorithm (see :meth:`load_samples`).
+        kwargs : dict
+            Any keyword arguments passed to :meth:`evaluate`.
+        
+        Notes
+        -----
+        Indices are computed with the estimators of Saltelli et al. (2010)
+        for first order indices and Jansen (1999) for total order indices. 
+        The Saltelli design (uniform over parameter bounds) is mapped through 
+        the inverse cumulative distribution function of each parameter, so 
+        indices account for parameter distributions. Groups of samples with 
+        failed evaluations are ignored.
+        
+        """
+        sampling_kwargs = {'calc_second_order': False}
+        if seed is not None: sampling_kwargs['seed'] = seed
+        samples = self._distribution_samples(self.sample(N, 'SOBOL', **sampling_kwargs))
+        self.load_samples(samples, sort=sort, algorithm=algorithm)
+        self.evaluate(**kwargs)
+        N_parameters = len(self._parameters)
+        return self._sensitivity_indices(
+            lambda Y: sobol_indices(Y, N_parameters, num_resamples, conf_level, seed),
+            ('S1', 'S1_conf', 'ST', 'ST_conf'), indicators,
+        )
+    
+    def morris(self, N, indicators=None, num_levels=4, num_resamples=100, 
+               conf_level=0.95, seed=None, sort=True, algorithm=None, **kwargs):
+        """
+        Evaluate the model at N Morris trajectories of D + 1 samples (D 
+        being the number of parameters) and return a dictionary of 
+        DataFrame objects of the mean ('mu'), mean of absolute values 
+        ('mu_star'), and standard deviation ('sigma') of elementary effects
+        between indicators and (normalized) parameters, and the confidence 
+        interval of 'mu_star' ('mu_star_conf').
+        
+        Parameters
+        ----------
+        N : int
+            Number of trajectories.
+        indicators : Iterable[Indicator], optional 
+            Indicators to analyze. Defaults to all indicators.
+        num_levels : int, optional
+            Number of grid levels of each parameter. Defaults to 4.
+        num_resamples : int, optional
+            Number of bootstrap resamples for confidence intervals. 
+            Defaults to 100.
+        conf_level : float, optional
+            Confidence level of intervals. Defaults to 0.95.
+        seed : int, optional
+            Seed for sampling and bootstrapping.
+        sort : bool, optional
+            Whether to sort samples to optimize convergence speed 
+            (see :meth:`load_samples`). Defaults to True.
+        algorithm : str, optional
+            Sorting algorithm (see :meth:`load_samples`).
+        kwargs : dict
+            Any keyword arguments passed to :meth:`evaluate`.
+        
+        Notes
+        -----
+        Trajectories are laid out on a grid of quantiles (uniform over 
+        parameter bounds) and mapped through the inverse cumulative 
+        distribution function of each parameter. Elementary effects are 
+        computed with respect to these quantiles (i.e., parameters normalized 
+        by their bounds for uniform distributions). Trajectories with failed 
+        evaluations are ignored.
+        
+        """
+        sampling_kwargs = {'num_levels': num_levels}
+        if seed is not None: sampling_kwargs['seed'] = seed
+        design = self.sample(N, 'MORRIS', **sampling_kwargs)
+        self.load_samples(self._distribution_samples(design), sort=sort, algorithm=algorithm)
+        self.evaluate(**kwargs)
+        bounds = [i.bounds for i in self._parameters]
+        return self._sensitivity_indices(
+            lambda Y: morris_effects(design, Y, bounds, num_resamples, conf_level, seed),
+            ('mu', 'mu_star', 'sigma', 'mu_star_conf'), indicators,
+        )
+    
+    def _sensitivity_indices(self, f, keys, indicators):
+        table = self.table
+        indicator_indices = var_indices(indicators or self.indicators)
+        data = np.array([f(table[i].values) for i in indicator_indices]) # indicator, key, parameter
+        index = indices_to_multiindex(var_indices(self._parameters), ('Element', 'Parameter'))
+        columns = indices_to_multiindex(indicator_indices, ('Element', 'Indicator'))
+        return {key: pd.DataFrame(data[:, n].transpose(), index=index, columns=columns)
+                for n, key in enumerate(keys)}
+    
     def spearman(self, parameters=None, indicators=None):
         warn(DeprecationWarning('this method will be deprecated in biosteam 2.25; '
                                 'use spearman_r instead'), stacklevel=2)
@@ -1399,6 +2149,125 @@ class Model:
         columns = indices_to_multiindex(indicator_indices, ('Element', 'Indicator'))        
         return [pd.DataFrame(i, index=index, columns=columns) for i in (data[..., 0], data[..., 1])]
         
+    def fit_surrogate(self, model_type=None, indicators=None, kfold=5, 
+                      seed=None, **kwargs):
+        """
+        Fit, cross-validate, and return a :class:`~biosteam.evaluation.Surrogate`
+        of indicators from the evaluated samples in `table`. The surrogate 
+        is also stored as the `surrogate` attribute, so that indicators at
+        new samples may be predicted with `model.surrogate(samples)`.
+        
+        Parameters
+        ----------
+        model_type : str|Callable, optional
+            Either 'polynomial chaos', 'gaussian process' (or 'rbf'), or a 
+            function that returns a regressor. Defaults to 'gaussian process'.
+        indicators : Iterable[Indicator], optional 
+            Indicators to fit. Defaults to all indicators.
+        kfold : int, optional
+            Number of folds for cross-validation (errors are stored in
+            `surrogate.cross_validation`). Defaults to 5.
+        seed : int, optional
+            Seed for splitting folds.
+        kwargs : dict
+            Keyword arguments passed to the regressors.
+        
+        """
+        if self.table is None: raise RuntimeError('must evaluate samples before fitting a surrogate')
+        if indicators is None: indicators = self._indicators
+        parameters = self._parameters
+        table = self.table
+        X = table[var_indices(parameters)].values
+        Y = table[var_indices(indicators)].values
+        self.surrogate = surrogate = Surrogate(parameters, indicators, model_type, **kwargs)
+        return surrogate.fit(X, Y, kfold, seed)
+    
+    def active_learning(self, N, batch_size=None, candidates=None, rule='L',
+                        model_type=None, indicators=None, kfold=5, seed=None, 
+                        **kwargs):
+        """
+        Simulate N new samples where the uncertainty of the surrogate is 
+        largest, refitting the surrogate after each batch, and return the 
+        surrogate fitted to all evaluated samples. New samples and indicator 
+        values are appended to `table`.
+        
+        Parameters
+        ----------
+        N : int
+            Number of new samples to simulate.
+        batch_size : int, optional
+            Number of samples simulated between fits. Defaults to 10% of N 
+            (at least 1).
+        candidates : int, optional
+            Number of candidate samples drawn before each batch. Defaults 
+            to 100 times the batch size (at least 1000).
+        rule : str, optional
+            Sampling rule of candidates (see :meth:`sample`). Defaults to 'L'.
+        model_type : str|Callable, optional
+            Surrogate model type (see :meth:`fit_surrogate`).
+        indicators : Iterable[Indicator], optional 
+            Indicators to fit. Defaults to all indicators.
+        kfold : int, optional
+            Number of folds for cross-validation of the final surrogate.
+            Defaults to 5.
+        seed : int, optional
+            Seed for sampling candidates and splitting folds.
+        kwargs : dict
+            Any keyword arguments passed to :meth:`evaluate`.
+        
+        Notes
+        -----
+        The uncertainty of each candidate is the largest standard deviation 
+        of predictions across indicators (relative to the standard deviation 
+        of evaluated indicator values). Samples of a batch are selected one 
+        at a time by the "kriging believer" heuristic: after each selection,
+        the surrogate is refitted as if the predicted values at the selected 
+        sample were evaluated, so that the rest of the batch is drawn away 
+        from it. Initial samples must be loaded and evaluated beforehand.
+        
+        """
+        if self.table is None: raise RuntimeError('must evaluate samples before active learning')
+        if batch_size is None: batch_size = max(N // 10, 1)
+        if candidates is None: candidates = max(100 * batch_size, 1000)
+        if indicators is None: indicators = self._indicators
+        parameter_indices = var_indices(self._parameters)
+        indicator_indices = var_indices(indicators)
+        rng = np.random.default_rng(seed)
+        remaining = N
+        while remaining > 0:
+            surrogate = self.fit_surrogate(model_type, indicators, kfold=0)
+            samples = self.sample(candidates, rule, seed=int(rng.integers(2 ** 32)))
+            table = self.table
+            X = table[parameter_indices].values
+            Y = table[indicator_indices].values
+            scale = np.nanstd(Y, axis=0)
+            scale[~(scale > 0)] = 1.
+            size = min(batch_size, remaining)
+            selected = []
+            while True:
+                values, std = surrogate(samples, std=True)
+                uncertainty = (std / scale).max(axis=1)
+                uncertainty[selected] = -np.inf
+                n = int(np.argmax(uncertainty))
+                selected.append(n)
+                if len(selected) == size: break
+                # Believe the prediction at the selected sample
+                X = np.vstack([X, surrogate.apply_hooks(samples[n])])
+                Y = np.vstack([Y, values[n]])
+                surrogate = Surrogate(self._parameters, indicators, model_type).fit(X, Y, kfold=0)
+            self._evaluate_new_samples(samples[selected], **kwargs)
+            remaining -= size
+        return self.fit_surrogate(model_type, indicators, kfold, seed)
+    
+    def _evaluate_new_samples(self, samples, **kwargs):
+        table = self.table
+        old_samples = self._samples
+        self.load_samples(samples)
+        self.evaluate(**kwargs)
+        self.table = pd.concat([table, self.table], ignore_index=True)
+        self._samples = np.vstack([old_samples, self._samples])
+        self._index = list(range(self._samples.shape[0]))
+    
     def create_fitted_model(self, parameters, indicators): # pragma: no cover
         from pipeml import FittedModel
         Xdf = self.table[[i.index for i in parameters]]
@@ -12,8 +12,10 @@ import numpy as np
 from thermosteam import Stream
 from warnings import warn
 from typing import Optional, Callable
+from scipy.spatial import cKDTree
 from scipy.spatial.distance import cdist
 from itertools import combinations, product
+from functools import partial
 from ._parameter import Parameter
 from .._system import System, JointRecycleData
 
@@ -24,6 +26,8 @@ __all__ = (
     'Average',
     'LinearRegressor',
     'InterceptLinearRegressor',
+    'NearestNeighborRegressor',
+    'RecursiveLeastSquares',
 )
 
 @njit(cache=True)
@@ -101,6 +105,179 @@ class Average:
         return f"{type(self).__name__}()"
     
     
+class NearestNeighborRegressor:
+    """
+    Create a NearestNeighborRegressor object that predicts by inverse 
+    distance weighting of the nearest samples. Samples can be inserted 
+    one at a time; they are kept in a small buffer and in KD-trees of 
+    doubling sizes that are merged as they fill up, so the amortized cost 
+    of an insertion or prediction grows only logarithmically with the 
+    number of samples.
+    
+    Parameters
+    ----------
+    neighbors :
+        Number of nearest samples weighted. Defaults to 4.
+    power :
+        Power of inverse distance weights. Defaults to 2.
+    
+    """
+    __slots__ = (
+        'neighbors',
+        'power',
+        'trees',
+        'buffer_X',
+        'buffer_y',
+        'size',
+    )
+    #: Maximum number of samples searched by brute force before building a KD-tree.
+    buffer_size = 32
+    
+    def __init__(self, neighbors: int=4, power: float=2):
+        self.neighbors = neighbors
+        self.power = power
+        self.clear()
+    
+    def clear(self):
+        self.trees = [] # list[tuple[cKDTree, 1d array]] by decreasing size
+        self.buffer_X = []
+        self.buffer_y = []
+        self.size = 0
+    
+    def fit(self, X, y):
+        self.clear()
+        if len(y): 
+            self.trees.append((cKDTree(X), np.array(y, dtype=float)))
+            self.size = len(y)
+    
+    def insert(self, x, y):
+        self.buffer_X.append(np.array(x, dtype=float))
+        self.buffer_y.append(y)
+        self.size += 1
+        if len(self.buffer_y) == self.buffer_size:
+            trees = self.trees
+            X = [np.array(self.buffer_X)]
+            y = [np.array(self.buffer_y, dtype=float)]
+            N = self.buffer_size
+            while trees and trees[-1][1].size <= N:
+                tree, tree_y = trees.pop()
+                X.append(tree.data)
+                y.append(tree_y)
+                N += tree_y.size
+            trees.append((cKDTree(np.vstack(X)), np.concatenate(y)))
+            self.buffer_X = []
+            self.buffer_y = []
+    
+    def predict(self, x):
+        if not self.size: raise RuntimeError('no samples to predict from')
+        x = x[0]
+        k = self.neighbors
+        distances = []
+        values = []
+        for tree, y in self.trees:
+            d, i = tree.query(x, k=min(k, y.size))
+            distances.append(np.atleast_1d(d))
+            values.append(y[np.atleast_1d(i)])
+        if self.buffer_y:
+            distances.append(np.sqrt(((np.array(self.buffer_X) - x) ** 2).sum(axis=1)))
+            values.append(np.array(self.buffer_y, dtype=float))
+        distances = np.concatenate(distances)
+        values = np.concatenate(values)
+        if distances.size > k:
+            index = np.argpartition(distances, k - 1)[:k]
+            distances = distances[index]
+            values = values[index]
+        exact_match = distances == 0
+        if exact_match.any(): return values[exact_match].mean()
+        weights = distances ** -self.power
+        return weights @ values / weights.sum()
+    
+    def __repr__(self):
+        return f"{type(self).__name__}(neighbors={self.neighbors}, power={self.power})"
+
+
+class RecursiveLeastSquares:
+    """
+    Create a RecursiveLeastSquares object that fits a linear model and 
+    updates its coefficients with each inserted sample by a rank-one 
+    update of the inverse covariance, so the cost of an insertion is 
+    independent of the number of samples.
+    
+    Parameters
+    ----------
+    intercept :
+        Whether to fit an intercept. Defaults to True.
+    forgetting_factor :
+        Weight of the previous samples at each insertion (from 0 to 1). 
+        Values below 1 let the model track drifting regions of parameter 
+        space. Defaults to 1.
+    regularization :
+        Initial diagonal of the inverse covariance (larger values weigh
+        the first samples more). Defaults to 1e6.
+    
+    """
+    __slots__ = (
+        'intercept',
+        'forgetting_factor',
+        'regularization',
+        'coefficients',
+        'inverse_covariance',
+        'size',
+    )
+    
+    def __init__(self, intercept: bool=True, forgetting_factor: float=1., 
+                 regularization: float=1e6):
+        self.intercept = intercept
+        self.forgetting_factor = forgetting_factor
+        self.regularization = regularization
+        self.clear()
+    
+    def clear(self):
+        self.coefficients = self.inverse_covariance = None
+        self.size = 0
+    
+    def features(self, x):
+        if self.intercept:
+            xi = np.ones(x.shape[-1] + 1)
+            xi[1:] = x
+            return xi
+        else:
+            return np.asarray(x, dtype=float)
+    
+    def fit(self, X, y):
+        self.clear()
+        m, n = X.shape
+        if self.intercept:
+            Xi = np.ones([m, n + 1])
+            Xi[:, 1:] = X
+        else:
+            Xi = np.asarray(X, dtype=float)
+        weights = self.forgetting_factor ** np.arange(m - 1, -1, -1.)
+        Xt = Xi.transpose() * weights
+        self.inverse_covariance = np.linalg.pinv(Xt @ Xi)
+        self.coefficients = self.inverse_covariance @ Xt @ y
+        self.size = m
+    
+    def insert(self, x, y):
+        xi = self.features(x)
+        P = self.inverse_covariance
+        if P is None:
+            self.inverse_covariance = P = self.regularization * np.eye(xi.size)
+            self.coefficients = np.zeros(xi.size)
+        Px = P @ xi
+        gain = Px / (self.forgetting_factor + xi @ Px)
+        self.coefficients += gain * (y - xi @ self.coefficients)
+        P -= np.outer(gain, Px)
+        P /= self.forgetting_factor
+        self.size += 1
+    
+    def predict(self, x):
+        return self.features(x[0]) @ self.coefficients
+    
+    def __repr__(self):
+        return f"{type(self).__name__}(intercept={self.intercept}, forgetting_factor={self.forgetting_factor})"
+
+
 fast_fit_model_types = set([
     LinearRegressor, 
     InterceptLinearRegressor,
@@ -110,6 +287,10 @@ linear_model_types = set([
     LinearRegressor, 
     InterceptLinearRegressor, 
 ])
+incremental_model_types = set([
+    NearestNeighborRegressor,
+    RecursiveLeastSquares,
+])
     
 def recycle_response(recycle, name, model):
     if name == 'T':
@@ -282,6 +463,7 @@ class ConvergenceModel:
         'interaction_pairs',
         'predictor_index',
         'save_prediction',
+        'incremental',
     )
     absolute_response_tolerance = 0.001
     relative_response_tolerance = 0.01
@@ -299,6 +481,8 @@ class ConvergenceModel:
             normalization: Optional[bool] = None,
             load_responses: Optional[bool] = None,
             save_prediction: Optional[bool] = True,
+            incremental: Optional[bool] = None,
+            forgetting_factor: Optional[float] = None,
         ):
         if system is None:
             systems = set([i.system for i in predictors])
@@ -342,8 +526,37 @@ class ConvergenceModel:
                 if nfits is None: nfits = 10
             elif model_type == 'average':
                 model_type = Average
+            elif model_type in ('nearest neighbor', 'nearest neighbors', 'inverse distance'):
+                model_type = NearestNeighborRegressor
+            elif model_type == 'recursive least squares':
+                model_type = RecursiveLeastSquares
             else:
                 raise ValueError('unknown model type {model_type!r}')
+        if incremental is None: 
+            incremental = model_type in incremental_model_types or forgetting_factor is not None
+        if incremental:
+            if model_type in linear_model_types: 
+                model_type = partial(
+                    RecursiveLeastSquares, 
+                    intercept=model_type is InterceptLinearRegressor,
+                )
+            elif model_type not in incremental_model_types:
+                raise ValueError(f'model type {model_type!r} cannot be fitted incrementally')
+            if forgetting_factor is not None:
+                if not (model_type is RecursiveLeastSquares or isinstance(model_type, partial)):
+                    raise ValueError('forgetting factor only applies to recursive least squares')
+                model_type = partial(model_type, forgetting_factor=forgetting_factor)
+        elif forgetting_factor is not None:
+            raise ValueError('forgetting factor only applies to incremental fitting')
+        self.incremental = incremental
+        if incremental:
+            # Samples are inserted as they converge; no refitting needed
+            if recess: raise ValueError('incremental recycle model cannot recess')
+            if nfits: raise ValueError('incremental recycle model cannot pass nfits argument')
+            if local_weighted: raise ValueError('incremental recycle model cannot be local weighted')
+            if normalization is None: normalization = True
+            recess = 0
+            local_weighted = False
         if recess is None: 
             if model_type in fast_fit_model_types:
                 recess = 0
@@ -485,6 +698,15 @@ class ConvergenceModel:
     def __enter__(self):
         data = self.data
         if self.save_prediction: predicted = data['predicted']
+        if self.incremental:
+            self.case_study = case_study = np.asarray(self.case_study, dtype=float)
+            for response in self.responses:
+                if not response.model.size: continue
+                prediction = response.predict(case_study)
+                response.set(prediction)
+                if self.save_prediction: predicted[response].append(prediction)
+            data['samples'].append(case_study)
+            return
         actual = data['actual']
         sample_list = data['samples']
         n_samples = len(sample_list)
@@ -532,9 +754,10 @@ class ConvergenceModel:
         sample_list.append(case_study)
     
     def __exit__(self, type, exception, traceback, total=[]):
+        case_study = self.case_study
         del self.case_study
         data = self.data
-        if exception and self.fitted:
+        if exception and (self.fitted or self.incremental):
             del data['samples'][-1]
             raise exception
         actual = data['actual']
@@ -542,6 +765,7 @@ class ConvergenceModel:
             value = response.get()
             response.update_limits(value)
             actual[response].append(value)
+            if self.incremental: response.model.insert(case_study[response.predictors], value)
         
     def evaluate_system_convergence(self, sample, default=None, **kwargs):
         system = self.system
@@ -709,10 +933,13 @@ class ConvergenceModel:
         actual = data['actual']
         data['samples'].append(self.reframe_sample(sample))
         dct = recycle_data.to_dict()
+        incremental = self.incremental
+        if incremental: sample = np.asarray(data['samples'][-1], dtype=float)
         for response in self.responses:
             value = dct.get(response, 0.)
             response.update_limits(value)
             actual[response].append(value)
+            if incremental: response.model.insert(sample[response.predictors], value)
             
     def extend_data(self, samples, recycle_data):
         for args in zip(samples, recycle_data): self.append_data(*args)
@@ -741,6 +968,7 @@ class NullConvergenceModel:
         'interaction_pairs',
         'normalization',
     )
+    incremental = False
     absolute_response_tolerance = ConvergenceModel.absolute_response_tolerance
     relative_response_tolerance = ConvergenceModel.relative_response_tolerance
     practice = ConvergenceModel.practice
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import os
+import json
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+from ._utils import indices_to_multiindex
+
+__all__ = ('ResultStore',)
+
+class ResultStore:
+    """
+    Create a ResultStore object that saves indicator values to a directory
+    as each sample is evaluated. Values of each indicator are stored in
+    an npy file (opened as a memory map) and the indices of evaluated
+    samples are appended to a log file once their values are flushed to 
+    disk (see :meth:`flush`), so each sample is saved in constant time and 
+    an interrupted evaluation can be resumed from the last flushed sample.
+
+    Parameters
+    ----------
+    directory :
+        Directory of the store.
+    samples :
+        All parameter samples. If not given, an existing store is opened
+        (read-only) for analysis.
+    indicators :
+        Indicator indices (element and name) of the model.
+    resume :
+        Whether to keep evaluated samples of an existing store with the
+        same samples and indicators. Defaults to True.
+
+    Examples
+    --------
+    Save and resume a Monte Carlo evaluation:
+
+    >>> # model.evaluate(store='results', autoload=True)
+
+    Load results without loading all indicators into memory:
+
+    >>> # store = bst.ResultStore('results')
+    >>> # store['Biorefinery', 'MSP [USD/kg]'][store.evaluated]
+
+    Notes
+    -----
+    Values not yet evaluated are NaN. A sample is only considered evaluated
+    once its index is in the log, so a sample interrupted mid-write is
+    simply evaluated again on resume. Because indices are only logged after
+    values are synced to disk, logged samples survive both process and 
+    operating system crashes (or power loss); samples appended after the 
+    last flush are evaluated again on resume.
+
+    """
+    __slots__ = ('directory', 'samples', 'indicators', 'values',
+                 '_evaluated', '_pending', '_log', '_readonly')
+
+    #: [str] File name of store layout (indicators and number of samples).
+    layout_file = 'layout.json'
+
+    #: [str] File name of parameter samples.
+    samples_file = 'samples.npy'
+
+    #: [str] File name of log of evaluated sample indices.
+    log_file = 'evaluated.log'
+
+    #: [str] File name pattern of indicator values.
+    values_file = 'indicator_{}.npy'
+
+    def __init__(self, directory, samples=None, indicators=None, resume=True):
+        self.directory = directory
+        self._log = None
+        #: [list[int]] Indices of samples appended but not yet logged.
+        self._pending = []
+        if samples is None:
+            self._readonly = True
+            self._open()
+        else:
+            self._readonly = False
+            samples = np.asarray(samples, dtype=float)
+            indicators = [tuple(i) for i in indicators]
+            if not (resume and self._matches(samples, indicators)):
+                self._create(samples, indicators)
+            self._open()
+
+    def _path(self, file):
+        return os.path.join(self.directory, file)
+
+    def _matches(self, samples, indicators):
+        try:
+            with open(self._path(self.layout_file)) as f: layout = json.load(f)
+            stored_samples = np.load(self._path(self.samples_file), mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            return False
+        return (
+            [tuple(i) for i in layout['indicators']] == indicators
+            and stored_samples.shape == samples.shape
+            and np.array_equal(stored_samples, samples)
+        )
+
+    def _create(self, samples, indicators):
+        directory = self.directory
+        if os.path.exists(directory):
+            prefix, suffix = self.values_file.split('{}')
+            for file in os.listdir(directory):
+                if (file in (self.log_file, self.layout_file, self.samples_file)
+                    or file.startswith(prefix) and file.endswith(suffix)):
+                    os.remove(self._path(file))
+        else:
+            os.makedirs(directory)
+        N_samples = samples.shape[0]
+        for i in range(len(indicators)):
+            values = open_memmap(
+                self._path(self.values_file.format(i)), mode='w+',
+                dtype=float, shape=(N_samples,)
+            )
+            values[:] = np.nan
+            values.flush()
+            del values
+        np.save(self._path(self.samples_file), samples)
+        open(self._path(self.log_file), 'wb').close()
+        # Layout is written last so that incomplete stores are never resumed
+        with open(self._path(self.layout_file), 'w') as f:
+            json.dump({'indicators': indicators, 'N_samples': N_samples}, f)
+
+    def _open(self):
+        with open(self._path(self.layout_file)) as f: layout = json.load(f)
+        self.indicators = indicators = [tuple(i) for i in layout['indicators']]
+        mode = 'r' if self._readonly else 'r+'
+        self.samples = np.load(self._path(self.samples_file), mmap_mode='r')
+        self.values = [
+            np.load(self._path(self.values_file.format(i)), mmap_mode=mode)
+            for i in range(len(indicators))
+        ]
+        log = self._path(self.log_file)
+        with open(log, 'rb') as f: data = f.read()
+        N_bytes = len(data) - len(data) % 8 # Discard incomplete entry
+        evaluated = np.frombuffer(data[:N_bytes], dtype=np.int64)
+        self._evaluated = set(evaluated.tolist())
+        if not self._readonly:
+            if N_bytes != len(data):
+                with open(log, 'r+b') as f: f.truncate(N_bytes)
+            self._log = open(log, 'ab', buffering=0)
+
+    @property
+    def evaluated(self):
+        """[numpy.ndarray] Sorted indices of evaluated samples."""
+        return np.array(sorted(self._evaluated), dtype=int)
+
+    def __len__(self):
+        return len(self._evaluated)
+
+    def __contains__(self, index):
+        return index in self._evaluated
+
+    def __getitem__(self, indicator):
+        """Return values of an indicator (by index or element and name)
+        as a memory map."""
+        if not isinstance(indicator, int):
+            indicator = self.indicators.index(tuple(indicator))
+        return self.values[indicator]
+
+    def append(self, index, values):
+        """Save indicator values of a sample."""
+        if self._readonly: raise RuntimeError('result store is read-only')
+        for array, value in zip(self.values, values): array[index] = value
+        self._pending.append(index)
+        self._evaluated.add(index)
+
+    def get_values(self):
+        """Return a 2d array of all indicator values (samples by indicators)."""
+        return np.column_stack(self.values) if self.values else np.zeros([len(self.samples), 0])
+
+    def to_frame(self, evaluated=False):
+        """Return a DataFrame of indicator values. If `evaluated` is True,
+        only include evaluated samples."""
+        values = self.get_values()
+        index = None
+        if evaluated:
+            index = self.evaluated
+            values = values[index]
+        return pd.DataFrame(
+            values, index=index, columns=indices_to_multiindex(self.indicators)
+        )
+
+    def flush(self):
+        """Flush indicator values to disk and then log (and sync) the 
+        indices of samples appended since the last flush."""
+        if self._log is None: return
+        for i in self.values: i.flush()
+        pending = self._pending
+        if pending:
+            self._log.write(np.array(pending, dtype=np.int64).tobytes())
+            pending.clear()
+        os.fsync(self._log.fileno())
+
+    def close(self):
+        """Flush and close all files."""
+        if self._log is not None:
+            self.flush()
+            self._log.close()
+            self._log = None
+        self.values = []
+        self.samples = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, exception, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self)} samples evaluated>"
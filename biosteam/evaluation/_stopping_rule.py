@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import pandas as pd
+from scipy.stats import t as student_t
+from ._utils import indices_to_multiindex
+
+__all__ = ('StoppingRule',)
+
+def spearman_rho(X, y):
+    """Return Spearman's rank correlation between each column of X and y."""
+    rX = X.argsort(axis=0).argsort(axis=0).astype(float)
+    ry = y.argsort().argsort().astype(float)
+    rX -= rX.mean(axis=0)
+    ry -= ry.mean()
+    denominator = np.sqrt((rX * rX).sum(axis=0) * (ry @ ry))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (rX.transpose() @ ry) / denominator
+
+def get_statistic(name):
+    key = name.lower()
+    if key == 'mean':
+        return lambda X, y: np.array([y.mean()])
+    elif key == 'std':
+        return lambda X, y: np.array([y.std(ddof=1)])
+    elif key == 'median':
+        return lambda X, y: np.array([np.percentile(y, 50)])
+    elif key == 'spearman':
+        return spearman_rho
+    elif key.startswith('p'):
+        try:
+            percentile = float(key[1:])
+        except ValueError:
+            pass
+        else:
+            return lambda X, y: np.array([np.percentile(y, percentile)])
+    raise ValueError(
+        f"invalid statistic {name!r}; valid statistics are 'mean', 'std', "
+        "'median', 'spearman', or a percentile (e.g., 'p5')"
+    )
+
+class StoppingRule:
+    """
+    Create a StoppingRule object that stops a Monte Carlo evaluation once
+    running estimates of indicator statistics reach a target precision.
+    Samples are evaluated in random batches (each sorted for convergence
+    speed). The confidence interval of the mean is estimated by batch means
+    (i.e., from the variance of batch means) and those of other statistics
+    by bootstrap resampling of all evaluated samples (statistics of small
+    batches, such as tail percentiles and rank correlations, are biased).
+
+    Parameters
+    ----------
+    statistics :
+        Statistics by indicator. Valid statistics are 'mean', 'std', 'median',
+        percentiles (e.g., 'p5' and 'p95'), and 'spearman' (Spearman's rank
+        correlation with each parameter).
+    rtol :
+        Target half-width of confidence intervals relative to the estimate.
+        Defaults to 0.01.
+    atol :
+        Target half-width of confidence intervals of Spearman's rank
+        correlations (which may be close to zero). Defaults to 0.05.
+    conf_level :
+        Confidence level of intervals. Defaults to 0.95.
+    batch_size :
+        Number of samples in each batch. Defaults to 1% of the samples
+        (at least 10).
+    min_batches :
+        Minimum number of batches before stopping. Defaults to 10.
+    resamples :
+        Number of bootstrap resamples for confidence intervals of statistics
+        other than the mean. Defaults to 200.
+    seed :
+        Seed of random batches and bootstrap resamples.
+
+    Examples
+    --------
+    Stop once the mean and 5th and 95th percentiles of an indicator are
+    known within 1%:
+
+    >>> # rule = bst.StoppingRule({MSP: ['mean', 'p5', 'p95']}, rtol=0.01)
+    >>> # model.evaluate(stop_when=rule)
+    >>> # rule.results # Achieved precision
+
+    Notes
+    -----
+    Samples that are not evaluated remain NaN in the table. Failed
+    evaluations (NaN values) are ignored in estimates. Only samples
+    evaluated in the same call to :meth:`~biosteam.Model.evaluate` are
+    used in estimates.
+
+    """
+    __slots__ = ('statistics', 'rtol', 'atol', 'conf_level', 'batch_size',
+                 'min_batches', 'resamples', 'seed', 'batches', 'N_evaluated',
+                 'stopped', 'results', '_checks', '_evaluated', '_rng')
+
+    def __init__(self, statistics, rtol=0.01, atol=0.05, conf_level=0.95,
+                 batch_size=None, min_batches=10, resamples=200, seed=None):
+        self.statistics = {
+            indicator: [names] if isinstance(names, str) else list(names)
+            for indicator, names in statistics.items()
+        }
+        for names in self.statistics.values():
+            for name in names: get_statistic(name)
+        self.rtol = rtol
+        self.atol = atol
+        self.conf_level = conf_level
+        self.batch_size = batch_size
+        self.min_batches = min_batches
+        self.resamples = resamples
+        self.seed = seed
+        self.batches = None
+        #: [int] Number of samples evaluated before stopping.
+        self.N_evaluated = 0
+        #: [bool] Whether the target precision was met.
+        self.stopped = False
+        #: [DataFrame|None] Estimates and achieved precision of all statistics.
+        self.results = None
+
+    def _load(self, model, index):
+        """Load random batches of the given samples (in evaluation order)."""
+        N = len(index)
+        batch_size = self.batch_size or max(N // 100, 10)
+        self._rng = rng = np.random.default_rng(self.seed)
+        position = rng.permutation(N)
+        self.batches = [
+            [index[i] for i in np.sort(position[start:start + batch_size])]
+            for start in range(0, N, batch_size)
+        ]
+        columns = model.table.columns.get_loc
+        parameters = model.parameters
+        checks = []
+        for indicator, names in self.statistics.items():
+            column = columns(indicator.index) - len(parameters)
+            for name in names:
+                if name.lower() == 'spearman':
+                    labels = [(*indicator.index, f'Spearman {i.name}') for i in parameters]
+                    absolute = True
+                else:
+                    labels = [(*indicator.index, name)]
+                    absolute = False
+                checks.append((column, name.lower() == 'mean', get_statistic(name), labels, absolute))
+        self._checks = checks
+        self._evaluated = []
+        self.N_evaluated = 0
+        self.stopped = False
+        self.results = None
+        return self.batches
+
+    def _update(self, samples, values, batch):
+        """Add an evaluated batch and return whether to stop."""
+        self._evaluated.append(batch)
+        self.N_evaluated += len(batch)
+        checks = self._checks
+        batches = self._evaluated
+        k = len(batches)
+        q = 0.5 + self.conf_level / 2
+        X_batches = [samples[i] for i in batches]
+        rows = []
+        labels = []
+        X_all = np.vstack(X_batches)
+        for column, mean, statistic, names, absolute in checks:
+            y_batches = [np.array([values[i][column] for i in batch], dtype=float)
+                         for batch in batches]
+            y_all = np.concatenate(y_batches)
+            valid = ~np.isnan(y_all)
+            X_valid = X_all[valid]
+            y_valid = y_all[valid]
+            estimate = statistic(X_valid, y_valid)
+            if mean:
+                batch_estimates = []
+                for X, y in zip(X_batches, y_batches):
+                    valid = ~np.isnan(y)
+                    if valid.sum() > 1: batch_estimates.append(statistic(X[valid], y[valid]))
+                n = len(batch_estimates)
+                if n > 1:
+                    batch_estimates = np.array(batch_estimates)
+                    half_width = student_t.ppf(q, n - 1) * batch_estimates.std(axis=0, ddof=1) / np.sqrt(n)
+                else:
+                    half_width = np.full(estimate.shape, np.inf)
+            else:
+                n = y_valid.size
+                if n > 1 and k > 1:
+                    index = self._rng.integers(0, n, (self.resamples, n))
+                    bootstrap = np.array([statistic(X_valid[i], y_valid[i]) for i in index])
+                    lb, ub = np.nanpercentile(bootstrap, [100 * (1 - q), 100 * q], axis=0)
+                    half_width = (ub - lb) / 2
+                else:
+                    half_width = np.full(estimate.shape, np.inf)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                relative = half_width / np.abs(estimate)
+            converged = half_width <= self.atol if absolute else relative <= self.rtol
+            rows.extend(zip(estimate, half_width, relative, converged))
+            labels.extend(names)
+        self.results = pd.DataFrame(
+            rows, columns=('Estimate', 'Half-width', 'Relative half-width', 'Converged'),
+            index=indices_to_multiindex(labels, ('Element', 'Indicator', 'Statistic')),
+        )
+        self.stopped = k >= self.min_batches and bool(self.results['Converged'].all())
+        return self.stopped
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.N_evaluated} samples evaluated{', stopped' if self.stopped else ''}>"
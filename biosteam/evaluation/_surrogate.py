@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import pandas as pd
+from numpy.polynomial.legendre import legvander
+from scipy.linalg import cho_factor, cho_solve, solve_triangular
+from scipy.optimize import minimize_scalar
+from ._utils import var_indices, indices_to_multiindex
+
+__all__ = (
+    'Surrogate',
+    'PolynomialChaosRegressor',
+    'GaussianProcessRegressor',
+)
+
+def total_degree_indices(N_dimensions, order):
+    """Return multi-indices (as a 2d array) of all polynomial terms
+    with a total degree up to the given order."""
+    indices = [()]
+    for i in range(N_dimensions):
+        indices = [(*j, k) for j in indices for k in range(order + 1 - sum(j))]
+    indices.sort(key=sum)
+    return np.array(indices, dtype=int).reshape([-1, N_dimensions])
+
+
+class PolynomialChaosRegressor:
+    """
+    Create a PolynomialChaosRegressor object that fits Legendre polynomials
+    (orthogonal for uniformly distributed inputs from -1 to 1) up to a
+    total degree by least squares. Uncertainty is estimated by the
+    standard error of the prediction.
+
+    Parameters
+    ----------
+    order :
+        Maximum total degree of polynomial terms. Defaults to 2.
+
+    """
+    __slots__ = ('order', 'indices', 'coefficients', 'covariance')
+
+    def __init__(self, order: int=2):
+        self.order = order
+        self.indices = self.coefficients = self.covariance = None
+
+    def basis(self, X):
+        """Return values of all polynomial terms at X."""
+        N, N_dimensions = X.shape
+        if self.indices is None:
+            self.indices = total_degree_indices(N_dimensions, self.order)
+        order = self.order
+        vanders = [legvander(X[:, i], order) for i in range(N_dimensions)]
+        basis = np.ones([N, len(self.indices)])
+        for i, vander in enumerate(vanders): basis *= vander[:, self.indices[:, i]]
+        return basis
+
+    def fit(self, X, y):
+        self.indices = None
+        basis = self.basis(X)
+        N, N_terms = basis.shape
+        if N <= N_terms:
+            raise ValueError(
+                f'at least {N_terms + 1} samples are required to fit a '
+                f'polynomial chaos expansion of order {self.order}'
+            )
+        self.coefficients, *_ = np.linalg.lstsq(basis, y, rcond=None)
+        residuals = y - basis @ self.coefficients
+        variance = residuals @ residuals / (N - N_terms)
+        self.covariance = variance * np.linalg.pinv(basis.transpose() @ basis)
+
+    def predict(self, X, return_std=False):
+        basis = self.basis(X)
+        y = basis @ self.coefficients
+        if return_std:
+            variance = np.einsum('ij,jk,ik->i', basis, self.covariance, basis)
+            return y, np.sqrt(np.maximum(variance, 0.))
+        else:
+            return y
+
+    def __repr__(self):
+        return f"{type(self).__name__}(order={self.order})"
+
+
+class GaussianProcessRegressor:
+    """
+    Create a GaussianProcessRegressor object that interpolates with a
+    radial basis function (squared exponential) kernel. The signal variance 
+    (amplitude) of the kernel is fitted in closed form and the length scale 
+    is selected by maximizing the marginal likelihood (first over a grid, 
+    then continuously around the best grid point) unless given. Fitting 
+    scales with the cube of the number of samples, so this regressor is 
+    best suited for up to a few thousand samples.
+
+    Parameters
+    ----------
+    length_scale :
+        Length scale of kernel (inputs are normalized from -1 to 1).
+    noise :
+        Variance of noise relative to the signal variance. Defaults to 1e-8.
+
+    """
+    __slots__ = ('length_scale', 'noise', 'X', 'alpha', 'cholesky',
+                 'mean', 'std', 'amplitude', '_length_scale')
+
+    #: Length scales tried when selecting the length scale.
+    length_scales = np.logspace(-1, 1.5, 11)
+
+    def __init__(self, length_scale: float=None, noise: float=1e-8):
+        self.length_scale = length_scale
+        self.noise = noise
+        self.X = self.alpha = self.cholesky = self.amplitude = None
+
+    def kernel(self, X1, X2, length_scale):
+        squared_distances = (
+            (X1 * X1).sum(axis=1)[:, None] + (X2 * X2).sum(axis=1)[None, :]
+            - 2 * X1 @ X2.transpose()
+        )
+        return np.exp(-0.5 * np.maximum(squared_distances, 0.) / length_scale ** 2)
+
+    def _factorize(self, X, y, length_scale):
+        K = self.kernel(X, X, length_scale)
+        K[np.diag_indices_from(K)] += self.noise
+        cholesky = cho_factor(K, lower=True)
+        alpha = cho_solve(cholesky, y)
+        # Maximum likelihood signal variance given the length scale
+        amplitude = max(y @ alpha / y.size, 1e-300)
+        log_likelihood = -0.5 * y.size * np.log(amplitude) - np.log(np.diag(cholesky[0])).sum()
+        return cholesky, alpha, amplitude, log_likelihood
+
+    def _select_length_scale(self, X, y):
+        results = {}
+        def objective(log_length_scale):
+            length_scale = 10. ** log_length_scale
+            try: result = self._factorize(X, y, length_scale)
+            except np.linalg.LinAlgError: return np.inf
+            results[length_scale] = result
+            return -result[-1]
+        grid = np.log10(self.length_scales)
+        objectives = [objective(i) for i in grid]
+        n = int(np.argmin(objectives))
+        if objectives[n] == np.inf: raise RuntimeError('could not fit Gaussian process')
+        bounds = (grid[max(n - 1, 0)], grid[min(n + 1, grid.size - 1)])
+        minimize_scalar(objective, bounds=bounds, method='bounded', options=dict(xatol=1e-3))
+        length_scale = max(results, key=lambda i: results[i][-1])
+        return length_scale, results[length_scale]
+
+    def fit(self, X, y):
+        self.mean = mean = y.mean()
+        self.std = std = y.std() or 1.
+        y = (y - mean) / std
+        length_scale = self.length_scale
+        if length_scale is None:
+            length_scale, result = self._select_length_scale(X, y)
+        else:
+            result = self._factorize(X, y, length_scale)
+        self.cholesky, self.alpha, self.amplitude, _ = result
+        self._length_scale = length_scale
+        self.X = X
+
+    def predict(self, X, return_std=False):
+        K = self.kernel(X, self.X, self._length_scale)
+        y = self.mean + self.std * (K @ self.alpha)
+        if return_std:
+            v = solve_triangular(self.cholesky[0], K.transpose(), lower=True)
+            variance = self.amplitude * (1. - (v * v).sum(axis=0))
+            return y, self.std * np.sqrt(np.maximum(variance, 0.))
+        else:
+            return y
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+surrogate_model_types = {
+    'polynomial chaos': PolynomialChaosRegressor,
+    'gaussian process': GaussianProcessRegressor,
+    'rbf': GaussianProcessRegressor,
+}
+
+class Surrogate:
+    """
+    Create a Surrogate object that fits a regressor for each indicator
+    of a model from evaluated samples and predicts indicator values
+    (and their uncertainty) at new samples in vectorized form.
+
+    Parameters
+    ----------
+    parameters :
+        Model parameters (inputs).
+    indicators :
+        Model indicators (outputs).
+    model_type :
+        Either 'polynomial chaos', 'gaussian process' (or 'rbf'), or a
+        function that returns a regressor with `fit(X, y)` and
+        `predict(X, return_std=False)` methods. Defaults to 'gaussian process'.
+    kwargs :
+        Keyword arguments passed to the regressors.
+
+    Notes
+    -----
+    Samples are normalized from -1 to 1 by the range of the fitted samples.
+    Parameter hooks are applied to samples before predictions.
+
+    """
+    __slots__ = ('parameters', 'indicators', 'model_type', 'kwargs',
+                 'regressors', 'sample_min', 'sample_range',
+                 'cross_validation')
+
+    #: Number of samples predicted at a time.
+    chunksize = 2000
+
+    def __init__(self, parameters, indicators, model_type=None, **kwargs):
+        if model_type is None: model_type = 'gaussian process'
+        if isinstance(model_type, str):
+            key = model_type.lower()
+            if key not in surrogate_model_types:
+                raise ValueError(
+                    f"unknown model type {model_type!r}; only "
+                    f"{', '.join([repr(i) for i in surrogate_model_types])} are valid"
+                )
+            model_type = surrogate_model_types[key]
+        self.parameters = tuple(parameters)
+        self.indicators = tuple(indicators)
+        self.model_type = model_type
+        self.kwargs = kwargs
+        self.regressors = None
+        #: [DataFrame|None] Cross-validated error of each indicator.
+        self.cross_validation = None
+
+    def normalize(self, X):
+        return 2. * (X - self.sample_min) / self.sample_range - 1.
+
+    def apply_hooks(self, samples):
+        samples = np.array(samples, dtype=float, ndmin=2)
+        for i, parameter in enumerate(self.parameters):
+            hook = parameter.hook
+            if hook is not None: samples[:, i] = np.vectorize(hook, otypes=[float])(samples[:, i])
+        return samples
+
+    def _fit_regressors(self, X, Y):
+        regressors = []
+        for y in Y.transpose():
+            valid = ~np.isnan(y)
+            regressor = self.model_type(**self.kwargs)
+            regressor.fit(X[valid], y[valid])
+            regressors.append(regressor)
+        return regressors
+
+    def fit(self, X, Y, kfold=5, seed=None):
+        """
+        Fit regressors given (hooked) samples and indicator values
+        (NaN values are ignored), and cross-validate with k folds
+        if `kfold` is greater than 1.
+
+        """
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        self.sample_min = X.min(axis=0)
+        sample_range = X.max(axis=0) - self.sample_min
+        sample_range[sample_range == 0] = 1.
+        self.sample_range = sample_range
+        X = self.normalize(X)
+        if kfold and kfold > 1: self._cross_validate(X, Y, kfold, seed)
+        self.regressors = self._fit_regressors(X, Y)
+        return self
+
+    def _cross_validate(self, X, Y, kfold, seed):
+        N = X.shape[0]
+        folds = np.array_split(np.random.default_rng(seed).permutation(N), kfold)
+        predicted = np.full(Y.shape, np.nan)
+        for test in folds:
+            train = np.ones(N, dtype=bool)
+            train[test] = False
+            regressors = self._fit_regressors(X[train], Y[train])
+            for i, regressor in enumerate(regressors):
+                predicted[test, i] = regressor.predict(X[test])
+        errors = predicted - Y
+        valid = ~np.isnan(errors)
+        data = []
+        for error, y, mask in zip(errors.transpose(), Y.transpose(), valid.transpose()):
+            error = error[mask]
+            y = y[mask]
+            SSR = error @ error
+            SST = ((y - y.mean()) ** 2).sum()
+            RMSE = np.sqrt(SSR / error.size)
+            data.append((RMSE, RMSE / (y.std() or 1.), 1. - SSR / SST if SST else np.nan))
+        self.cross_validation = pd.DataFrame(
+            data, columns=('RMSE', 'Normalized RMSE', 'R2'),
+            index=indices_to_multiindex(var_indices(self.indicators), ('Element', 'Indicator')),
+        )
+
+    def predict(self, samples, std=False):
+        """
+        Return predicted indicator values (samples by indicators) at the
+        given samples. If `std` is True, also return the standard deviation
+        of predictions.
+
+        """
+        if self.regressors is None: raise RuntimeError('surrogate not fitted')
+        X = self.normalize(self.apply_hooks(samples))
+        N = X.shape[0]
+        M = len(self.regressors)
+        Y = np.empty([N, M])
+        if std: Y_std = np.empty([N, M])
+        chunksize = self.chunksize
+        for start in range(0, N, chunksize):
+            end = start + chunksize
+            x = X[start:end]
+            for i, regressor in enumerate(self.regressors):
+                if std:
+                    Y[start:end, i], Y_std[start:end, i] = regressor.predict(x, return_std=True)
+                else:
+                    Y[start:end, i] = regressor.predict(x)
+        return (Y, Y_std) if std else Y
+
+    __call__ = predict
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self.parameters)} parameters, {len(self.indicators)} indicators>"
@@ -9,9 +9,15 @@
 """
 from . import parameter
 from . import in_parallel
+from . import sample_order
+from . import sensitivity
 
 __all__ = (*parameter.__all__,
-           *in_parallel.__all__)
+           *in_parallel.__all__,
+           *sample_order.__all__,
+           *sensitivity.__all__)
 
 from .parameter import *
-from .in_parallel import *
\ No newline at end of file
+from .in_parallel import *
+from .sample_order import *
+from .sensitivity import *
\ No newline at end of file
@@ -9,18 +9,269 @@
 """
 import numpy as np
 import multiprocessing as mp
+import time
+from itertools import count
+from functools import partial
 import pandas as pd
+from multiprocessing.pool import ExceptionWithTraceback
+from queue import Empty
+import pickle
 
 __all__ = ('evaluate_coordinate_in_parallel',)
 
+# %% Process-based evaluation with persistent worker states
+
+#: Messages sent from workers to the main process.
+DONE, FAILED, EXITED, STARTED = range(4)
+
+def portable_exception(error):
+    try:
+        pickle.dumps(error)
+    except:
+        error = RuntimeError(f"[{type(error).__name__}] {error}")
+    return ExceptionWithTraceback(error, error.__traceback__)
+
+def worker_loop(worker, setup, evaluate, tasks, results, report_start=False): # pragma: no cover
+    """
+    Create a worker state by calling `setup` and evaluate all items of each
+    task (a chunk of key-argument pairs) in order until a None task 
+    is received. If `report_start` is True, the main process is notified 
+    before evaluating each item.
+    
+    """
+    try:
+        state = setup()
+    except BaseException as error:
+        results.put((FAILED, worker, None, portable_exception(error)))
+        return
+    while True:
+        chunk = tasks.get()
+        if chunk is None: break
+        for key, args in chunk:
+            if report_start: results.put((STARTED, worker, key, None))
+            try:
+                value = evaluate(state, args)
+            except BaseException as error:
+                results.put((FAILED, worker, key, portable_exception(error)))
+                return
+            results.put((DONE, worker, key, value))
+    results.put((EXITED, worker, None, None))
+
+class WorkerPool:
+    """
+    Create a WorkerPool object that keeps worker processes (and their 
+    persistent states) alive across evaluations, so that chunks of 
+    key-argument pairs can be fed in several rounds (e.g., batches of
+    samples) without recreating worker states.
+    
+    Parameters
+    ----------
+    setup : Callable() -> state
+        Called once in each worker process to create its (persistent) state, 
+        e.g., a model with its own system.
+    evaluate : Callable(state, args) -> value
+        Called in worker processes to evaluate each item.
+    workers : int
+        Maximum number of worker processes.
+    context : str, optional
+        Multiprocessing start method. Defaults to the platform default. 
+        Note that `setup` and `evaluate` must be picklable
+        unless the start method is 'fork'.
+    timeout : float, optional
+        Wall-clock time limit [s] of each item. Workers that exceed the
+        limit are killed and replaced by new workers which continue with
+        the rest of their chunk.
+    
+    """
+    __slots__ = ('setup', 'evaluate_item', 'workers', 'timeout', 'context',
+                 'tasks', 'results', 'processes', '_new_workers')
+    
+    def __init__(self, setup, evaluate, workers, context=None, timeout=None):
+        self.setup = setup
+        self.evaluate_item = evaluate
+        self.workers = workers
+        self.timeout = timeout
+        self.context = context = mp.get_context(context)
+        self.tasks = context.Queue()
+        self.results = context.Queue()
+        #: [dict[int, Process]] Live worker processes by worker number.
+        self.processes = {}
+        self._new_workers = count()
+    
+    def _start_worker(self):
+        worker = next(self._new_workers)
+        process = self.context.Process(
+            target=worker_loop, 
+            args=(worker, self.setup, self.evaluate_item, self.tasks, 
+                  self.results, self.timeout is not None), 
+            daemon=True,
+        )
+        process.start()
+        self.processes[worker] = process
+    
+    def evaluate(self, chunks, callback, timeout_callback=None):
+        """
+        Evaluate chunks of key-argument pairs and pass results to the 
+        callback in the main process as they finish. Workers are only
+        started as needed and are kept alive for the next call.
+        
+        Parameters
+        ----------
+        chunks : Iterable[list[tuple[Hashable, Any]]]
+            Key-argument pairs grouped into contiguous chunks. Items in a chunk
+            are evaluated in order by the same worker.
+        callback : Callable(key, value)
+            Called in the main process once an item is evaluated.
+        timeout_callback : Callable(key), optional
+            Called in the main process once an item times out.
+        
+        """
+        chunks = [list(i) for i in chunks if i]
+        if not chunks: return
+        tasks = self.tasks
+        results = self.results
+        processes = self.processes
+        timeout = self.timeout
+        for chunk in chunks: tasks.put(chunk)
+        for i in range(min(self.workers, len(chunks)) - len(processes)): self._start_worker()
+        report_start = timeout is not None
+        if report_start:
+            locations = {key: (n, m) for n, chunk in enumerate(chunks) for m, (key, args) in enumerate(chunk)}
+            started = {} # worker: (key, start time)
+        remaining = sum([len(i) for i in chunks])
+        try:
+            while remaining:
+                try: 
+                    message, worker, key, value = results.get(timeout=1)
+                except Empty:
+                    for process in processes.values():
+                        if process.exitcode: 
+                            raise RuntimeError(
+                                f'worker process exited unexpectedly with exit code {process.exitcode}'
+                            )
+                else:
+                    if worker not in processes: 
+                        pass # Killed worker
+                    elif message == DONE:
+                        remaining -= 1
+                        if report_start: del started[worker]
+                        callback(key, value)
+                    elif message == STARTED:
+                        started[worker] = (key, time.perf_counter())
+                    elif message == FAILED:
+                        raise value
+                if report_start:
+                    now = time.perf_counter()
+                    for worker, (key, start) in tuple(started.items()):
+                        if now - start < timeout: continue
+                        process = processes.pop(worker)
+                        process.terminate()
+                        process.join()
+                        del started[worker]
+                        n, m = locations[key]
+                        rest = chunks[n][m + 1:]
+                        if rest: tasks.put(rest)
+                        self._start_worker()
+                        remaining -= 1
+                        if timeout_callback: timeout_callback(key)
+        except:
+            self.terminate()
+            raise
+    
+    def close(self):
+        """Stop all workers once they finish their current tasks."""
+        processes = self.processes
+        for i in processes: self.tasks.put(None)
+        for i in processes.values(): 
+            i.join(timeout=10)
+            if i.is_alive(): i.terminate()
+        processes.clear()
+    
+    def terminate(self):
+        """Kill all workers."""
+        processes = self.processes
+        for i in processes.values(): 
+            if i.is_alive(): i.terminate()
+        for i in processes.values(): i.join()
+        processes.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, type, exception, traceback):
+        self.close()
+    
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self.processes)} workers>"
+        
+
+def evaluate_in_processes(setup, evaluate, chunks, workers, callback, context=None,
+                          timeout=None, timeout_callback=None):
+    """
+    Evaluate chunks of key-argument pairs across worker processes and
+    pass results to the callback in the main process as they finish.
+    Workers are stopped afterwards (see :class:`WorkerPool` to keep workers
+    alive across evaluations).
+    
+    Parameters
+    ----------
+    setup : Callable() -> state
+        Called once in each worker process to create its (persistent) state, 
+        e.g., a model with its own system.
+    evaluate : Callable(state, args) -> value
+        Called in worker processes to evaluate each item.
+    chunks : Iterable[list[tuple[Hashable, Any]]]
+        Key-argument pairs grouped into contiguous chunks. Items in a chunk
+        are evaluated in order by the same worker.
+    workers : int
+        Maximum number of worker processes.
+    callback : Callable(key, value)
+        Called in the main process once an item is evaluated.
+    context : str, optional
+        Multiprocessing start method. Defaults to the platform default. 
+        Note that `setup` and `evaluate` must be picklable
+        unless the start method is 'fork'.
+    timeout : float, optional
+        Wall-clock time limit [s] of each item. Workers that exceed the
+        limit are killed and replaced by new workers which continue with
+        the rest of their chunk.
+    timeout_callback : Callable(key), optional
+        Called in the main process once an item times out.
+    
+    Notes
+    -----
+    Items are evaluated in chunk order within each worker, but results from 
+    different workers arrive in the order they finish. Timeouts are checked
+    about every second, so short time limits are only enforced approximately.
+    
+    """
+    with WorkerPool(setup, evaluate, workers, context, timeout) as pool:
+        pool.evaluate(chunks, callback, timeout_callback)
+
+# %% Coordinate evaluation
+
+def return_value(value): # pragma: no cover
+    return value
+
+def evaluate_at_coordinate(f, args): # pragma: no cover
+    x, multi_coordinate = args
+    return f(*x) if multi_coordinate else f(x)
+
 def evaluate_coordinate_in_parallel(f_evaluate_at_coordinate, coordinate,
                                     metrics, multi_coordinate=False,
-                                    name=None, names=None, xlfile=None): # pragma: no cover
-    # In parallel
-    pool = mp.Pool(mp.cpu_count())
-    map = pool.starmap if multi_coordinate else pool.map
-    tables = map(f_evaluate_at_coordinate, coordinate)
-    pool.close()
+                                    name=None, names=None, xlfile=None,
+                                    workers=None): # pragma: no cover
+    # In parallel; each worker evaluates a contiguous group of points
+    N_coordinate = len(coordinate)
+    if workers is None: workers = mp.cpu_count()
+    size = max(int(np.ceil(N_coordinate / workers)), 1)
+    items = [(n, (x, multi_coordinate)) for n, x in enumerate(coordinate)]
+    tables = [None] * N_coordinate
+    def callback(n, table): tables[n] = table
+    evaluate_in_processes(
+        partial(return_value, f_evaluate_at_coordinate), evaluate_at_coordinate, 
+        [items[i:i+size] for i in range(0, N_coordinate, size)], workers, callback,
+    )
     
     # Initialize data containers
     table = tables[0]
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+
+__all__ = ('get_sample_order',
+           'nearest_neighbor_order',
+           'kdtree_nearest_neighbor_order',
+           'morton_order',
+           'hilbert_order')
+
+#: Minkowski p-norms of distance metrics available for KD-trees.
+minkowski_norms = {
+    'cityblock': 1,
+    'euclidean': 2,
+    'chebyshev': np.inf,
+}
+
+def nearest_neighbor_order(points, distance='cityblock'):
+    """
+    Return the order of a greedy nearest neighbor walk through all points
+    starting with the first point, using a dense distance matrix
+    (O(N^2) memory).
+
+    """
+    length = len(points)
+    if not length: return []
+    distances = cdist(points, points, metric=distance)
+    distances[:, 0] = np.inf
+    nearest = 0
+    index = [nearest]
+    for i in range(length - 1):
+        # Visited points are masked, so duplicates and ties need no special care
+        nearest = int(distances[nearest].argmin())
+        distances[:, nearest] = np.inf
+        index.append(nearest)
+    return index
+
+def kdtree_nearest_neighbor_order(points, distance='cityblock', k=8):
+    """
+    Return the order of a greedy nearest neighbor walk through all points
+    starting with the first point, querying a KD-tree for the nearest
+    unvisited point (O(N) memory). The tree is rebuilt with the unvisited
+    points once most of its points have been visited.
+
+    """
+    if distance not in minkowski_norms:
+        raise ValueError(
+            f"distance {distance!r} is not available for KD-trees; "
+            f"only {', '.join([repr(i) for i in minkowski_norms])} are valid"
+        )
+    p = minkowski_norms[distance]
+    length = len(points)
+    visited = np.zeros(length, dtype=bool)
+    index = np.zeros(length, dtype=int)
+    tree_index = np.arange(length)
+    tree = cKDTree(points)
+    N_unvisited = length - 1 # In tree
+    visited[0] = True
+    current = 0
+    for n in range(1, length):
+        N_tree = tree_index.size
+        if N_tree > 64 and 4 * N_unvisited < N_tree:
+            tree_index = np.flatnonzero(~visited)
+            tree = cKDTree(points[tree_index])
+            N_unvisited = N_tree = tree_index.size
+        N_neighbors = k
+        while True:
+            N_neighbors = min(N_neighbors, N_tree)
+            distances, neighbors = tree.query(points[current], k=N_neighbors, p=p)
+            candidates = tree_index[np.atleast_1d(neighbors)]
+            unvisited = ~visited[candidates]
+            if unvisited.any():
+                current = candidates[unvisited.argmax()] # Closest unvisited
+                break
+            N_neighbors *= 2
+        visited[current] = True
+        index[n] = current
+        N_unvisited -= 1
+    return index.tolist()
+
+def quantize(points, bits):
+    """Return points (normalized from 0 to 1) as integer coordinates
+    from 0 to 2^bits - 1."""
+    levels = (1 << bits) - 1
+    return np.rint(np.clip(points, 0., 1.) * levels).astype(np.uint64)
+
+def interleave_bits(coordinates, bits):
+    """Return keys (as rows of 64-bit words, most significant first)
+    interleaving bits of integer coordinates from the most significant bit."""
+    N, N_dimensions = coordinates.shape
+    N_bits = bits * N_dimensions
+    N_words = -(-N_bits // 64)
+    words = np.zeros([N_words, N], dtype=np.uint64)
+    position = 0
+    one = np.uint64(1)
+    for level in range(bits - 1, -1, -1):
+        level = np.uint64(level)
+        for i in range(N_dimensions):
+            word, offset = divmod(position, 64)
+            shift = np.uint64(63 - offset)
+            words[word] |= ((coordinates[:, i] >> level) & one) << shift
+            position += 1
+    return words
+
+def hilbert_transpose(coordinates, bits):
+    """Return the Hilbert index of integer coordinates in transposed form
+    (Skilling's algorithm)."""
+    X = coordinates.copy()
+    N, N_dimensions = X.shape
+    M = np.uint64(1 << (bits - 1))
+    Q = M
+    one = np.uint64(1)
+    while Q > one:
+        P = Q - one
+        for i in range(N_dimensions):
+            mask = (X[:, i] & Q) != 0
+            X[mask, 0] ^= P # Invert
+            mask = ~mask
+            t = (X[mask, 0] ^ X[mask, i]) & P # Exchange
+            X[mask, 0] ^= t
+            X[mask, i] ^= t
+        Q >>= one
+    for i in range(1, N_dimensions): X[:, i] ^= X[:, i - 1] # Gray encode
+    t = np.zeros(N, dtype=np.uint64)
+    Q = M
+    while Q > one:
+        mask = (X[:, -1] & Q) != 0
+        t[mask] ^= Q - one
+        Q >>= one
+    for i in range(N_dimensions): X[:, i] ^= t
+    return X
+
+def get_bits(N_points, N_dimensions):
+    # Enough resolution to tell points apart without wasting work on empty space
+    return int(min(16, max(2, np.ceil(np.log2(N_points) / N_dimensions) + 4)))
+
+def morton_order(points, bits=None):
+    """Return the order of points (normalized from 0 to 1) along a
+    Morton (Z-order) space-filling curve."""
+    N, N_dimensions = points.shape
+    if bits is None: bits = get_bits(N, N_dimensions)
+    words = interleave_bits(quantize(points, bits), bits)
+    return np.lexsort(words[::-1]).tolist()
+
+def hilbert_order(points, bits=None):
+    """Return the order of points (normalized from 0 to 1) along a
+    Hilbert space-filling curve."""
+    N, N_dimensions = points.shape
+    if bits is None: bits = get_bits(N, N_dimensions)
+    coordinates = hilbert_transpose(quantize(points, bits), bits)
+    words = interleave_bits(coordinates, bits)
+    return np.lexsort(words[::-1]).tolist()
+
+#: All sample ordering algorithms by name.
+sample_order_algorithms = {
+    'nearest neighbor': nearest_neighbor_order,
+    'kd-tree': kdtree_nearest_neighbor_order,
+    'hilbert': lambda points, distance: hilbert_order(points),
+    'morton': lambda points, distance: morton_order(points),
+}
+
+#: Maximum number of samples sorted with a dense distance matrix by default.
+max_dense_samples = 5000
+
+def get_sample_order(points, distance=None, algorithm=None):
+    """
+    Return the order of points that minimizes the distance between
+    consecutive points (approximately).
+
+    Parameters
+    ----------
+    points : numpy.ndarray, dim=2
+        Normalized points (from 0 to 1).
+    distance : str, optional
+        Distance metric. Defaults to 'cityblock'.
+    algorithm : str, optional
+        Either 'nearest neighbor' (greedy walk using a dense distance matrix),
+        'kd-tree' (greedy walk using a KD-tree), 'hilbert', or 'morton'
+        (space-filling curves). Defaults to 'nearest neighbor' for up to
+        5000 points and 'kd-tree' otherwise.
+
+    """
+    if distance is None: distance = 'cityblock'
+    if algorithm is None:
+        algorithm = 'nearest neighbor' if len(points) <= max_dense_samples else 'kd-tree'
+    else:
+        algorithm = algorithm.lower()
+    if algorithm not in sample_order_algorithms:
+        raise ValueError(
+            f"algorithm {algorithm!r} is not available; only "
+            f"{', '.join([repr(i) for i in sample_order_algorithms])} are valid"
+        )
+    return sample_order_algorithms[algorithm](points, distance)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+from scipy.stats import norm
+
+__all__ = ('sobol_indices', 'morris_effects')
+
+def bootstrap_index(N, num_resamples, seed):
+    return np.random.default_rng(seed).integers(N, size=(num_resamples, N))
+
+def confidence_interval(resamples, conf_level):
+    # Half-width of the interval assuming normally distributed resamples
+    return norm.ppf(0.5 + conf_level / 2) * resamples.std(axis=0, ddof=1)
+
+def first_order(A, AB, B):
+    # Saltelli et al. (2010); the last axis of AB is the parameter
+    variance = np.concatenate([A, B], axis=-1).var(axis=-1)
+    return (B[..., None] * (AB - A[..., None])).mean(axis=-2) / variance[..., None]
+
+def total_order(A, AB, B):
+    # Jansen (1999)
+    variance = np.concatenate([A, B], axis=-1).var(axis=-1)
+    return 0.5 * ((A[..., None] - AB) ** 2).mean(axis=-2) / variance[..., None]
+
+def sobol_indices(Y, N_parameters, num_resamples=100, conf_level=0.95, seed=None):
+    """
+    Return first and total order Sobol indices and their confidence intervals
+    (by bootstrapping) as 1d arrays (by parameter) given model outputs at
+    a Saltelli design without second order samples.
+
+    Parameters
+    ----------
+    Y : numpy.ndarray, dim=1
+        Model outputs, with rows grouped as (A, AB_1, ..., AB_D, B).
+    N_parameters : int
+        Number of parameters (D).
+    num_resamples : int, optional
+        Number of bootstrap resamples. Defaults to 100.
+    conf_level : float, optional
+        Confidence level of intervals. Defaults to 0.95.
+    seed : int, optional
+        Seed of bootstrap resamples.
+
+    Notes
+    -----
+    Groups with NaN outputs (i.e. failed evaluations) are ignored.
+
+    """
+    D = N_parameters
+    Y = np.asarray(Y, dtype=float).reshape([-1, D + 2])
+    Y = Y[~np.isnan(Y).any(axis=1)]
+    N = Y.shape[0]
+    if N < 2:
+        nan = np.full(D, np.nan)
+        return nan, nan.copy(), nan.copy(), nan.copy()
+    A = Y[:, 0]
+    AB = Y[:, 1:-1]
+    B = Y[:, -1]
+    S1 = first_order(A, AB, B)
+    ST = total_order(A, AB, B)
+    index = bootstrap_index(N, num_resamples, seed)
+    A, AB, B = A[index], AB[index], B[index]
+    S1_conf = confidence_interval(first_order(A, AB, B), conf_level)
+    ST_conf = confidence_interval(total_order(A, AB, B), conf_level)
+    return S1, S1_conf, ST, ST_conf
+
+def morris_effects(X, Y, bounds, num_resamples=100, conf_level=0.95, seed=None):
+    """
+    Return the mean, mean of absolute values, and standard deviation of
+    elementary effects, and the confidence interval of the mean of absolute
+    values (by bootstrapping), as 1d arrays (by parameter) given samples
+    and model outputs of Morris trajectories.
+
+    Parameters
+    ----------
+    X : numpy.ndarray, dim=2
+        Samples, with rows grouped in trajectories of D + 1 samples.
+    Y : numpy.ndarray, dim=1
+        Model outputs.
+    bounds : numpy.ndarray, dim=2
+        Lower and upper bounds of parameters. Elementary effects are
+        computed with respect to normalized parameters.
+    num_resamples : int, optional
+        Number of bootstrap resamples. Defaults to 100.
+    conf_level : float, optional
+        Confidence level of intervals. Defaults to 0.95.
+    seed : int, optional
+        Seed of bootstrap resamples.
+
+    Notes
+    -----
+    Trajectories with NaN outputs (i.e. failed evaluations) are ignored.
+
+    """
+    X = np.asarray(X, dtype=float)
+    D = X.shape[1]
+    bounds = np.asarray(bounds, dtype=float)
+    lb, ub = bounds.transpose()
+    X = ((X - lb) / (ub - lb)).reshape([-1, D + 1, D])
+    Y = np.asarray(Y, dtype=float).reshape([-1, D + 1])
+    valid = ~np.isnan(Y).any(axis=1)
+    X = X[valid]
+    Y = Y[valid]
+    N = Y.shape[0]
+    if N < 2:
+        nan = np.full(D, np.nan)
+        return nan, nan.copy(), nan.copy(), nan.copy()
+    dX = np.diff(X, axis=1) # Only one parameter changes at each step
+    parameter = np.abs(dX).argmax(axis=2)
+    delta = np.take_along_axis(dX, parameter[..., None], axis=2)[..., 0]
+    effects = np.empty([N, D])
+    trajectory = np.arange(N)[:, None]
+    effects[trajectory, parameter] = np.diff(Y, axis=1) / delta
+    mu = effects.mean(axis=0)
+    mu_star = np.abs(effects).mean(axis=0)
+    sigma = effects.std(axis=0, ddof=1)
+    index = bootstrap_index(N, num_resamples, seed)
+    mu_star_conf = confidence_interval(np.abs(effects[index]).mean(axis=1), conf_level)
+    return mu, mu_star, sigma, mu_star_conf
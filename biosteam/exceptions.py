@@ -15,6 +15,7 @@ __all__ = (
     'DesignError', 
     'FailedEvaluation',
     'Converged',
+    'EvaluationTimeout',
     'UnitWarning',
     'DesignWarning', 
     'CostWarning',
@@ -35,6 +36,9 @@ class FailedEvaluation(RuntimeWarning):
 class Converged(Exception):
     """Exception to stop iteration early."""
     
+class EvaluationTimeout(RuntimeError):
+    """RuntimeError regarding a simulation that exceeded its time limit."""
+    
 # %% BioSTEAM warnings
 
 class UnitWarning(Warning):
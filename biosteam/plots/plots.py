@@ -7,6 +7,7 @@
 # for license details.
 """
 """
+import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -1428,11 +1429,193 @@ def plot_kde_2d(
 
 # %% Contours
 
+def serpentine_order(N_x, N_y):
+    """Return grid indices (j, i) of y and x points row by row, alternating 
+    the direction of x in each row so that consecutive points are neighbors."""
+    order = []
+    for j in range(N_y):
+        xs = range(N_x) if j % 2 == 0 else range(N_x - 1, -1, -1)
+        order.extend([(j, i) for i in xs])
+    return order
+
+def refine_grid_lines(x, Z, axis, max_step):
+    """Return midpoints of intervals between grid lines along an axis of Z
+    where any metric changes by more than `max_step` (relative to its range)."""
+    if len(x) < 2: return []
+    M = Z.reshape([*Z.shape[:2], -1])
+    lb = np.nanmin(M, axis=(0, 1))
+    diff = np.nanmax(M, axis=(0, 1)) - lb
+    diff[~(diff > 0)] = 1.
+    step = np.nanmax(np.abs(np.diff(M, axis=axis)) / diff, axis=(1 - axis, 2))
+    return [0.5 * (x[i] + x[i + 1]) for i in np.flatnonzero(step > max_step)]
+
+def load_grid_checkpoint(file):
+    """Return the shape of indicator values (None if the file has no 
+    header) and indicator values by (x, y) point saved in a checkpoint file."""
+    with open(file, 'rb') as f: data = f.read()
+    if len(data) < 8: return None, {}
+    ndim = int(np.frombuffer(data[:8], dtype=float)[0])
+    start = 8 * (1 + ndim)
+    if len(data) < start: return None, {}
+    shape = tuple([int(i) for i in np.frombuffer(data[8:start], dtype=float)])
+    row = 8 * (2 + int(np.prod(shape)))
+    N_bytes = len(data) - (len(data) - start) % row # Discard incomplete entry
+    if N_bytes != len(data):
+        with open(file, 'r+b') as f: f.truncate(N_bytes)
+    rows = np.frombuffer(data[start:N_bytes], dtype=float).reshape([-1, row // 8])
+    return shape, {(x, y): z.reshape(shape) for (x, y), z in zip(rows[:, :2].tolist(), rows[:, 2:])}
+
+def evaluate_at_grid_point(z_at_xy, args): # pragma: no cover
+    x, y, other = args
+    return np.asarray(z_at_xy(x, y, *other), dtype=float)
+
+def evaluate_grid(
+        z_at_xy, x, y, args=(), refine=0, max_step=0.1, workers=None, 
+        checkpoint=None, resume=True, values=None,
+    ):
+    """
+    Evaluate a function over a grid and return X, Y, and Z arrays 
+    (as given by `np.meshgrid`). Points are evaluated in a serpentine order 
+    (along x, alternating direction in each row of y) so that each point 
+    starts from the state of a neighboring point.
+    
+    Parameters
+    ----------
+    z_at_xy : Callable(x, y, *args)
+        Function to evaluate.
+    x, y : Iterable[float]
+        Initial grid lines.
+    args : tuple, optional
+        Additional arguments to `z_at_xy`.
+    refine : int, optional
+        Number of rounds of adaptive refinement. In each round, grid lines 
+        are added halfway between neighboring lines where any metric 
+        changes by more than `max_step`. Defaults to 0.
+    max_step : float, optional
+        Maximum change of metrics (relative to their range) between 
+        neighboring grid lines after refinement. Defaults to 0.1.
+    workers : int, optional
+        Number of worker processes to distribute contiguous groups of
+        points across. Note that `z_at_xy` must be picklable unless the 
+        start method is 'fork'. Defaults to evaluating points in the 
+        current process.
+    checkpoint : str, optional
+        File to append values of each point to as they are evaluated.
+    resume : bool, optional
+        Whether to load values of points saved in the checkpoint file 
+        instead of evaluating them again. Defaults to True.
+    values : dict[tuple[float, float], Any], optional
+        Values of points already evaluated (not saved to the checkpoint file).
+    
+    """
+    x = sorted(set([float(i) for i in x]))
+    y = sorted(set([float(i) for i in y]))
+    values = {} if values is None else {(float(i), float(j)): np.asarray(k, dtype=float) for (i, j), k in values.items()}
+    shape = next(iter(values.values())).shape if values else None
+    saved_shape = None
+    if checkpoint and resume and os.path.exists(checkpoint):
+        saved_shape, saved_values = load_grid_checkpoint(checkpoint)
+        if saved_shape is not None:
+            if shape is None: 
+                shape = saved_shape
+            elif shape != saved_shape:
+                raise ValueError('shape of values does not match checkpoint')
+            for key, value in saved_values.items(): values.setdefault(key, value)
+    log = None
+    if checkpoint:
+        # The header (shape of values) is written with the first point
+        log = open(checkpoint, 'wb' if saved_shape is None else 'ab', buffering=0)
+    def record(point, value):
+        nonlocal shape
+        value = np.asarray(value, dtype=float)
+        if shape is None: shape = value.shape
+        values[point] = value
+        if log is not None: 
+            if not log.tell(): log.write(np.array([len(shape), *shape], dtype=float).tobytes())
+            log.write(np.array([*point, *value.flat], dtype=float).tobytes())
+    def evaluate(points):
+        points = [i for i in points if i not in values]
+        if not points: return
+        if workers is not None and workers > 1:
+            from functools import partial
+            from biosteam.evaluation.evaluation_tools.in_parallel import (
+                evaluate_in_processes, return_value
+            )
+            size = max(int(np.ceil(len(points) / workers)), 1)
+            items = [(i, (*i, args)) for i in points]
+            evaluate_in_processes(
+                partial(return_value, z_at_xy), evaluate_at_grid_point, 
+                [items[i:i+size] for i in range(0, len(items), size)], 
+                workers, record,
+            )
+        else:
+            for point in points: record(point, z_at_xy(*point, *args))
+    def assemble():
+        Z = np.empty([len(y), len(x), *shape])
+        for j, yj in enumerate(y):
+            for i, xi in enumerate(x): Z[j, i] = values[xi, yj]
+        return Z
+    try:
+        for n in range(refine + 1):
+            evaluate([(x[i], y[j]) for j, i in serpentine_order(len(x), len(y))])
+            if n == refine: break
+            Z = assemble()
+            new_x = refine_grid_lines(x, Z, 1, max_step)
+            new_y = refine_grid_lines(y, Z, 0, max_step)
+            if not (new_x or new_y): break
+            x = sorted(x + new_x)
+            y = sorted(y + new_y)
+    finally:
+        if log is not None: log.close()
+    X, Y = np.meshgrid(x, y)
+    return X, Y, assemble()
+
 def generate_contour_data(
         z_at_xy, xlim, ylim, n=5, file=None, load=True, save=True,
         strict_convergence=None, filterwarnings=True, smooth=True, 
-        vectorize=True, args=(),
+        vectorize=True, args=(), workers=None, refine=0, max_step=0.1,
     ):
+    """
+    Evaluate a function over a grid of x and y values and return X, Y, 
+    and Z arrays for contour plots.
+    
+    Parameters
+    ----------
+    z_at_xy : Callable(x, y, *args)
+        Function that returns metrics at x and y.
+    xlim, ylim : tuple[float, float]
+        Limits of x and y.
+    n : int, optional
+        Number of x and y values. Defaults to 5.
+    file : str, optional
+        File to save Z (as a .npy file) and load Z from. Values of each point
+        are also saved to a checkpoint file (`file` + '.log') as they are 
+        evaluated, so an interrupted evaluation can be resumed.
+    load : bool, optional
+        Whether to load Z from the file (if it exists) or resume from the 
+        checkpoint file. Defaults to True.
+    save : bool, optional
+        Whether to save Z to the file. Defaults to True.
+    vectorize : bool, optional
+        Whether to evaluate `z_at_xy` point by point. If False, `z_at_xy` is 
+        called once with X and Y arrays. Defaults to True.
+    workers : int, optional
+        Number of worker processes to evaluate points in.
+    refine : int, optional
+        Number of rounds of adaptive refinement near steep gradients 
+        (see :func:`evaluate_grid`). Refined grids are not evenly spaced,
+        so they are not smoothed. Defaults to 0.
+    max_step : float, optional
+        Maximum change of metrics (relative to their range) between 
+        neighboring grid lines after refinement. Defaults to 0.1.
+    
+    Notes
+    -----
+    Points are evaluated in a serpentine order (alternating the direction 
+    of x in each row) so that each point starts from the converged state 
+    of a neighboring point.
+    
+    """
     if strict_convergence is not None: 
         bst.System.strict_convergence = strict_convergence
     x0, xf = xlim
@@ -1440,31 +1623,25 @@ def generate_contour_data(
     x = np.linspace(x0, xf, n)
     y = np.linspace(y0, yf, n)
     X, Y = np.meshgrid(x, y)
-    if file and load:
+    if file and load and not refine and os.path.exists(file):
         Z = np.load(file, allow_pickle=True)
     else:
         if filterwarnings:
             from warnings import filterwarnings
             filterwarnings('ignore')
-        data0 = np.asarray(z_at_xy(x0, y0, *args))
-        shape = data0.shape
-        if len(shape) == 1:
-            shape = f"({shape[0]})"
         if vectorize:
-            N_args = len(args)
-            Z_at_XY = np.vectorize(
-                z_at_xy, signature=f'(),()->{shape}',
-                excluded=tuple(range(2, 2 + N_args)),
+            X, Y, Z = evaluate_grid(
+                z_at_xy, x, y, args, refine, max_step, workers, 
+                checkpoint=file + '.log' if file else None, resume=load,
             )
         else:
-            Z_at_XY = z_at_xy
-        Z = Z_at_XY(X, Y, *args)
-        if smooth: # Smooth curves due to avoid discontinuities
-            from scipy.ndimage.filters import gaussian_filter
+            Z = z_at_xy(X, Y, *args)
+        if smooth and not refine: # Smooth curves due to avoid discontinuities (only on evenly spaced grids)
+            from scipy.ndimage import gaussian_filter
             A, B, *other = Z.shape
             for index in product(*[range(i) for i in other]):
                 Z[(..., *index)] = gaussian_filter(Z[(..., *index)], smooth)
-    if file and save and not load: np.save(file, Z)
+        if file and save: np.save(file, Z)
     return X, Y, Z
 
 def plot_contour(
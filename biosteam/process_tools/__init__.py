@@ -14,6 +14,7 @@ from . import system_factory
 from . import system_mesh
 from . import unit_group
 from . import utils
+from . import tear_selection
 
 __all__ = (
     *process_model.__all__,
@@ -23,6 +24,7 @@ __all__ = (
     *system_mesh.__all__,
     *unit_group.__all__,
     *utils.__all__,
+    *tear_selection.__all__,
 )
 from .process_model import *
 from .segment import *
@@ -30,4 +32,5 @@ from .reactor_specification import *
 from .system_factory import *
 from .system_mesh import *
 from .unit_group import *
-from .utils import *
\ No newline at end of file
+from .utils import *
+from .tear_selection import *
\ No newline at end of file
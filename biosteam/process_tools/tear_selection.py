@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import heapq
+import numpy as np
+
+__all__ = ('TearSelection', 'select_tears', 'tear_weight')
+
+# %% Tear weights
+
+def tear_weight(stream):
+    """
+    Return the dimension of the recycle data of a tear stream (i.e., number
+    of chemicals with nonzero flow rates plus temperature and pressure).
+    """
+    return max(int(np.count_nonzero(stream.mol.to_array())), 1) + 2
+
+# %% Graph algorithms
+
+def strongly_connected_components(nodes, successors):
+    """Return strongly connected components of a directed graph (Tarjan)."""
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+    counter = [0]
+    for root in nodes:
+        if root in index: continue
+        work = [(root, iter(successors[root]))]
+        index[root] = lowlink[root] = counter[0]
+        counter[0] += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = counter[0]
+                    counter[0] += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors[child])))
+                    break
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        child = stack.pop()
+                        on_stack.discard(child)
+                        component.append(child)
+                        if child is node: break
+                    components.append(component)
+    return components
+
+def simple_cycles(nodes, successors, max_cycles):
+    """
+    Return all elementary cycles (as lists of arcs) of a directed graph
+    (Johnson's algorithm) or None if there are more than `max_cycles`.
+    """
+    order = {j: i for i, j in enumerate(nodes)}
+    cycles = []
+    graph = {}
+    for i in nodes:
+        children = successors[i]
+        if i in children:
+            cycles.append([(i, i)])
+            children = [j for j in children if j is not i]
+        graph[i] = children
+    if len(cycles) > max_cycles: return None
+    components = [i for i in strongly_connected_components(nodes, graph) if len(i) > 1]
+    while components:
+        component = components.pop()
+        members = set(component)
+        start = min(component, key=order.__getitem__)
+        subgraph = {i: [j for j in graph[i] if j in members] for i in component}
+        path = [start]
+        blocked = {start}
+        closed = set()
+        blocks = {i: set() for i in component}
+        stack = [(start, iter(subgraph[start]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child is start:
+                    cycles.append([*zip(path, path[1:]), (path[-1], start)])
+                    if len(cycles) > max_cycles: return None
+                    closed.update(path)
+                elif child not in blocked:
+                    path.append(child)
+                    stack.append((child, iter(subgraph[child])))
+                    closed.discard(child)
+                    blocked.add(child)
+                    break
+            else:
+                if node in closed:
+                    unblock = [node]
+                    while unblock:
+                        i = unblock.pop()
+                        if i in blocked:
+                            blocked.discard(i)
+                            unblock.extend(blocks[i])
+                            blocks[i].clear()
+                else:
+                    for i in subgraph[node]: blocks[i].add(node)
+                stack.pop()
+                path.pop()
+        members.discard(start)
+        remaining = [i for i in component if i is not start]
+        components.extend([
+            i for i in strongly_connected_components(
+                remaining, {i: [j for j in graph[i] if j in members] for i in remaining}
+            ) 
+            if len(i) > 1
+        ])
+    return cycles
+
+def greedy_cover(cycles, weights):
+    """Return a set of arcs that cover all cycles by greedily selecting arcs
+    with the most uncovered cycles per unit weight, followed by removal of
+    redundant arcs."""
+    uncovered = [set(i) for i in cycles]
+    chosen = []
+    while uncovered:
+        counts = {}
+        for cycle in uncovered:
+            for arc in cycle: counts[arc] = counts.get(arc, 0) + 1
+        arc = max(counts, key=lambda arc: (counts[arc] / weights[arc], -weights[arc]))
+        chosen.append(arc)
+        uncovered = [i for i in uncovered if arc not in i]
+    cycle_sets = [set(i) for i in cycles]
+    for arc in sorted(chosen, key=weights.__getitem__, reverse=True):
+        others = set(chosen)
+        others.discard(arc)
+        if all([not others.isdisjoint(i) for i in cycle_sets]): chosen.remove(arc)
+    return chosen
+
+def minimum_cover(cycles, weights, max_nodes):
+    """Return minimum weight set of arcs that cover all cycles (branch and
+    bound) and whether the search completed within `max_nodes` nodes."""
+    best = greedy_cover(cycles, weights)
+    best_cost = [sum([weights[i] for i in best])]
+    nodes = [0]
+    def search(uncovered, chosen, cost):
+        if cost >= best_cost[0] or nodes[0] > max_nodes: return
+        nodes[0] += 1
+        if not uncovered:
+            best_cost[0] = cost
+            best[:] = chosen
+            return
+        cycle = min(uncovered, key=len)
+        for arc in sorted(cycle, key=weights.__getitem__):
+            search([i for i in uncovered if arc not in i], [*chosen, arc], cost + weights[arc])
+    search([set(i) for i in cycles], [], 0)
+    return best, nodes[0] <= max_nodes
+
+def greedy_feedback_arcs(nodes, successors, weights):
+    """Return a set of arcs that break all cycles by repeatedly cutting the
+    minimum weight arc of a cycle (used when there are too many cycles to
+    enumerate)."""
+    successors = {i: [*j] for i, j in successors.items()}
+    chosen = []
+    while True:
+        cycle = find_cycle(nodes, successors)
+        if cycle is None: break
+        arc = min(cycle, key=weights.__getitem__)
+        chosen.append(arc)
+        successors[arc[0]].remove(arc[1])
+    return chosen
+
+def find_cycle(nodes, successors):
+    color = {}
+    for root in nodes:
+        if root in color: continue
+        path = [root]
+        color[root] = 1
+        work = [iter(successors[root])]
+        while work:
+            for child in work[-1]:
+                state = color.get(child)
+                if state == 1:
+                    cycle = path[path.index(child):]
+                    return [*zip(cycle, cycle[1:]), (cycle[-1], child)]
+                elif state is None:
+                    color[child] = 1
+                    path.append(child)
+                    work.append(iter(successors[child]))
+                    break
+            else:
+                color[path.pop()] = 2
+                work.pop()
+    return None
+
+def topological_order(nodes, successors):
+    """Return nodes in topological order, preserving the original order when
+    possible."""
+    order = {j: i for i, j in enumerate(nodes)}
+    in_degree = {i: 0 for i in nodes}
+    for i in nodes:
+        for j in successors[i]: in_degree[j] += 1
+    heap = [order[i] for i in nodes if not in_degree[i]]
+    heapq.heapify(heap)
+    sorted_nodes = []
+    while heap:
+        node = nodes[heapq.heappop(heap)]
+        sorted_nodes.append(node)
+        for i in successors[node]:
+            in_degree[i] -= 1
+            if not in_degree[i]: heapq.heappush(heap, order[i])
+    if len(sorted_nodes) != len(nodes): raise RuntimeError('graph is not acyclic')
+    return sorted_nodes
+
+# %% Tear selection
+
+class TearSelection:
+    """
+    Create a TearSelection object that reports the tear streams selected to
+    break all recycle loops in a network of unit operations.
+
+    Parameters
+    ----------
+    path : list[Unit|list[Unit]]
+        Unit operations in the order they are simulated. Recycle loops 
+        (strongly connected units) are grouped in lists.
+    loop_tears : list[list[Stream]]
+        Tear streams of each recycle loop in the path.
+    loop_weights : list[list[float]]
+        Weight of each tear stream.
+    cycles : int|None
+        Number of elementary cycles (None if not enumerated).
+    passes : int|None
+        Maximum number of tears in any cycle. A nonredundant tear set
+        tears each cycle once (i.e., one pass per iteration).
+    exact : bool
+        Whether the tear set is proven to have minimum weight.
+
+    """
+    __slots__ = ('path', 'loop_tears', 'loop_weights', 'cycles', 'passes', 'exact')
+
+    def __init__(self, path, loop_tears, loop_weights, cycles, passes, exact):
+        self.path = path
+        self.loop_tears = loop_tears
+        self.loop_weights = loop_weights
+        self.cycles = cycles
+        self.passes = passes
+        self.exact = exact
+
+    @property
+    def tears(self):
+        """All tear streams."""
+        return [j for i in self.loop_tears for j in i]
+
+    @property
+    def weights(self):
+        """Weights of all tear streams."""
+        return [j for i in self.loop_weights for j in i]
+
+    @property
+    def weight(self):
+        """Total weight of tear streams."""
+        return sum(self.weights)
+    
+    @property
+    def loops(self):
+        """Number of recycle loops."""
+        return len(self.loop_tears)
+
+    def _info(self):
+        tears = ', '.join([f"{i} ({j})" for i, j in zip(self.tears, self.weights)]) or 'none'
+        info = (f"{type(self).__name__}:\n"
+                f"tears: {tears}\n"
+                f"weight: {self.weight}\n"
+                f"loops: {self.loops}\n"
+                f"cycles: {'unknown' if self.cycles is None else self.cycles}\n"
+                f"passes: {'unknown' if self.passes is None else self.passes}\n"
+                f"exact: {self.exact}")
+        return info
+
+    def show(self):
+        print(self._info())
+    _ipython_display_ = show
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {', '.join([str(i) for i in self.tears])}>"
+
+def select_tears(units, weight=None, max_cycles=1000, max_nodes=100000):
+    """
+    Return a TearSelection object with a minimum weight set of tear streams
+    (i.e., a feedback arc set) that breaks all recycle loops.
+
+    Parameters
+    ----------
+    units : Sequence[Unit]
+        Unit operations in the preferred simulation order.
+    weight : Callable(Stream) -> float, optional
+        Weight of tearing a stream. Defaults to the dimension of the recycle
+        data (see :func:`tear_weight`).
+    max_cycles : int, optional
+        Maximum number of elementary cycles enumerated for each recycle 
+        loop. If exceeded, tear streams are selected by greedily cutting the 
+        minimum weight arc of each cycle.
+    max_nodes : int, optional
+        Maximum number of nodes in the branch and bound search for the
+        minimum weight tear set. If exceeded, the best tear set found is used.
+
+    Notes
+    -----
+    All streams from one unit operation to another are torn together. 
+    Each group of strongly connected units forms one recycle loop.
+
+    """
+    if weight is None: weight = tear_weight
+    units = list(units)
+    unit_set = set(units)
+    arc_streams = {}
+    successors = {i: [] for i in units}
+    for u in units:
+        for s in u.outs:
+            sink = s.sink
+            if sink not in unit_set: continue
+            arc = (u, sink)
+            if arc in arc_streams:
+                arc_streams[arc].append(s)
+            else:
+                arc_streams[arc] = [s]
+                successors[u].append(sink)
+    weights = {i: sum([weight(s) for s in j]) for i, j in arc_streams.items()}
+    order = {j: i for i, j in enumerate(units)}
+    components = strongly_connected_components(units, successors)
+    for i in components: i.sort(key=order.__getitem__)
+    components.sort(key=lambda x: order[x[0]])
+    component_index = {j: n for n, i in enumerate(components) for j in i}
+    component_successors = {
+        n: list(set([component_index[j] for i in c for j in successors[i]]) - {n})
+        for n, c in enumerate(components)
+    }
+    path = []
+    loop_tears = []
+    loop_weights = []
+    N_cycles = 0
+    passes = 0
+    exact = True
+    for n in topological_order(list(range(len(components))), component_successors):
+        component = components[n]
+        members = set(component)
+        local_successors = {i: [j for j in successors[i] if j in members] for i in component}
+        if len(component) == 1:
+            unit, = component
+            if unit not in local_successors[unit]:
+                path.append(unit)
+                continue
+        cycles = simple_cycles(component, local_successors, max_cycles)
+        if cycles is None:
+            arcs = greedy_feedback_arcs(component, local_successors, weights)
+            exact = False
+            N_cycles = passes = None
+        else:
+            arcs, proven = minimum_cover(cycles, weights, max_nodes)
+            exact = exact and proven
+            if N_cycles is not None: 
+                N_cycles += len(cycles)
+                arc_set = set(arcs)
+                passes = max(passes, *[len(arc_set.intersection(i)) for i in cycles])
+        arc_set = set(arcs)
+        loop = topological_order(
+            component, {i: [j for j in local_successors[i] if (i, j) not in arc_set] for i in component}
+        )
+        loop_order = {j: i for i, j in enumerate(loop)}
+        arcs = sorted(arcs, key=lambda x: (loop_order[x[1]], loop_order[x[0]]))
+        tears = [s for arc in arcs for s in arc_streams[arc]]
+        path.append(loop)
+        loop_tears.append(tears)
+        loop_weights.append([weight(s) for s in tears])
+    return TearSelection(path, loop_tears, loop_weights, N_cycles, passes, exact)
@@ -31,6 +31,8 @@ from scipy.differentiate import jacobian
 from scipy.spatial.distance import cdist
 from collections import deque
 from .. import Unit
+from ..utils import check_deadline
+from ..exceptions import EvaluationTimeout
 from .design_tools import MESH
 from numba import float64, int8, types, njit
 from typing import NamedTuple, Iterable
@@ -2594,6 +2596,7 @@ class MultiStageEquilibrium(Unit):
         for n in range(self.max_attempts or 1):
             self.attempt = n
             for algorithm, method in zip(algorithms, methods):
+                check_deadline()
                 if algorithm == 'simultaneous correction':
                     if 'K' in self.partition_data or self._vlle: continue
                     x = self._simultaneous_correction(x, method)
@@ -2618,6 +2621,8 @@ class MultiStageEquilibrium(Unit):
                         if self.conversion_homotopy == 1:
                             try:
                                 x = solver(f, x, maxiter=maxiter, xtol=xtol, rtol=rtol, args=(algorithm,))
+                            except EvaluationTimeout:
+                                raise
                             except:
                                 x = self._best_result.x
                                 self._mean_residual = inf
@@ -2638,6 +2643,8 @@ class MultiStageEquilibrium(Unit):
                                 )
                             try:
                                 x = solver(f, x, maxiter=maxiter, xtol=xtol, rtol=rtol, args=(algorithm,))
+                            except EvaluationTimeout:
+                                raise
                             except:
                                 x = self._best_result.x
                             self._mean_residual = inf
@@ -2645,6 +2652,8 @@ class MultiStageEquilibrium(Unit):
                             self._best_result = IterationResult(x, inf)
                     else:
                         x = solver(f, x, maxiter=maxiter, xtol=xtol, rtol=rtol, args=(algorithm,))
+                except EvaluationTimeout:
+                    raise
                 except:
                     self._mean_residual = inf
                     self._iteration_record[0] = IterationResult(None, inf)
@@ -2699,6 +2708,7 @@ class MultiStageEquilibrium(Unit):
         return x1
     
     def _iter(self, x0, algorithm):
+        check_deadline()
         self.iter += 1
         self._set_point(x0)
         if algorithm == 'phenomena':
@@ -2885,13 +2895,16 @@ class MultiStageEquilibrium(Unit):
                 (self.iter + 1, 'simultaneous correction')
             )
             def f(x):
+                check_deadline()
                 x = x.reshape(shape)
                 self.iter += 1
                 try: self._tracked_points[self.iter] = x
                 except: pass
                 return self._residuals(x).flatten()
         else:
-            f = lambda x: self._residuals(x.reshape(shape)).flatten()
+            def f(x):
+                check_deadline()
+                return self._residuals(x.reshape(shape)).flatten()
         
         jac = lambda x: MESH.create_block_tridiagonal_matrix(*self._jacobian(x.reshape(shape)))
         x, *self._simultaneous_correction_info = fsolve(
@@ -2920,6 +2933,7 @@ class MultiStageEquilibrium(Unit):
                 )
             else:
                 raise ValueError(f'invalid simultaneous correction method {method!r}')
+        except EvaluationTimeout: raise
         except: pass
         else:
             x[x < 0] = 0
@@ -15,6 +15,9 @@ from . import (
     stream_link_options,
     functors,
     scope,
+    accelerators,
+    profiler,
+    deadline,
 )
 __all__ = (
     'colors',
@@ -27,6 +30,9 @@ __all__ = (
     *stream_link_options.__all__,
     *functors.__all__,
     *scope.__all__,
+    *accelerators.__all__,
+    *profiler.__all__,
+    *deadline.__all__,
 )
 from thermosteam.utils import *
 from .patches import *
@@ -35,5 +41,8 @@ from .piping import *
 from .stream_link_options import *
 from .functors import *
 from .scope import *
+from .accelerators import *
+from .profiler import *
+from .deadline import *
 
 del utils
\ No newline at end of file
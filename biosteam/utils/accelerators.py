@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Conditional fixed-point accelerators for converging recycle loops. Solvers
+follow the flexsolve convention where f(x) = (g, not_converged) and
+iteration stops once not_converged is False.
+"""
+import numpy as np
+
+__all__ = ('conditional_anderson', 'conditional_broyden')
+
+def nonnegative_step(g, x):
+    """
+    Return the point furthest along the step from g (a non-negative
+    fixed-point iterate) to x that keeps all values non-negative and whether
+    the step was cut short.
+    """
+    negative = x < 0.
+    if negative.any():
+        g_negative = g[negative]
+        denominator = g_negative - x[negative]
+        denominator[denominator == 0] = 1.
+        t = (g_negative / denominator).min()
+        x = g + t * (x - g)
+        x[x < 0.] = 0.
+        return x, True
+    else:
+        return x, False
+
+def conditional_anderson(f, x, memory=5, damping=1., regularization=1e-12):
+    """
+    Conditional Anderson mixing solver.
+
+    Parameters
+    ----------
+    f : Callable(x) -> (g, not_converged)
+        Fixed-point function.
+    x : 1d array
+        Initial guess.
+    memory : int, optional
+        Number of previous iterations used for mixing. Defaults to 5.
+    damping : float, optional
+        Fraction of the fixed-point step taken at each iteration. Defaults to 1.
+    regularization : float, optional
+        Tikhonov regularization (relative to the largest residual difference)
+        for the least-squares mixing problem. Defaults to 1e-12.
+
+    Notes
+    -----
+    Steps that would result in negative values (e.g., molar flow rates) are
+    shortened toward the last fixed-point iterate and the mixing
+    history is restarted.
+
+    """
+    x = np.array(x, dtype=float)
+    g, not_converged = f(x)
+    if not not_converged: return g
+    r = g - x
+    dX = []
+    dR = []
+    while True:
+        if dR:
+            DR = np.array(dR).T
+            DX = np.array(dX).T
+            H = DR.T @ DR
+            H[np.diag_indices_from(H)] += regularization * H.diagonal().max()
+            try:
+                gamma = np.linalg.solve(H, DR.T @ r)
+            except np.linalg.LinAlgError:
+                gamma = np.linalg.lstsq(DR, r, rcond=None)[0]
+            x_new = x + damping * r - (DX + damping * DR) @ gamma
+        else:
+            x_new = x + damping * r
+        x_new, restart = nonnegative_step(g, x_new)
+        if restart:
+            dX.clear()
+            dR.clear()
+        g, not_converged = f(x_new)
+        if not not_converged: return g
+        r_new = g - x_new
+        if not restart:
+            dX.append(x_new - x)
+            dR.append(r_new - r)
+            if len(dR) > memory:
+                del dX[0], dR[0]
+        x = x_new
+        r = r_new
+
+def conditional_broyden(f, x, memory=10, damping=1.):
+    """
+    Conditional limited-memory Broyden solver (Broyden's first method on the
+    fixed-point residual g(x) - x, using an inverse Jacobian starting from
+    the fixed-point iteration).
+
+    Parameters
+    ----------
+    f : Callable(x) -> (g, not_converged)
+        Fixed-point function.
+    x : 1d array
+        Initial guess.
+    memory : int, optional
+        Maximum number of rank-one updates stored. The inverse Jacobian is
+        reset once the memory is full. Defaults to 10.
+    damping : float, optional
+        Fraction of the fixed-point step taken by the initial inverse
+        Jacobian. Defaults to 1.
+
+    Notes
+    -----
+    Steps that would result in negative values (e.g., molar flow rates) are
+    shortened toward the last fixed-point iterate and the inverse Jacobian
+    is reset.
+
+    """
+    x = np.array(x, dtype=float)
+    g, not_converged = f(x)
+    if not not_converged: return g
+    r = g - x
+    U = [] # Inverse Jacobian is H = -damping * I + sum(u * w.T)
+    W = []
+
+    def H_dot(v):
+        Hv = damping * v # Negative of H * v
+        for u, w in zip(U, W): Hv -= u * (w @ v)
+        return Hv
+
+    def HT_dot(v):
+        HTv = damping * v # Negative of H.T * v
+        for u, w in zip(U, W): HTv -= w * (u @ v)
+        return HTv
+
+    while True:
+        x_new, restart = nonnegative_step(g, x + H_dot(r))
+        if restart:
+            U.clear()
+            W.clear()
+        g, not_converged = f(x_new)
+        if not not_converged: return g
+        r_new = g - x_new
+        if not restart:
+            if len(U) == memory:
+                U.clear()
+                W.clear()
+            dx = x_new - x
+            dr = r_new - r
+            H_dr = -H_dot(dr)
+            HT_dx = -HT_dot(dx)
+            denominator = dx @ H_dr
+            if denominator:
+                U.append(dx - H_dr)
+                W.append(HT_dx / denominator)
+        x = x_new
+        r = r_new
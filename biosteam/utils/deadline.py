@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import time
+from typing import Optional
+from ..exceptions import EvaluationTimeout
+
+__all__ = ('Deadline', 'check_deadline')
+
+#: [float|None] Time (by time.perf_counter) after which cooperative checks raise.
+_deadline = None
+
+class Deadline:
+    """
+    Create a Deadline object that, as a context manager, limits the
+    wall-clock time of simulations within its context. Unit operations,
+    recycle loops, and equilibrium stage iterations cooperatively check the
+    deadline (see :func:`check_deadline`) and raise an
+    :class:`~biosteam.exceptions.EvaluationTimeout` once it passes.
+    Nested deadlines can only shorten (not extend) outer deadlines.
+
+    Parameters
+    ----------
+    seconds :
+        Time limit. If None, no time limit is added.
+
+    Examples
+    --------
+    >>> from biosteam.utils import Deadline, check_deadline
+    >>> from biosteam.exceptions import EvaluationTimeout
+    >>> with Deadline(0.):
+    ...     try: check_deadline()
+    ...     except EvaluationTimeout: print('timed out')
+    timed out
+
+    """
+    __slots__ = ('seconds', '_outer')
+
+    def __init__(self, seconds: Optional[float]):
+        self.seconds = seconds
+
+    def __enter__(self):
+        global _deadline
+        self._outer = outer = _deadline
+        seconds = self.seconds
+        if seconds is not None:
+            deadline = time.perf_counter() + seconds
+            if outer is None or deadline < outer: _deadline = deadline
+        return self
+
+    def __exit__(self, type, exception, traceback):
+        global _deadline
+        _deadline = self._outer
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.seconds})"
+
+
+def check_deadline():
+    """Raise an EvaluationTimeout if the current deadline passed."""
+    if _deadline is not None and time.perf_counter() > _deadline:
+        raise EvaluationTimeout('simulation exceeded time limit')
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+from time import perf_counter
+import pandas as pd
+
+__all__ = ('SimulationProfiler',)
+
+class ProfiledSpecification:
+    """Create a ProfiledSpecification object that times calls to a
+    specification and otherwise behaves like the specification."""
+    __slots__ = ('specification', 'profiler', 'frame')
+
+    def __init__(self, specification, profiler, frame):
+        self.specification = specification
+        self.profiler = profiler
+        self.frame = frame
+
+    def __getattr__(self, name):
+        return getattr(self.specification, name)
+
+    def __call__(self, *args, **kwargs):
+        profiler = self.profiler
+        profiler.start(self.frame)
+        try: return self.specification(*args, **kwargs)
+        finally: profiler.stop()
+
+
+class SimulationProfiler:
+    """
+    Create a SimulationProfiler object that records call counts and
+    cumulative and self times of unit operation methods (`_run`, `_design`,
+    `_cost`, and specifications), system convergence, and recycle
+    iterations by call stack.
+
+    Methods are only wrapped while the profiler is attached to a system, so
+    there is no overhead once detached.
+
+    Examples
+    --------
+    >>> # with system.profiling() as profiler: system.simulate()
+    >>> # profiler.table() # DataFrame of call counts and times
+    >>> # profiler.save('system.folded') # Collapsed stacks for flame graphs
+
+    """
+    __slots__ = ('records', '_stack', '_units', '_systems')
+
+    #: Names of unit operation methods that are profiled.
+    unit_methods = ('_run', '_design', '_cost')
+
+    def __init__(self):
+        #: [dict[tuple[tuple[str, str], ...], list[int, float, float]]] Call
+        #: count, cumulative time, and self time by call stack.
+        self.records = {}
+        self._stack = []
+        self._units = {}
+        self._systems = {}
+
+    def clear(self):
+        """Remove all records."""
+        self.records.clear()
+
+    def start(self, frame):
+        """Start timing a frame (an element ID and method name pair)."""
+        stack = self._stack
+        key = (*stack[-1][0], frame) if stack else (frame,)
+        stack.append([key, 0., perf_counter()])
+
+    def stop(self):
+        """Stop timing the last frame started."""
+        time = perf_counter()
+        key, children_time, start = self._stack.pop()
+        time -= start
+        records = self.records
+        if key in records:
+            record = records[key]
+            record[0] += 1
+            record[1] += time
+            record[2] += time - children_time
+        else:
+            records[key] = [1, time, time - children_time]
+        stack = self._stack
+        if stack: stack[-1][1] += time
+
+    def wrap(self, frame, f):
+        """Return a function that times calls to `f` under the given frame."""
+        def g(*args, **kwargs):
+            self.start(frame)
+            try: return f(*args, **kwargs)
+            finally: self.stop()
+        g.__name__ = f.__name__
+        g.__doc__ = f.__doc__
+        g._original = f
+        return g
+
+    def attach(self, system):
+        """Wrap methods of all unit operations and systems within the system."""
+        wrap = self.wrap
+        units = self._units
+        for u in system.units:
+            if u in units: continue
+            ID = u.ID
+            dct = u.__dict__
+            units[u] = (
+                {i: dct[i] for i in self.unit_methods if i in dct},
+                u._specifications
+            )
+            for i in self.unit_methods:
+                setattr(u, i, wrap((ID, i), getattr(u, i)))
+            if u._specifications:
+                u._specifications = [
+                    ProfiledSpecification(i, self, (ID, 'specification'))
+                    for i in u._specifications
+                ]
+        systems = self._systems
+        stack = [system]
+        while stack:
+            sys = stack.pop()
+            stack.extend(sys.subsystems)
+            if sys in systems: continue
+            systems[sys] = sys._specifications
+            sys._profiler = self
+            if sys._specifications:
+                sys._specifications = [
+                    ProfiledSpecification(i, self, (sys.ID, 'specification'))
+                    for i in sys._specifications
+                ]
+
+    def detach(self):
+        """Restore methods of all unit operations and systems."""
+        for u, (methods, specifications) in self._units.items():
+            for i in self.unit_methods:
+                if i in methods: setattr(u, i, methods[i])
+                else: delattr(u, i)
+            u._specifications = specifications
+        for sys, specifications in self._systems.items():
+            sys._profiler = None
+            sys._specifications = specifications
+        self._units.clear()
+        self._systems.clear()
+        self._stack.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, exception, traceback):
+        self.detach()
+
+    def table(self):
+        """Return a DataFrame of call counts and cumulative and self times
+        [ms] by element and method, sorted by self time."""
+        data = {}
+        for key, (calls, cumulative, self_time) in self.records.items():
+            frame = key[-1]
+            if frame in data:
+                row = data[frame]
+            else:
+                data[frame] = row = [0, 0., 0.]
+            row[0] += calls
+            if frame not in key[:-1]: row[1] += cumulative # Avoid double counting recursion
+            row[2] += self_time
+        df = pd.DataFrame(
+            [(calls, 1000. * cumulative, 1000. * self_time)
+             for calls, cumulative, self_time in data.values()],
+            index=pd.MultiIndex.from_arrays(
+                [[i for i, j in data], [j for i, j in data]],
+                names=('Element', 'Method')
+            ),
+            columns=('Calls', 'Cumulative time [ms]', 'Self time [ms]'),
+        )
+        return df.sort_values('Self time [ms]', ascending=False)
+
+    def collapsed_stacks(self):
+        """Return self times [us] by call stack in the collapsed stack
+        format of flame graph tools (e.g., "sys.converge;sys.iteration;F1._run 120")."""
+        return '\n'.join([
+            ';'.join([f"{ID}.{method}" for ID, method in key]) + f" {round(1e6 * record[2])}"
+            for key, record in self.records.items()
+        ])
+
+    def save(self, file):
+        """Save collapsed stacks to a text file loadable by flame graph tools."""
+        with open(file, 'w') as f: f.write(self.collapsed_stacks() + '\n')
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self.records)} call stacks>"
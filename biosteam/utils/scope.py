@@ -8,17 +8,92 @@
 
 """
 """
+import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from scipy.interpolate import InterpolatedUnivariateSpline as ius
 from warnings import warn
 
-__all__ = ('Scope', 'SystemScope')
+__all__ = ('Scope', 'SystemScope', 'Recorder')
+
+class Recorder:
+    """
+    A growable 2d array of records (rows) preallocated in blocks, optionally
+    stored on disk as a :class:`numpy.memmap`.
+
+    Parameters
+    ----------
+    N_columns : int
+        Number of values per record.
+    capacity : int, optional
+        Number of records initially allocated. The capacity is doubled 
+        whenever it is exceeded. Defaults to 1024.
+    file : str, optional
+        Name of file to memory-map records. If not given, records are 
+        stored in memory.
+
+    """
+    __slots__ = ('N_columns', 'capacity', 'file', 'size', '_data')
+    
+    def __init__(self, N_columns, capacity=None, file=None):
+        self.N_columns = N_columns
+        self.capacity = capacity = capacity or 1024
+        self.file = file
+        self.size = 0
+        self._data = self._allocate(capacity)
+    
+    def _allocate(self, capacity):
+        shape = (capacity, self.N_columns)
+        file = self.file
+        if file is None: return np.zeros(shape)
+        mode = 'r+' if os.path.exists(file) else 'w+'
+        if mode == 'r+':
+            with open(file, 'r+b') as f: f.truncate(8 * capacity * self.N_columns)
+        return np.memmap(file, dtype=float, mode=mode, shape=shape)
+    
+    def new_record(self):
+        """Return a view of a new record (row) to fill."""
+        size = self.size
+        if size == self.capacity:
+            data = self._data
+            self.capacity *= 2
+            if self.file is None:
+                self._data = self._allocate(self.capacity)
+                self._data[:size] = data
+            else:
+                data.flush()
+                del data
+                self._data = None # Release memory-map before resizing file
+                self._data = self._allocate(self.capacity)
+        self.size = size + 1
+        return self._data[size]
+    
+    def pop(self):
+        """Remove the last record."""
+        if self.size: self.size -= 1
+        
+    def clear(self):
+        """Remove all records (allocated space is kept)."""
+        self.size = 0
+    
+    @property
+    def data(self):
+        """[numpy.ndarray] View of all records."""
+        return self._data[:self.size]
+    
+    def __len__(self):
+        return self.size
+    
+    def __repr__(self):
+        return f'<{type(self).__name__}: {self.size} records of {self.N_columns} values>'
+
 
 class Scope():
     """
     A general tracker of attributes of a subject during dynamic simulations.
+    Time points and values are stored in a preallocated :class:`Recorder` 
+    (time in the first column).
 
     Parameters
     ----------
@@ -29,55 +104,78 @@ class Scope():
     header : list of 2-tuple or :class:`pandas.MultiIndex`, optional
         The header for the tracked time-series data. When none specified, will
         be auto-generated based on the defined variables to track.
+    capacity : int, optional
+        Number of time points initially allocated.
+    file : str, optional
+        Name of file to memory-map the tracked data. If not given, data is 
+        kept in memory.
 
     See Also
     --------
     `pandas.MultiIndex <https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.MultiIndex.html>`_
 
     """    
-    def __init__(self, subject, variables, header=None, **kwargs):
+    def __init__(self, subject, variables, header=None, capacity=None, file=None, **kwargs):
         self.subject = subject
-        self._ts = []
         self._header = header
-        rcd = {}
+        self.capacity = capacity
+        self.file = file
+        self._recorder = None
+        self._slices = None
+        self._variables = []
         for var in variables:
-            if hasattr(subject, var): rcd[var] = []
+            if hasattr(subject, var): self._variables.append(var)
             else: warn(f'Variable {var} ignored in {self.__repr__()} because '
                        f'{self.subject} has no attribute {var}.')
-        self._record = rcd
-        for k, v in kwargs:
+        for k, v in kwargs.items():
             setattr(self, k, v)
 
     def getter(self, variable):
         """A function to receive the attribute or variable of interest."""
-        return getattr(self.subject, variable).copy()
+        return getattr(self.subject, variable)
+    
+    def _load_recorder(self):
+        slices = {}
+        start = 1
+        for var in self._variables:
+            data = self.getter(var)
+            stop = start + (1 if np.ndim(data) == 0 else len(data))
+            slices[var] = slice(start, stop)
+            start = stop
+        self._slices = slices
+        self._recorder = Recorder(start, self.capacity, self.file)
         
     def __call__(self, t):
         """Tracks the variables at time t."""
-        self._ts.append(t)
-        for var, log in self._record.items():
-            log.append(self.getter(var))
+        if self._recorder is None: self._load_recorder()
+        record = self._recorder.new_record()
+        record[0] = t
+        getter = self.getter
+        for var, index in self._slices.items():
+            record[index] = getter(var)
     
     def reset_cache(self):
         """Clears all recorded data."""
-        self._ts = []
-        self._record = {var:[] for var in self._record.keys()}
+        recorder = self._recorder
+        if recorder is None: return
+        if recorder.file == self.file:
+            recorder.clear()
+        else:
+            self._recorder = None
     
     def __repr__(self):
         return f'<Scope: {self.subject.ID}>'
 
     def pop(self):
         """Removes the last tracked time point."""
-        self._ts.pop()
-        for log in self._record.values():
-            log.pop()
+        if self._recorder is not None: self._recorder.pop()
     
     def _n_cols(self, make_header=False):
         n = []
         isa = isinstance
         if make_header: 
             names = []
-            for var in self._record.keys():
+            for var in self._variables:
                 data = self.getter(var)
                 if isa(data, (float, int, str)): ni = 1
                 else: ni = len(data)
@@ -85,7 +183,7 @@ class Scope():
                 names += [f'{var}_{i}' for i in range(ni)]
             return n, names
         else:
-            for var in self._record.keys():
+            for var in self._variables:
                 data = self.getter(var)
                 if isa(data, (float, int, str)): n.append(1)
                 else: n.append(len(data))
@@ -103,7 +201,7 @@ class Scope():
         else:
             if len(hd) != sum(self._n_cols()):
                 raise ValueError(f'Header {hd} has the wrong size {len(hd)}, '
-                                 f'it should have length = {sum(self._n_cols)}')
+                                 f'it should have length = {sum(self._n_cols())}')
             if len(hd[0]) != 2:
                 raise ValueError(f'A list of 2-tuple or a 2-level pandas.MultiIndex '
                                  f'is expected but got an iterable of {len(hd[0])}-tuple')
@@ -111,27 +209,33 @@ class Scope():
     
     @property
     def record(self):
-        """[numpy.ndarray] The tracked time-series data of the variables of interest."""
-        data = np.hstack([np.array(v) if len(np.array(v).shape) == 2 \
-                          else np.array(v).reshape((len(v), 1))\
-                          for v in self._record.values()])
-        return data
+        """[numpy.ndarray] The tracked time-series data of the variables of 
+        interest (rows are time points)."""
+        recorder = self._recorder
+        if recorder is None: return np.zeros([0, sum(self._n_cols())])
+        return recorder.data[:, 1:].copy()
     
     @property
     def time_series(self):
         """[numpy.1darray] The tracked time points."""
-        return np.array(self._ts)
+        recorder = self._recorder
+        if recorder is None: return np.zeros(0)
+        return recorder.data[:, 0].copy()
     
     def plot_time_series(self, variable):
         """plot the time series data of a single variable of interest"""
         fig, ax = plt.subplots(figsize=(8, 4.5))
         t = self.time_series
-        ys = np.array(self._record[variable])
+        if self._recorder is None:
+            ys = np.zeros(0)
+        else:
+            ys = self._recorder.data[:, self._slices[variable]]
+            if ys.shape[1] == 1: ys = ys[:, 0]
         if len(ys.shape) == 1:
             ax.plot(t, ys, '-o')
         else:
             for i, y in enumerate(ys.T):
-                ax.plot(t, ys, '-o', label=f'#{i}')
+                ax.plot(t, y, '-o', label=f'#{i}')
             ax.legend(loc='best')
         ax.set(xlabel='Time [d]', ylabel=variable)
         return fig, ax
@@ -154,33 +258,71 @@ class SystemScope():
         an interpolant. Used to export the data at certain time points. 
         When none specified, will use :class:`scipy.interpolate.InterpolatedUnivariateSpline` 
         with k=1 (i.e., linear) and will raise error when trying to extrapolate.
+    every : int, optional
+        Only keep every n-th time point evaluated by the solver. Defaults to 1.
+    min_dt : float, optional
+        Minimum time step between kept time points. 
+    directory : str, optional
+        Directory to memory-map the tracked data of all subjects (one file 
+        per subject). If not given, data is kept in memory.
+        
+    Notes
+    -----
+    The last time point evaluated is always recorded (it is replaced by the 
+    next time point if it does not meet the decimation criteria), so 
+    data can be exported up to the end of the simulation.
         
     See Also
     --------
     `scipy.interpolate.InterpolatedUnivariateSpline <https://docs.scipy.org/doc/scipy/reference/generated/scipy.interpolate.InterpolatedUnivariateSpline.html>`_
     """
-    def __init__(self, system, *subjects, interpolator=None, **kwargs):
+    #: Number of time points written at a time when exporting.
+    chunksize = 10000
+    
+    def __init__(self, system, *subjects, interpolator=None, every=None,
+                 min_dt=None, directory=None, **kwargs):
         self.system = system
+        self.every = every or 1
+        self.min_dt = min_dt
+        self.directory = directory
         self.subjects = subjects
         self._method = interpolator or ius
-        self._ts = []
+        self._ts = Recorder(1)
+        self._n_calls = 0
+        self._tentative = False
         self.sol = None
         self.sol_header = system._state_header
-        for k,v in kwargs:
+        for k,v in kwargs.items():
             setattr(self, k, v)
     
     def __call__(self, t):
         ts = self._ts
-        while len(ts) > 0 and t <= ts[-1]:
+        subjects = self.subjects
+        if self._tentative:
             ts.pop()
-            for s in self.subjects: s.scope.pop()
-        ts.append(t)
-        for s in self.subjects:
+            for s in subjects: s.scope.pop()
+        data = ts.data
+        while ts.size and t <= data[ts.size - 1, 0]:
+            ts.pop()
+            for s in subjects: s.scope.pop()
+        self._n_calls += 1
+        size = ts.size
+        if size: # Initial time point is always kept
+            min_dt = self.min_dt
+            keep = not self._n_calls % self.every
+            if keep and min_dt: keep = t - data[size - 1, 0] >= min_dt
+        else:
+            keep = True
+        self._tentative = not keep
+        ts.new_record()[0] = t
+        for s in subjects:
             s.scope(t)
     
     def reset_cache(self):
         '''Clears all recorded data.'''
-        self._ts = []
+        self._ts.clear()
+        self._n_calls = 0
+        self._tentative = False
         self.sol = None
         for s in self.subjects:
             s.scope.reset_cache()
@@ -201,6 +343,13 @@ class SystemScope():
                 except: raise AttributeError(f"{s} has no attribute 'scope'")
             elif not isinstance(s.scope, Scope):
                 raise TypeError(f'{s}.scope must be a {Scope} object')
+        directory = self.directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            for s in sjs: 
+                scope = s.scope
+                scope.file = os.path.join(directory, f'{scope.subject.ID}.dat')
+                scope.reset_cache()
         self._subjects = sjs
 
     @property
@@ -223,13 +372,22 @@ class SystemScope():
     @property
     def time_series(self):
         """[numpy.1darray] The tracked time points."""
-        return np.array(self._ts)
+        return self._ts.data[:, 0].copy()
     
     def _get_records(self):
         data = [s.scope.record for s in self.subjects]
         # each row is one "variable", each column corresponds to one time point
         return np.hstack(data).T
     
+    def _iter_chunks(self):
+        # Time points and records of all subjects in blocks of rows
+        ts = self._ts.data
+        records = [s.scope.record for s in self.subjects]
+        chunksize = self.chunksize
+        for start in range(0, len(ts), chunksize):
+            stop = start + chunksize
+            yield start, np.hstack([ts[start:stop], *[i[start:stop] for i in records]])
+    
     def _get_headers(self):
         headers = [('-', 't [d]')]
         isa = isinstance
@@ -242,25 +400,61 @@ class SystemScope():
 
     def _interpolate_eval(self, t_arr, y_arrs, t_eval, **interpolation_kwargs):
         f = self._method
-        y_eval = np.empty((y_arrs.shape[0], len(t_eval)))
+        y_eval = np.empty((len(y_arrs), len(t_eval)))
         if f is ius and 'k' not in interpolation_kwargs.keys(): 
             interpolation_kwargs['k'] = 1
+        if max(t_eval) > max(t_arr):
+            raise RuntimeError(f'Extrapolation is tempted! t_eval must be '
+                               f'within the range of [{min(t_arr)}, {max(t_arr)}].')
         for i, y in enumerate(y_arrs):            
             intpl = f(t_arr, y, **interpolation_kwargs)
-            if max(t_eval) > max(t_arr):
-                raise RuntimeError(f'Extrapolation is tempted! t_eval must be '
-                                   f'within the range of [{min(t_arr)}, {max(t_arr)}].')
             y_eval[i,:] = intpl(t_eval)
         return np.vstack([t_eval, y_eval])
     
     def export(self, path='', t_eval=None, **interpolation_kwargs):
-        """Exports recorded time-series data to given path."""
+        """
+        Exports recorded time-series data to given path (or return a 
+        DataFrame if no path is given). 
+        
+        Recorded data is written in blocks of rows to ".npy", ".csv", and 
+        ".tsv" files without loading all data into memory at once. Excel
+        files and interpolated data (at `t_eval`) are built in memory.
+        
+        """
         ts = self.time_series
-        ys = self._get_records()
         if t_eval is None:
-            data = np.vstack([ts, ys])
+            if path:
+                file, ext = path.rsplit('.', 1)
+                if ext == 'npy':
+                    N_rows = len(ts)
+                    N_columns = len(self._get_headers())
+                    arr = np.lib.format.open_memmap(
+                        path, mode='w+', shape=(N_rows, N_columns)
+                    )
+                    for start, chunk in self._iter_chunks():
+                        arr[start:start + len(chunk)] = chunk
+                    arr.flush()
+                    del arr
+                    return
+                elif ext in ('csv', 'tsv'):
+                    columns = self._get_headers()
+                    sep = ',' if ext == 'csv' else '\t'
+                    first = True
+                    with open(path, 'w', newline='') as f:
+                        for start, chunk in self._iter_chunks():
+                            df = pd.DataFrame(
+                                chunk, columns=columns, 
+                                index=range(start, start + len(chunk))
+                            )
+                            df.to_csv(f, sep=sep, header=first)
+                            first = False
+                        if first: pd.DataFrame(columns=columns).to_csv(f, sep=sep)
+                    return
+            data = np.vstack([ts, self._get_records()])
         else:
-            data = self._interpolate_eval(ts, ys, t_eval, **interpolation_kwargs)
+            # Interpolate one variable at a time (records may be memory-mapped)
+            y_arrs = [y for s in self.subjects for y in s.scope.record.T]
+            data = self._interpolate_eval(ts, y_arrs, t_eval, **interpolation_kwargs)
         df = pd.DataFrame(data.T, columns=self._get_headers())
         if path:
             file, ext = path.rsplit('.', 1)
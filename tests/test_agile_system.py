@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import biosteam as bst
+import numpy as np
+from numpy.testing import assert_allclose
+
+def create_agile_system():
+    bst.main_flowsheet.clear()
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream('feed', Water=800, Ethanol=200, T=300, price=0.1)
+    H1 = bst.HXutility('H1', feed, T=360)
+    F1 = bst.Flash('F1', H1-0, outs=('vapor', 'liquid'), V=0.5, P=101325)
+    sys = bst.System('sys', path=[H1, F1])
+    agile = bst.AgileSystem()
+    calls = []
+
+    @agile.operation_parameter
+    def flow_rate(flow_rate):
+        calls.append(flow_rate)
+        feed.F_mass = flow_rate
+
+    agile.operation_mode(sys, operating_hours=5000, flow_rate=1000)
+    agile.operation_mode(sys, operating_hours=3000, flow_rate=2000)
+
+    @agile.operation_metric(annualize=True)
+    def vapor_flow(mode):
+        return F1.outs[0].F_mass
+
+    return agile, calls, vapor_flow
+
+def get_results(agile, vapor_flow):
+    return [
+        agile.utility_cost, agile.purchase_cost, agile.installed_equipment_cost,
+        agile.get_heating_duty(), agile.get_cooling_duty(), vapor_flow(),
+        agile.flow_rates[bst.main_flowsheet.stream.vapor],
+    ]
+
+def test_agile_system_modes():
+    agile, calls, vapor_flow = create_agile_system()
+    agile.simulate()
+    actual = get_results(agile, vapor_flow)
+    assert calls == [1000, 2000]
+
+    # Results are not scaled twice
+    agile.simulate()
+    assert_allclose(get_results(agile, vapor_flow), actual)
+
+    # Operation modes in worker processes
+    agile.simulate(workers=2)
+    assert_allclose(get_results(agile, vapor_flow), actual)
+    
+    # Workers are kept alive between simulations
+    processes = list(agile._pool.processes.values())
+    agile.simulate(workers=2)
+    assert_allclose(get_results(agile, vapor_flow), actual)
+    assert list(agile._pool.processes.values()) == processes
+    agile.close()
+    assert agile._pool is None
+    assert not any([i.is_alive() for i in processes])
+
+    # Results of unchanged operation modes are reused
+    agile.cache_results = True
+    agile.simulate()
+    calls.clear()
+    agile.simulate()
+    assert not calls
+    assert_allclose(get_results(agile, vapor_flow), actual)
+    agile.operation_modes[1].flow_rate = 1500
+    agile.simulate()
+    assert calls == [1500]
+    agile.reset_cache()
+    calls.clear()
+    agile.simulate()
+    assert calls == [1000, 1500]
+    
+    # Array parameters changed in place are detected
+    agile.operation_modes[1].flow_rate = np.array([1500.])
+    agile.simulate()
+    calls.clear()
+    agile.operation_modes[1].flow_rate[0] = 1200
+    agile.simulate()
+    assert calls == [1200]
+
+if __name__ == '__main__':
+    test_agile_system_modes()
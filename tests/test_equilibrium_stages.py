@@ -64,6 +64,20 @@ def test_multi_stage_adiabatic_vle():
         atol=1,
         rtol=0.01,
     )
+
+def test_multi_stage_deadline():
+    bst.settings.set_thermo(['AceticAcid', 'EthylAcetate', 'Water', 'MTBE'], cache=True)
+    feed = bst.Stream('feed', Water=75, AceticAcid=5, MTBE=20, T=320)
+    steam = bst.Stream('steam', Water=100, phase='g', T=390)
+    MSE = bst.MultiStageEquilibrium(N_stages=5, ins=[feed, steam], feed_stages=[0, -1],
+        outs=['vapor', 'liquid'],
+        phases=('g', 'l'),
+    )
+    # Timeouts must not be swallowed by the fallback of failed solvers
+    with bst.Deadline(0.):
+        with pytest.raises(bst.exceptions.EvaluationTimeout): MSE.simulate()
+    MSE.simulate()
+    assert MSE.outs[0].F_mol > 0
     
 def test_multi_stage_adiabatic_vle_non_condensables():
     import biosteam as bst
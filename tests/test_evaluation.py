@@ -339,6 +339,601 @@ def test_kolmogorov_smirnov_d():
     D, p = model.kolmogorov_smirnov_d(thresholds=[1, 1.5]) # Just make sure it works for now
     # TODO: Add tests that make sense for comparing statistics
     
+def create_parallel_evaluation_model():
+    import biosteam as bst
+    from chaospy.distributions import Uniform
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream(Water=100, Ethanol=10)
+    H1 = bst.HXutility(ins=feed, T=350)
+    sys = bst.System(None, [H1])
+    model = bst.Model(sys, exception_hook='ignore')
+    
+    @model.parameter(distribution=Uniform(50, 150), units='kmol/hr')
+    def set_water_flow(water_flow):
+        if water_flow > 140: raise RuntimeError('water flow rate too high')
+        feed.imol['Water'] = water_flow
+    
+    @model.parameter(distribution=Uniform(320, 360), units='K')
+    def set_outlet_temperature(T):
+        H1.T = T
+    
+    @model.indicator(units='kW')
+    def duty():
+        return H1.net_duty
+    
+    return model
+
+def test_model_evaluation_in_parallel():
+    import biosteam as bst
+    model = create_parallel_evaluation_model()
+    np.random.seed(0)
+    samples = model.sample(30, 'L')
+    model.load_samples(samples, sort=True)
+    model.evaluate()
+    serial = model.table.copy()
+    failed = samples[:, 0] > 140
+    assert failed.any()
+    assert np.isnan(serial.values[failed, 2]).all()
+    assert not np.isnan(serial.values[~failed, 2]).any()
+    for factory in (None, create_parallel_evaluation_model):
+        model.load_samples(samples, sort=True)
+        model.evaluate(workers=2, factory=factory, chunksize=4)
+        assert_allclose(model.table.values, serial.values, rtol=1e-6)
+    model.exception_hook = 'raise'
+    model.load_samples(samples, sort=True)
+    with pytest.raises(RuntimeError):
+        model.evaluate(workers=2)
+    with pytest.raises(ValueError):
+        model.evaluate(workers=2, convergence_model=bst.ConvergenceModel(
+            predictors=model.parameters, system=model.system
+        ))
+
+def test_reset_after_failed_evaluation():
+    model = create_parallel_evaluation_model()
+    feed, = model.system.feeds
+    samples = np.array([[100, 340], [145, 340], [100, 350]])
+    model.load_samples(samples, sort=False)
+    model.evaluate()
+    feed.imol['Ethanol'] = 50 # Changed outside of the parameters
+    model.evaluate()
+    values = model.table.values[:, 2]
+    assert np.isnan(values[1])
+    assert_allclose(feed.imol['Ethanol'], 50) # Feeds are not rolled back
+    model([100, 350])
+    assert_allclose(values[2], model.system.units[0].net_duty)
+
+def test_incremental_evaluation():
+    import biosteam as bst
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream(Water=800, Ethanol=200)
+    H1 = bst.HXutility(ins=feed, T=350)
+    F1 = bst.Flash(ins=H1-0, P=101325, V=0.5)
+    H2 = bst.HXutility(ins=F1-0, T=320)
+    sys = bst.System(None, [H1, F1, H2])
+    model = bst.Model(sys)
+    
+    @model.parameter(element=H1, bounds=(340, 360), units='K')
+    def set_inlet_temperature(T):
+        H1.T = T
+    
+    @model.parameter(element=F1, bounds=(0.2, 0.8))
+    def set_vapor_fraction(V):
+        F1.V = V
+    
+    @model.indicator(units='kmol/hr')
+    def distillate_flow():
+        return H2.outs[0].F_mol
+    
+    @model.indicator(units='kW')
+    def condenser_duty():
+        return H2.net_duty
+    
+    @model.indicator(units='USD')
+    def flash_cost():
+        return F1.installed_cost
+    
+    samples = np.array([
+        [350, 0.2], [350, 0.4], [345, 0.4], [345, 0.6], [355, 0.8]
+    ])
+    model.load_samples(samples)
+    model.evaluate()
+    full = model.table.values.copy()
+    model.incremental = True
+    model.load_samples(samples)
+    model.evaluate()
+    assert_allclose(model.table.values, full, rtol=1e-6)
+    
+    # Upstream units are not simulated if their parameters did not change
+    calls = []
+    run = H1._run
+    def count_run():
+        calls.append(H1.T)
+        run()
+    H1._run = count_run
+    model.load_samples(samples)
+    model.evaluate()
+    incremental_calls = calls.copy()
+    calls.clear()
+    model.incremental = False
+    model.load_samples(samples)
+    model.evaluate()
+    full_calls = calls.copy()
+    del H1._run
+    assert len(full_calls) == len(samples)
+    assert len(incremental_calls) == len(set(incremental_calls)) == 3
+
+def test_incremental_recycle_evaluation():
+    import biosteam as bst
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream(Water=800, Ethanol=200)
+    recycle = bst.Stream()
+    H0 = bst.HXutility(ins=feed, T=330)
+    M1 = bst.Mixer(ins=[H0-0, recycle])
+    F1 = bst.Flash(ins=M1-0, P=101325, V=0.5)
+    S1 = bst.Splitter(ins=F1-1, outs=[recycle, ''], split=0.5)
+    loop = bst.System(None, [M1, F1, S1], recycle=recycle)
+    loop.set_tolerance(mol=1e-6, rmol=1e-6, maxiter=200)
+    for sys in (bst.System(None, [H0, loop]), loop):
+        model = bst.Model(sys)
+        
+        @model.parameter(element=F1, bounds=(0.2, 0.8))
+        def set_vapor_fraction(V):
+            F1.V = V
+        
+        @model.parameter(element=S1, bounds=(0.2, 0.8))
+        def set_recycle_split(split):
+            S1.split[:] = split
+        
+        @model.indicator(units='kmol/hr')
+        def bottoms_flow():
+            return S1.outs[1].F_mol
+        
+        @model.indicator(units='kmol/hr')
+        def recycle_ethanol():
+            return recycle.imol['Ethanol']
+        
+        @model.indicator(units='USD')
+        def flash_cost():
+            return F1.installed_cost
+        
+        samples = np.array([
+            [0.5, 0.5], [0.4, 0.5], [0.4, 0.7], [0.6, 0.3], [0.6, 0.6]
+        ])
+        model.load_samples(samples, sort=False)
+        model.evaluate()
+        full = model.table.values.copy()
+        model.incremental = True
+        calls = []
+        run = H0._run
+        H0._run = lambda: calls.append(1) or run()
+        simulate = bst.System.simulate
+        bst.System.simulate = lambda self, **kwargs: calls.append(0) or simulate(self, **kwargs)
+        try:
+            model.load_samples(samples, sort=False)
+            model.evaluate()
+        finally:
+            bst.System.simulate = simulate
+        del H0._run
+        assert_allclose(model.table.values, full, rtol=1e-4)
+        # Only the recycle loop with the changed unit operations is 
+        # reconverged (without simulating the whole system)
+        assert not calls
+    
+def test_sample_order():
+    from biosteam.evaluation.evaluation_tools import get_sample_order
+    np.random.seed(0)
+    points = np.random.rand(500, 3)
+    
+    def path_length(index):
+        return np.abs(np.diff(points[index], axis=0)).sum()
+    
+    orders = {i: get_sample_order(points, algorithm=i)
+              for i in ('nearest neighbor', 'kd-tree', 'hilbert', 'morton')}
+    for index in orders.values(): 
+        assert sorted(index) == list(range(500))
+    
+    # Both greedy walks find the same path (barring ties)
+    assert_allclose(path_length(orders['kd-tree']), path_length(orders['nearest neighbor']))
+    
+    # Space-filling curves are much shorter than a random walk
+    random_length = path_length(np.arange(500))
+    assert path_length(orders['hilbert']) < 0.5 * random_length
+    assert path_length(orders['morton']) < 0.5 * random_length
+    with pytest.raises(ValueError):
+        get_sample_order(points, algorithm='kd-tree', distance='cosine')
+    with pytest.raises(ValueError):
+        get_sample_order(points, algorithm='shortest path')
+    
+    # Duplicate points are visited once each
+    points = np.array([[1.], [1.], [0.], [0.], [0.], [0.], [0.]])
+    for algorithm in ('nearest neighbor', 'kd-tree'):
+        index = get_sample_order(points, algorithm=algorithm)
+        assert sorted(index) == list(range(7))
+
+def test_result_store():
+    import biosteam as bst
+    from tempfile import TemporaryDirectory
+    from biosteam.evaluation._utils import var_indices
+    model = create_parallel_evaluation_model()
+    np.random.seed(0)
+    samples = model.sample(20, 'L')
+    model.load_samples(samples)
+    model.evaluate()
+    full = model.table.values.copy()
+    indicators = var_indices(model.indicators)
+    with TemporaryDirectory() as directory:
+        model.evaluate(store=directory)
+        assert_allclose(model.table.values, full, rtol=1e-6)
+        with bst.ResultStore(directory) as store:
+            assert len(store) == 20
+            assert_allclose(store.to_frame().values, full[:, 2:], rtol=1e-6)
+        
+        # Interrupted evaluation (including a partially written entry) 
+        # resumes from the last saved sample
+        evaluated = model._index[:8]
+        remaining = model._index[8:]
+        for workers in (None, 2):
+            store = bst.ResultStore(directory, model._samples, indicators, resume=False)
+            for i in evaluated: store.append(i, [-1.])
+            with bst.ResultStore(directory) as saved: 
+                assert not len(saved) # Only flushed samples are logged
+            store.flush()
+            store._log.write(b'\x00\x01')
+            store.close()
+            model.evaluate(store=directory, autoload=True, workers=workers)
+            values = model.table.values
+            assert (values[evaluated, 2] == -1.).all()
+            assert_allclose(values[remaining], full[remaining], rtol=1e-6)
+            with bst.ResultStore(directory) as store: assert len(store) == 20
+        
+        # Results are not resumed for different samples
+        model.load_samples(samples[::-1])
+        model.evaluate(store=directory, autoload=True)
+        assert not (model.table.values[:, 2] == -1.).any()
+
+def test_sensitivity_indices():
+    import biosteam as bst
+    from chaospy.distributions import Uniform
+    bst.settings.set_thermo(['Water'], cache=True)
+    feed = bst.Stream(Water=100)
+    H1 = bst.HXutility(ins=feed, T=350)
+    sys = bst.System(None, [H1])
+    model = bst.Model(sys)
+    x = np.zeros(3)
+    for i in range(3):
+        @model.parameter(name=f'x{i}', distribution=Uniform(-np.pi, np.pi))
+        def f(value, i=i): x[i] = value
+    
+    @model.indicator
+    def ishigami():
+        return np.sin(x[0]) + 7 * np.sin(x[1]) ** 2 + 0.1 * x[2] ** 4 * np.sin(x[0])
+    
+    @model.indicator
+    def linear():
+        return 2 * x[0] + x[1]
+    
+    results = model.sobol(1024, seed=0)
+    S1 = results['S1'].values[:, 0]
+    ST = results['ST'].values[:, 0]
+    assert_allclose(S1, [0.314, 0.442, 0.], atol=0.05)
+    assert_allclose(ST, [0.558, 0.442, 0.244], atol=0.05)
+    assert (results['ST_conf'].values[:, 0] > 0).all()
+    assert_allclose(results['S1'].values[:, 1], [0.8, 0.2, 0.], atol=0.05)
+    
+    results = model.morris(20, seed=0)
+    scale = 2 * np.pi # Effects are with respect to normalized parameters
+    assert_allclose(results['mu'].values[:, 1], [2 * scale, scale, 0.], atol=1e-9)
+    assert_allclose(results['sigma'].values[:, 1], 0., atol=1e-9)
+    mu_star = results['mu_star'].values[:, 0]
+    assert (mu_star >= np.abs(results['mu'].values[:, 0])).all()
+    assert mu_star[1] > mu_star[2]
+    
+    # Designs are mapped through the distributions of parameters
+    from chaospy.distributions import Triangle
+    model = bst.Model(sys)
+    y = np.zeros(2)
+    @model.parameter(name='y0', distribution=Triangle(0, 0, 1))
+    def f(value): y[0] = value
+    
+    @model.parameter(name='y1', distribution=Uniform(0, 1))
+    def f(value): y[1] = value
+    
+    @model.indicator
+    def total():
+        return y.sum()
+    
+    model.sobol(1024, seed=0)
+    samples = model.table.values[:, :2]
+    assert_allclose(samples.mean(axis=0), [1 / 3, 1 / 2], atol=0.01)
+    results = model.morris(20, seed=0)
+    samples = model.table.values[:, :2]
+    assert_allclose(np.unique(samples[:, 0]), [0., 1 - np.sqrt(2 / 3), 1 - np.sqrt(1 / 3), 1.])
+    mu = results['mu'].values[:, 0] # With respect to quantiles (steps of 2/3)
+    assert 1.5 * (1 - np.sqrt(1 / 3)) < mu[0] < 1.5 * np.sqrt(2 / 3)
+    assert_allclose(mu[1], 1, atol=1e-9)
+
+def test_surrogate():
+    import biosteam as bst
+    from chaospy.distributions import Uniform
+    bst.settings.set_thermo(['Water'], cache=True)
+    feed = bst.Stream(Water=100)
+    H1 = bst.HXutility(ins=feed, T=350)
+    sys = bst.System(None, [H1])
+    model = bst.Model(sys)
+    x = np.zeros(2)
+    
+    @model.parameter(distribution=Uniform(0, 1))
+    def set_x0(x0): x[0] = x0
+    
+    @model.parameter(distribution=Uniform(0, 1))
+    def set_x1(x1): x[1] = x1
+    
+    @model.indicator
+    def quadratic():
+        return 1 + x[0] - 2 * x[0] * x[1] + x[1] ** 2
+    
+    @model.indicator
+    def wave():
+        return np.sin(3 * x[0]) + x[1]
+    
+    def exact(samples):
+        x0, x1 = samples.transpose()
+        return np.column_stack([1 + x0 - 2 * x0 * x1 + x1 ** 2, np.sin(3 * x0) + x1])
+    
+    np.random.seed(0)
+    initial_samples = model.sample(40, 'L')
+    model.load_samples(initial_samples)
+    model.evaluate()
+    samples = model.sample(1000, 'R')
+    surrogate = model.fit_surrogate('polynomial chaos', indicators=[quadratic], seed=0)
+    assert surrogate is model.surrogate
+    assert surrogate.cross_validation['R2'].iloc[0] > 0.999
+    assert_allclose(model.surrogate(samples)[:, 0], exact(samples)[:, 0], atol=1e-9)
+    surrogate = model.fit_surrogate(seed=0)
+    assert (surrogate.cross_validation['R2'] > 0.99).all()
+    assert_allclose(model.surrogate(samples), exact(samples), atol=0.05)
+    
+    # New samples are simulated where the surrogate is most uncertain
+    surrogate = model.active_learning(10, batch_size=5, seed=0)
+    assert model.table.shape[0] == 50
+    assert_allclose(model.table.values[:, 2:], exact(model.table.values[:, :2]), atol=1e-9)
+    values, std = surrogate(samples, std=True)
+    assert_allclose(values, exact(samples), atol=0.05)
+    assert (std >= 0).all()
+    new_samples = model.table.values[40:, :2]
+    for batch in (new_samples[:5], new_samples[5:]):
+        distances = np.sqrt(((batch[:, None] - batch[None]) ** 2).sum(axis=-1))
+        assert distances[np.triu_indices(5, 1)].min() > 0.05 # Batches are spread out
+    
+    # Candidates are sampled with the given seed
+    model.load_samples(initial_samples)
+    model.evaluate()
+    model.active_learning(10, batch_size=5, seed=0)
+    assert_allclose(model.table.values[40:, :2], new_samples)
+
+def test_fast_uncoupled_evaluation():
+    import biosteam as bst
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream(Water=800, Ethanol=200)
+    H1 = bst.HXutility(ins=feed, T=350)
+    F1 = bst.Flash(ins=H1-0, P=101325, V=0.5)
+    sys = bst.System(None, [H1, F1])
+    model = bst.Model(sys)
+    runs = []
+    run = F1._run
+    F1._run = lambda: runs.append(1) or run()
+    
+    @model.parameter(element=H1, bounds=(340, 360), units='K', coupled=True)
+    def set_inlet_temperature(T):
+        H1.T = T
+    
+    @model.parameter(element=feed, bounds=(0.1, 0.5), units='USD/kg')
+    def set_feed_price(price):
+        feed.price = price
+    
+    @model.indicator(units='USD/hr')
+    def feed_cost():
+        return feed.cost
+    
+    @model.indicator(units='kmol/hr')
+    def vapor_flow():
+        return F1.outs[0].F_mol
+    
+    samples = np.array([(T, price) for T in (340, 350, 360) for price in (0.1, 0.2, 0.3, 0.5)])
+    np.random.seed(0)
+    np.random.shuffle(samples)
+    samples = samples[np.argsort(samples[:, 0], kind='stable')] # Blocks with the same temperature
+    model.load_samples(samples, sort=False)
+    model.evaluate()
+    full = model.table.values.copy()
+    assert len(runs) >= 12
+    runs.clear()
+    model.fast_uncoupled = True
+    model.load_samples(samples, sort=False)
+    model.evaluate()
+    assert_allclose(model.table.values, full, rtol=1e-6)
+    assert len(runs) == 3 # Once for each block of samples with the same temperature
+    
+    # Parameters without a unit operation (e.g., utility prices) reevaluate
+    # the costs of all unit operations without simulating
+    steam = bst.HeatUtility.get_heating_agent('low_pressure_steam')
+    
+    @model.parameter(bounds=(0.5, 1.5), units='USD/kJ')
+    def set_steam_price(price):
+        steam.heat_transfer_price = price * 1e-6
+    
+    @model.indicator(units='USD/hr')
+    def utility_cost():
+        return H1.utility_cost
+    
+    steam_price = steam.heat_transfer_price
+    samples = np.array([(350, 0.2, price) for price in (0.5, 1., 1.5)])
+    try:
+        model.fast_uncoupled = False
+        model.load_samples(samples, sort=False)
+        model.evaluate()
+        full = model.table.values.copy()
+        runs.clear()
+        model.fast_uncoupled = True
+        model.load_samples(samples, sort=False)
+        model.evaluate()
+    finally:
+        steam.heat_transfer_price = steam_price
+    assert_allclose(model.table.values, full, rtol=1e-6)
+    assert len(runs) == 0
+    assert len(set(full[:, -1])) == 3 # Utility costs changed with the steam price
+
+def test_stopping_rule():
+    import biosteam as bst
+    model = create_parallel_evaluation_model()
+    duty, = model.indicators
+    np.random.seed(0)
+    samples = model.sample(600, 'L')
+    model.load_samples(samples)
+    model.evaluate()
+    full = model.table.values[:, 2]
+    rule = bst.StoppingRule({duty: ['mean', 'p50']}, rtol=0.05, batch_size=10, min_batches=3, seed=0)
+    model.load_samples(samples)
+    model.evaluate(stop_when=rule)
+    assert rule.stopped
+    assert rule.N_evaluated < 600
+    evaluated = np.concatenate(rule.batches[:rule.N_evaluated // 10])
+    values = model.table.values[:, 2]
+    assert_allclose(values[evaluated], full[evaluated], rtol=1e-6)
+    not_evaluated = np.ones(600, dtype=bool)
+    not_evaluated[evaluated] = False
+    assert np.isnan(values[not_evaluated]).all()
+    mean, half_width = rule.results.loc[(*duty.index, 'mean'), ['Estimate', 'Half-width']]
+    assert half_width <= 0.05 * abs(mean)
+    assert_allclose(mean, np.nanmean(full), rtol=0.05)
+    median, half_width = rule.results.loc[(*duty.index, 'p50'), ['Estimate', 'Half-width']]
+    assert half_width <= 0.05 * abs(median)
+    assert_allclose(median, np.nanmedian(full), rtol=0.05)
+    
+    # Batches are fed to the same worker processes
+    model.load_samples(samples)
+    model.evaluate(stop_when=rule, workers=2)
+    assert_allclose(model.table.values[:, 2], values, rtol=1e-6)
+    with pytest.raises(ValueError):
+        bst.StoppingRule({duty: 'mode'})
+
+def test_evaluation_timeout():
+    import biosteam as bst
+    import time
+    bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    feed = bst.Stream(Water=800, Ethanol=200)
+    H1 = bst.HXutility(ins=feed, T=350)
+    F1 = bst.Flash(ins=H1-0, P=101325, V=0.5)
+    sys = bst.System(None, [H1, F1])
+    model = bst.Model(sys, exception_hook='ignore')
+    run = H1._run
+    H1._run = lambda: (H1.T > 355 and time.sleep(0.5)) or run()
+    
+    @model.parameter(element=H1, bounds=(340, 360), units='K', coupled=True)
+    def set_inlet_temperature(T):
+        H1.T = T
+    
+    @model.indicator(units='kmol/hr')
+    def vapor_flow():
+        return F1.outs[0].F_mol
+    
+    samples = np.array([[340], [360], [345], [358], [350]])
+    model.load_samples(samples, sort=False)
+    model.evaluate()
+    full = model.table.values.copy()
+    assert model.timed_out == []
+    model.timeout = 0.1
+    model.load_samples(samples, sort=False)
+    model.evaluate()
+    assert model.timed_out == [1, 3]
+    values = model.table.values
+    assert np.isnan(values[[1, 3], 1]).all()
+    assert_allclose(values[[0, 2, 4]], full[[0, 2, 4]], rtol=1e-6)
+    with bst.Deadline(1.):
+        with bst.Deadline(0.):
+            with pytest.raises(bst.exceptions.EvaluationTimeout): bst.check_deadline()
+        bst.check_deadline()
+
+def test_evaluate_across_coordinate():
+    import biosteam as bst
+    import os
+    from tempfile import TemporaryDirectory
+    model = create_parallel_evaluation_model()
+    feed = model.system.units[0].ins[0]
+    
+    def set_ethanol_flow(ethanol_flow):
+        feed.imol['Ethanol'] = ethanol_flow
+    
+    np.random.seed(0)
+    samples = model.sample(10, 'L')
+    model.load_samples(samples, sort=True)
+    coordinate = [20, 5, 15, 10]
+    kwargs = dict(notify_coordinate=False)
+    expected = model.evaluate_across_coordinate(
+        'Ethanol', set_ethanol_flow, coordinate, sort=False, **kwargs
+    )
+    duty, = expected
+    assert not np.isnan(expected[duty]).all()
+    for options in ({}, {'workers': 2}):
+        data = model.evaluate_across_coordinate(
+            'Ethanol', set_ethanol_flow, coordinate, **options, **kwargs
+        )
+        assert_allclose(data[duty], expected[duty], rtol=1e-6)
+    with TemporaryDirectory() as directory:
+        data = model.evaluate_across_coordinate(
+            'Ethanol', set_ethanol_flow, coordinate, directory=directory, **kwargs
+        )
+        assert_allclose(data[duty], expected[duty], rtol=1e-6)
+        with bst.ResultStore(os.path.join(directory, 'coordinate_0')) as store:
+            assert len(store) == 10
+            assert_allclose(store[duty], expected[duty][:, 0], rtol=1e-6)
+        # Saved points are loaded instead of evaluated again
+        data = model.evaluate_across_coordinate(
+            'Ethanol', lambda x: None, coordinate, directory=directory, **kwargs
+        )
+        assert_allclose(data[duty], expected[duty], rtol=1e-6)
+    with pytest.raises(ValueError):
+        model.evaluate_across_coordinate(
+            'Ethanol', set_ethanol_flow, coordinate, workers=2, 
+            f_evaluate=model.evaluate, **kwargs
+        )
+
+def test_generate_contour_data():
+    import biosteam as bst
+    import os
+    from tempfile import TemporaryDirectory
+    calls = []
+    
+    def z_at_xy(x, y):
+        calls.append((x, y))
+        return np.array([np.tanh(10 * (x - 0.5)), x + y])
+    
+    X, Y, Z = bst.plots.generate_contour_data(z_at_xy, (0, 1), (0, 1), n=5, smooth=False)
+    assert len(calls) == 25
+    assert calls[4:6] == [(1., 0.), (1., 0.25)] # Serpentine order
+    assert_allclose(Z[..., 0], np.tanh(10 * (X - 0.5)))
+    assert_allclose(Z[..., 1], X + Y)
+    calls.clear()
+    X, Y, Z = bst.plots.generate_contour_data(
+        z_at_xy, (0, 1), (0, 1), n=5, smooth=True, refine=2, max_step=0.2
+    )
+    assert X.shape == (5, 9) # Only refined near the steep gradient in x
+    assert len(calls) == len(set(calls)) == X.size
+    assert_allclose(Z[..., 0], np.tanh(10 * (X - 0.5))) # Refined grids are not smoothed
+    assert_allclose(Z[..., 1], X + Y)
+    with TemporaryDirectory() as directory:
+        file = os.path.join(directory, 'contour.npy')
+        expected = bst.plots.generate_contour_data(
+            z_at_xy, (0, 1), (0, 1), n=5, smooth=False, refine=1, file=file
+        )
+        calls.clear()
+        # Points saved to the checkpoint file are not evaluated again
+        results = bst.plots.generate_contour_data(
+            z_at_xy, (0, 1), (0, 1), n=5, smooth=False, refine=1, file=file
+        )
+        assert not calls
+        for i, j in zip(results, expected): assert_allclose(i, j)
+
 if __name__ == '__main__':
     test_parameter_hook()
     test_pearson_r()
@@ -349,4 +944,16 @@ if __name__ == '__main__':
     test_copy()
     test_model_exception_hook()
     test_parameters_from_df()
-    test_kolmogorov_smirnov_d()
\ No newline at end of file
+    test_kolmogorov_smirnov_d()
+    test_reset_after_failed_evaluation()
+    test_incremental_evaluation()
+    test_incremental_recycle_evaluation()
+    test_sample_order()
+    test_result_store()
+    test_sensitivity_indices()
+    test_surrogate()
+    test_fast_uncoupled_evaluation()
+    test_stopping_rule()
+    test_evaluation_timeout()
+    test_evaluate_across_coordinate()
+    test_generate_contour_data()
@@ -87,6 +87,96 @@ def test_trivial_distillation_case():
     sys.run_phenomena()
     assert round(vapor.imol['Ethanol'] / feed.imol['Ethanol'], 2) == actual
     
+def test_sparse_material_solver():
+    import biosteam as bst
+    from biosteam._system import solve_sparse_material_balances
+    from biosteam.utils import dictionaries2array
+    from numpy.linalg import solve
+    # Countercurrent cascade with stage-wise split factors (a banded system);
+    # some chemicals share split factors and a common factorization.
+    N_stages = 200
+    N_chemicals = 30
+    np.random.seed(0)
+    split = np.random.uniform(0.4, 0.6, [N_stages, N_chemicals // 3]).repeat(3, axis=1)
+    feed = np.zeros([N_stages, N_chemicals])
+    feed[N_stages // 2] = 100
+    A = []
+    b = []
+    for i in range(N_stages):
+        # vapor (i, 'g') and liquid (i, 'l') leaving stage i
+        coefficients = {(i, 'g'): 1, (i, 'l'): 1}
+        if i: coefficients[(i - 1, 'l')] = -1
+        if i != N_stages - 1: coefficients[(i + 1, 'g')] = -1
+        A.append(coefficients)
+        b.append(feed[i])
+        A.append({(i, 'g'): 1 - split[i], (i, 'l'): -split[i]})
+        b.append(np.zeros(N_chemicals))
+    A_dense, keys_dense = dictionaries2array(A)
+    b_dense = np.array(b)
+    dense = np.array([solve(A_dense[i], b_dense[:, i]) for i in range(N_chemicals)]).T
+    sparse, keys_sparse = solve_sparse_material_balances(A, b)
+    index = {j: i for i, j in enumerate(keys_sparse)}
+    sparse = sparse[[index[i] for i in keys_dense]]
+    assert_allclose(dense, sparse, rtol=1e-9, atol=1e-9)
+    
+    # Same result in a phenomena-based simulation
+    with bst.System(algorithm='phenomena based') as sys:
+        bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+        feed = bst.Stream(Ethanol=80, Water=100, T=353.455)
+        MSE = bst.MultiStageEquilibrium(N_stages=5, ins=[feed], feed_stages=[2],
+            outs=['vapor', 'liquid'],
+            stage_specifications={0: ('Reflux', 0.673), -1: ('Boilup', 2.57)},
+            phases=('g', 'l'),
+            use_cache=True,
+            maxiter=200,
+        )
+    sys.simulate()
+    sys.run_phenomena()
+    vapor, liquid = MSE.outs
+    actual = vapor.mol.copy()
+    sys.material_solver = 'sparse'
+    assert sys.stage_configuration().material_solver == 'sparse'
+    sys.run_phenomena()
+    assert_allclose(vapor.mol, actual, rtol=1e-3, atol=1e-3)
+
+def test_cached_balance_structure():
+    import biosteam as bst
+    from biosteam._system import BalanceStructure
+    # Repeated variables within an equation take the last coefficient
+    structure = BalanceStructure([('x', 'y'), ('z',)], [('a', 'a'), ('b',)])
+    data = structure.coefficient_data([1., 2., 3.])
+    assert_allclose(structure.dense(data), [[2., 0.], [0., 3.]])
+    # Array subclasses (e.g., memory maps) are not taken for scalars
+    class Vector(np.ndarray): pass
+    data = structure.coefficient_data(
+        [np.array([1., 2.]).view(Vector), 2, np.float64(3.)], (2,)
+    )
+    assert_allclose(data, [[2., 2.], [3., 3.]])
+    data = structure.coefficient_data(
+        [1, np.array([1., 2.]).view(Vector), 3.], (2,)
+    )
+    assert_allclose(data, [[1., 2.], [3., 3.]])
+    with bst.System(algorithm='phenomena based') as sys:
+        bst.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+        feed = bst.Stream(Ethanol=80, Water=100, T=353.455)
+        MSE = bst.MultiStageEquilibrium(N_stages=5, ins=[feed], feed_stages=[2],
+            outs=['vapor', 'liquid'],
+            stage_specifications={0: ('Reflux', 0.673), -1: ('Boilup', 2.57)},
+            phases=('g', 'l'),
+            use_cache=True,
+            maxiter=200,
+        )
+    sys.simulate()
+    sys.run_phenomena()
+    configuration = sys.stage_configuration()
+    structures = {i: j[0] for i, j in configuration._structures.items()}
+    assert 'material' in structures
+    actual = MSE.outs[0].mol.copy()
+    sys.run_phenomena()
+    for name, structure in structures.items():
+        assert configuration._structures[name][0] is structure
+    assert_allclose(MSE.outs[0].mol, actual, rtol=1e-3, atol=1e-3)
+
 def test_simple_acetic_acid_separation_no_recycle():
     bst.settings.set_thermo(['Water', 'AceticAcid', 'EthylAcetate'], cache=True)
     @bst.SystemFactory
@@ -326,6 +416,8 @@ if __name__ == '__main__':
     # test_trivial_vle_case()
     test_trivial_liquid_extraction_case()
     test_trivial_distillation_case()
+    test_sparse_material_solver()
+    test_cached_balance_structure()
     test_simple_acetic_acid_separation_no_recycle()
     test_simple_acetic_acid_separation_with_recycle()
     # test_vlle_case()
\ No newline at end of file
@@ -7,6 +7,42 @@
 # for license details.
 """
 """
+import numpy as np
+from numpy.testing import assert_allclose
+
+def test_nearest_neighbor_regressor():
+    import biosteam as bst
+    np.random.seed(0)
+    X = np.random.rand(500, 2)
+    y = np.sin(4 * X[:, 0]) + X[:, 1]
+    incremental = bst.NearestNeighborRegressor()
+    for xi, yi in zip(X, y): incremental.insert(xi, yi)
+    assert incremental.size == 500
+    fitted = bst.NearestNeighborRegressor()
+    fitted.fit(X, y)
+    for x in np.random.rand(20, 2):
+        prediction = incremental.predict(x[None])
+        assert_allclose(prediction, fitted.predict(x[None]))
+        assert_allclose(prediction, np.sin(4 * x[0]) + x[1], atol=0.1)
+    assert_allclose(incremental.predict(X[None, 3]), y[3])
+
+def test_recursive_least_squares():
+    import biosteam as bst
+    np.random.seed(0)
+    X = np.random.rand(200, 3)
+    y = X @ [1., 2., 3.] + 0.5 + 0.01 * np.random.randn(200)
+    incremental = bst.RecursiveLeastSquares()
+    for xi, yi in zip(X, y): incremental.insert(xi, yi)
+    fitted = bst.InterceptLinearRegressor()
+    fitted.fit(X, y)
+    assert_allclose(incremental.coefficients, fitted.coefficients, rtol=1e-5)
+    assert_allclose(incremental.predict(X[None, 0]), fitted.predict(X[None, 0]), rtol=1e-5)
+    
+    # Old samples are forgotten when the response drifts
+    drifting = bst.RecursiveLeastSquares(forgetting_factor=0.9)
+    drifting.fit(X, y)
+    for xi in X[:100]: drifting.insert(xi, xi @ [3., 2., 1.] - 1.)
+    assert_allclose(drifting.coefficients, [-1., 3., 2., 1.], atol=1e-3)
 
 # TODO: Revisit convergence models
 
@@ -50,6 +86,8 @@
 #     assert R2f['max'] > R2p['max'] > R2_null['max']
     
     
-# if __name__ == '__main__':
-#     test_convergence_model()
+if __name__ == '__main__':
+    test_nearest_neighbor_regressor()
+    test_recursive_least_squares()
+    # test_convergence_model()
     
\ No newline at end of file
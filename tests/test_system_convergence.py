@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import pytest
+import biosteam as bst
+import numpy as np
+from numpy.testing import assert_allclose
+
+def create_recycle_system(method):
+    bst.main_flowsheet.clear()
+    bst.settings.set_thermo(['Water', 'Ethanol', 'Glycerol'], cache=True)
+    feed = bst.Stream('feed', Water=800, Ethanol=200, Glycerol=10, T=350)
+    recycle = bst.Stream('recycle')
+    M1 = bst.Mixer('M1', ins=[feed, recycle])
+    F1 = bst.Flash('F1', ins=M1-0, outs=('vapor', ''), V=0.3, P=101325)
+    S1 = bst.Splitter('S1', ins=F1-1, outs=(recycle, 'bottoms'), split=0.7)
+    return bst.System('sys', path=[M1, F1, S1], recycle=recycle, method=method,
+                      molar_tolerance=1e-6, relative_molar_tolerance=1e-9,
+                      temperature_tolerance=1e-6, relative_temperature_tolerance=1e-9)
+
+def test_recycle_accelerators():
+    sys = create_recycle_system('fixed-point')
+    sys.simulate()
+    actual = [i.mol.copy() for i in sys.products]
+    fixedpoint_iter = sys._iter
+    for method in ('Anderson mixing', 'Broyden'):
+        sys = create_recycle_system(method)
+        sys.simulate()
+        for i, j in zip(sys.products, actual):
+            assert_allclose(i.mol, j, rtol=1e-6, atol=1e-6)
+        assert sys._iter <= fixedpoint_iter
+
+    # Accelerators never set negative flows
+    def f(x):
+        g = np.abs(np.cos(x))
+        return g, np.abs(g - x).max() > 1e-12
+    for solver in (bst.conditional_anderson, bst.conditional_broyden):
+        x = solver(f, np.ones(3))
+        assert_allclose(x, np.cos(x), rtol=1e-9)
+    
+    # Steps that would go negative are cut short toward the fixed-point iterate
+    from biosteam.utils.accelerators import nonnegative_step
+    x, restart = nonnegative_step(np.array([1., 2.]), np.array([-1., 1.]))
+    assert restart
+    assert_allclose(x, [0., 1.5])
+    x, restart = nonnegative_step(np.array([1., 2.]), np.array([0.5, 1.]))
+    assert not restart
+    
+    # With a convex residual (fixed point at zero), the raw Anderson and 
+    # Broyden steps overshoot below zero and must be clipped
+    for solver in (bst.conditional_anderson, bst.conditional_broyden):
+        points = []
+        def f(x):
+            points.append(x.copy())
+            g = 0.9 * x + 0.01 * x ** 2
+            return g, np.abs(g - x).max() > 1e-12
+        x = solver(f, np.array([1., 2., 5.]))
+        assert_allclose(x, 0., atol=1e-9)
+        assert all([(i >= 0).all() for i in points])
+        assert any([(i == 0).any() for i in points[:-1]]) # Clipped steps
+
+def test_compare_methods():
+    sys = create_recycle_system('Aitken')
+    methods = ['Aitken', 'fixed-point', 'Anderson mixing', 'Broyden']
+    df = sys.compare_methods(methods)
+    assert list(df.index) == methods
+    assert df['Converged'].all()
+    assert (df['Unit simulations'] > 0).all()
+    assert sys.method == 'aitken'
+    assert 'run' not in sys.units[0].__dict__
+
+def create_nested_recycle_system():
+    bst.main_flowsheet.clear()
+    bst.settings.set_thermo(['Water', 'Ethanol', 'Glycerol'], cache=True)
+    feed = bst.Stream('feed', Water=800, Ethanol=200, Glycerol=10, T=350)
+    inner_recycle = bst.Stream('inner_recycle')
+    outer_recycle = bst.Stream('outer_recycle')
+    P1 = bst.Pump('P1', ins=feed)
+    M1 = bst.Mixer('M1', ins=[P1-0, outer_recycle])
+    M2 = bst.Mixer('M2', ins=[M1-0, inner_recycle])
+    F1 = bst.Flash('F1', ins=M2-0, outs=('', ''), V=0.5, P=101325)
+    S1 = bst.Splitter('S1', ins=F1-1, outs=(inner_recycle, ''), split=0.5)
+    F2 = bst.Flash('F2', ins=F1-0, outs=('', ''), V=0.5, P=101325)
+    S2 = bst.Splitter('S2', ins=F2-1, outs=(outer_recycle, ''), split=0.5)
+    M3 = bst.Mixer('M3', ins=[S1-1, S2-1])
+    sys = bst.System.from_units('sys', [P1, M1, M2, F1, S1, F2, S2, M3])
+    sys.set_tolerance(mol=1e-6, rmol=1e-9, subsystems=True)
+    return sys
+
+def test_tear_selection():
+    sys = create_nested_recycle_system()
+    sys.simulate()
+    actual = [i.mol.copy() for i in sys.products]
+    selection = sys.select_tears()
+    assert selection.loops == 1
+    assert selection.cycles == 2
+    assert selection.passes == 1
+    assert selection.exact
+    assert len(selection.tears) == 1 # Both cycles pass through the same arc
+    sys.empty_recycles()
+    sys.select_tears(restructure=True)
+    P1 = bst.main_flowsheet.unit.P1
+    M3 = bst.main_flowsheet.unit.M3
+    assert sys.path[0] is P1 and sys.path[-1] is M3
+    subsystem, = sys.subsystems
+    assert subsystem.recycle is selection.tears[0]
+    assert not subsystem.subsystems
+    sys.simulate()
+    for i, j in zip(sys.products, actual):
+        assert_allclose(i.mol, j, rtol=1e-5, atol=1e-5)
+        
+    # Check minimum weight tear sets with brute force
+    from biosteam.process_tools.tear_selection import simple_cycles, minimum_cover
+    from itertools import combinations
+    nodes = list(range(5))
+    successors = {0: [1, 3], 1: [2, 0], 2: [0, 4], 3: [4, 2], 4: [0, 3]}
+    arcs = [(i, j) for i in nodes for j in successors[i]]
+    weights = {j: (3 * i) % 5 + 1 for i, j in enumerate(arcs)}
+    cycles = simple_cycles(nodes, successors, 1000)
+    tears, exact = minimum_cover(cycles, weights, 100000)
+    assert exact
+    assert sum([weights[i] for i in tears]) == min([
+        sum([weights[i] for i in combination])
+        for n in range(len(arcs) + 1)
+        for combination in combinations(arcs, n)
+        if all([set(combination).intersection(i) for i in cycles])
+    ])
+
+def test_recycle_state_cache():
+    import os
+    from tempfile import TemporaryDirectory
+    from chaospy.distributions import Uniform
+    sys = create_recycle_system('Aitken')
+    feed = sys.feeds[0]
+    F1 = bst.main_flowsheet.unit.F1
+    model = bst.Model(sys)
+    
+    @model.parameter(distribution=Uniform(600, 1000))
+    def set_water_flow(water_flow):
+        feed.imol['Water'] = water_flow
+        
+    @model.parameter(distribution=Uniform(0.2, 0.4))
+    def set_vapor_fraction(V):
+        F1.V = V
+    
+    @model.indicator
+    def recycle_flow():
+        return sys.recycle.F_mol
+    
+    np.random.seed(0)
+    samples = model.sample(8, 'L')
+    model.load_samples(samples)
+    model.evaluate()
+    actual = model.table.values.copy()
+    with TemporaryDirectory() as directory:
+        file = os.path.join(directory, 'states.npz')
+        sys.recycle_state_cache = cache = bst.RecycleStateCache(
+            max_size=5, file=file, interpolate=True
+        )
+        model.evaluate()
+        assert_allclose(model.table.values, actual, rtol=1e-5)
+        assert len(cache) == 5 # Least recently used states are discarded
+        assert os.path.exists(file)
+        state_size = sum([j for i, j in cache.layout])
+        assert_allclose(cache.memory, 5 * 8 * (2 + state_size) / 1e6)
+        assert not cache._unsaved # Nothing recorded since last save
+        
+        # Warm-start from the converged state of the same sample
+        cache = bst.RecycleStateCache(file=file)
+        assert len(cache) == 5
+        assert not cache._unsaved
+        sample = model.table.values[-1, :2]
+        sys.empty_recycles()
+        assert cache.warm_start(sample, sys)
+        sys.simulate()
+        assert sys._iter <= 2
+        sys.recycle_state_cache = None
+        
+        # Layout is checked
+        cache.layout = (('recycle', 1),)
+        with pytest.raises(ValueError):
+            cache.warm_start(sample, sys)
+        
+        # States recorded in worker processes are stored by the main process
+        file = os.path.join(directory, 'parallel_states.npz')
+        sys.recycle_state_cache = cache = bst.RecycleStateCache(file=file)
+        model.evaluate(workers=2)
+        sys.recycle_state_cache = None
+        assert_allclose(model.table.values, actual, rtol=1e-5)
+        assert len(cache) == len(samples)
+        assert len(bst.RecycleStateCache(file=file)) == len(samples)
+        
+        # Preallocated buffers count towards the memory limit
+        max_memory = 3 * 8 * (2 + state_size) / 1e6
+        cache = bst.RecycleStateCache(max_memory=max_memory)
+        cache.load(file)
+        assert len(cache) == 3
+        assert cache.memory <= max_memory
+
+def test_profiler():
+    import os
+    from tempfile import TemporaryDirectory
+    sys = create_recycle_system('fixed-point')
+    F1 = bst.main_flowsheet.unit.F1
+    specification_calls = []
+    @F1.add_specification(run=True)
+    def adjust_vapor_fraction():
+        specification_calls.append(F1.V)
+    
+    with sys.profiling() as profiler:
+        sys.simulate()
+    df = profiler.table()
+    iterations = sys._iter
+    assert df.loc[('sys', 'converge'), 'Calls'] == 1
+    assert df.loc[('sys', 'iteration'), 'Calls'] == iterations
+    assert df.loc[('F1', 'specification'), 'Calls'] == len(specification_calls)
+    assert df.loc[('M1', '_run'), 'Calls'] == iterations
+    assert df.loc[('M1', '_design'), 'Calls'] == df.loc[('M1', '_cost'), 'Calls'] == 1
+    assert (df['Cumulative time [ms]'] >= df['Self time [ms]']).all()
+    
+    # Methods are restored after profiling
+    for i in sys.units:
+        for method in ('_run', '_design', '_cost'):
+            assert method not in i.__dict__
+    assert sys._profiler is None
+    assert F1.specifications[0].__class__.__name__ != 'ProfiledSpecification'
+    
+    # Collapsed stacks for flame graphs
+    with TemporaryDirectory() as directory:
+        file = os.path.join(directory, 'sys.folded')
+        df = sys.profile(file)
+        assert set(df.index) == {'M1', 'F1', 'S1'}
+        with open(file) as f: lines = f.read().splitlines()
+    stacks = [i.rsplit(' ', 1)[0] for i in lines]
+    assert 'sys.converge;sys.iteration;M1._run' in stacks
+    assert all([i.rsplit(' ', 1)[1].isdigit() for i in lines])
+    
+    # Legacy profile mode is an alias of profiling
+    sys._turn_on('profile')
+    assert sys._profiler is not None
+    sys.simulate()
+    sys._turn_off()
+    assert sys._profiler is None
+    assert F1._total_excecution_time_ > 0
+    assert '_run' not in F1.__dict__
+    
+    # Nested subsystems are profiled
+    middle = bst.System('middle', [sys])
+    outer = bst.System('outer', [middle])
+    with outer.profiling() as profiler:
+        assert sys._profiler is middle._profiler is profiler
+        outer.simulate()
+    df = profiler.table()
+    assert df.loc[('sys', 'converge'), 'Calls'] == 1
+    assert sys._profiler is None
+
+def test_recycle_buffer():
+    sys = create_recycle_system('fixed-point')
+    recycle = sys.recycle
+    history = sys.track_recycle(recycle, maxlen=3)
+    sys.simulate()
+    assert sys._iter > 3
+    assert len(history) == 3
+    records = history.to_array()
+    assert records.shape == (3, recycle.imol.data.size + 2)
+    assert_allclose(records[-1, 0], recycle.T)
+    assert_allclose(records[-1, 2:], recycle.mol.to_array(), atol=1e-6)
+    assert sys._mol_error < 1e-6
+    
+    # Recycle buffer is reused and matches packed recycle data
+    buffer = sys._recycle_buffer
+    sys.simulate()
+    assert sys._recycle_buffer is buffer
+    assert_allclose(buffer.get_data(), sys._get_recycle_data())
+    
+    # Multiple recycles
+    bst.main_flowsheet.clear()
+    bst.settings.set_thermo(['Water', 'Ethanol', 'Glycerol'], cache=True)
+    path = []
+    recycles = []
+    feeds = []
+    for i in range(4):
+        feed = bst.Stream(Water=100 * (i + 1), Ethanol=20, Glycerol=1, T=350)
+        recycle = bst.Stream()
+        M = bst.Mixer(ins=[feed, recycle])
+        F = bst.Flash(ins=M-0, V=0.2 + 0.1 * i, P=101325)
+        S = bst.Splitter(ins=F-1, outs=('', recycle), split=0.5)
+        path.extend([M, F, S])
+        recycles.append(recycle)
+        feeds.append(feed)
+    sys = bst.System(None, path=path, recycle=recycles, method='fixed-point',
+                     molar_tolerance=1e-6, relative_molar_tolerance=1e-9)
+    sys.simulate()
+    assert_allclose(
+        sum([i.mol for i in feeds]).to_array(),
+        sum([i.mol for i in sys.products]).to_array(),
+        rtol=1e-6,
+    )
+    assert len(sys._recycle_buffer.T) == 4
+
+def test_system_snapshot():
+    import os
+    from tempfile import TemporaryDirectory
+    sys = create_recycle_system('fixed-point')
+    sys.simulate()
+    F1 = bst.main_flowsheet.unit.F1
+    streams = sys.streams
+    mol = [i.mol.copy() for i in streams]
+    T = [i.T for i in streams]
+    design_results = F1.design_results.copy()
+    purchase_cost = F1.purchase_cost
+    duty = F1.net_duty
+    snapshot = sys.snapshot()
+    
+    def assert_restored():
+        for i, j, k in zip(streams, mol, T):
+            assert_allclose(i.mol, j, atol=1e-12)
+            assert_allclose(i.T, k)
+        assert F1.design_results == design_results
+        assert_allclose(F1.purchase_cost, purchase_cost)
+        assert_allclose(F1.net_duty, duty)
+    
+    F1.V = 0.5
+    sys.simulate()
+    assert F1.purchase_cost != purchase_cost
+    sys.restore(snapshot)
+    assert_restored()
+    
+    # Save and load (memory-mapped) in a new unbound snapshot
+    with TemporaryDirectory() as directory:
+        file = os.path.join(directory, 'snapshot.npz')
+        snapshot.save(file)
+        sys.simulate()
+        for mmap_mode in (None, 'r'):
+            loaded = bst.SystemSnapshot.load(file, mmap_mode)
+            assert_allclose(loaded.data, snapshot.data)
+            sys.restore(loaded)
+            assert_restored()
+            del loaded # Release memory-mapped file
+    
+    # Layout is checked
+    snapshot.stream_layout = (('missing', ('l',), 3),)
+    snapshot.streams = None
+    with pytest.raises(ValueError):
+        sys.restore(snapshot)
+
+if __name__ == '__main__':
+    test_recycle_accelerators()
+    test_compare_methods()
+    test_tear_selection()
+    test_recycle_state_cache()
+    test_profiler()
+    test_recycle_buffer()
+    test_system_snapshot()